@@ -13,6 +13,7 @@ from app.dependencies import (
 from app.models import User as DBUser
 from app.schemas import Token, UserCreate, UserResponse, BranchSelectionRequest
 from app.config import settings
+from app.utils.principal_cache import principal_cache
 
 router = APIRouter()
 
@@ -154,6 +155,7 @@ async def login_for_access_token(
                 current_branch_id = primary_branch.id
                 user.current_branch_id = current_branch_id
                 db.commit()
+                principal_cache.invalidate_user(user.id)
     
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
@@ -204,6 +206,7 @@ async def select_branch(
     # Update user's current branch
     current_user.current_branch_id = branch_selection.branch_id
     db.commit()
+    principal_cache.invalidate_user(current_user.id)
     
     # Generate new token with updated branch ID
     accessible_branches = [
@@ -16,6 +16,7 @@ from app.schemas import (
     UserBranchAssignmentResponse
 )
 from app.services import branch_service, organization_service
+from app.utils.receipt_cache import receipt_templates
 
 
 router = APIRouter(prefix="/branches", tags=["Branches"])
@@ -204,6 +205,7 @@ def update_branch(
         )
     
     updated_branch = branch_service.update_branch(db, branch_id, branch_data)
+    receipt_templates.invalidate()
     return updated_branch
 
 
@@ -8,6 +8,8 @@ from typing import List
 from app.database import get_db
 from app.dependencies import get_current_user, check_admin_role
 from app.models import Floor
+from app.services.table_service import TableService
+from app.utils.cache import cache
 
 router = APIRouter()
 
@@ -18,8 +20,7 @@ async def get_floors(
     current_user = Depends(get_current_user)
 ):
     """Get all floors ordered by display_order"""
-    floors = db.query(Floor).filter(Floor.is_active == True).order_by(Floor.display_order).all()
-    return floors
+    return TableService.get_active_floors(db)
 
 
 @router.get("/{floor_id}")
@@ -54,6 +55,7 @@ async def create_floor(
     new_floor = Floor(**floor_data)
     db.add(new_floor)
     db.commit()
+    cache.invalidate("floors")
     db.refresh(new_floor)
     return new_floor
 
@@ -80,6 +82,7 @@ async def update_floor(
         setattr(floor, key, value)
     
     db.commit()
+    cache.invalidate("floors")
     db.refresh(floor)
     return floor
 
@@ -98,6 +101,7 @@ async def delete_floor(
     # Soft delete - set is_active to False
     floor.is_active = False
     db.commit()
+    cache.invalidate("floors")
     return {"message": "Floor deleted successfully"}
 
 
@@ -115,5 +119,6 @@ async def reorder_floor(
     
     floor.display_order = new_order
     db.commit()
+    cache.invalidate("floors")
     db.refresh(floor)
     return floor
@@ -10,6 +10,7 @@ from app.models import (
     Product, UnitOfMeasurement, InventoryTransaction,
     BillOfMaterials, BatchProduction
 )
+from app.services.document_number_service import DocumentNumberService
 
 router = APIRouter()
 
@@ -197,9 +198,7 @@ async def create_production(
     current_user = Depends(get_current_user)
 ):
     """Create a new batch production"""
-    import random
-    from datetime import datetime
-    production_data['production_number'] = f"PROD-{datetime.now().strftime('%Y%m%d')}-{random.randint(1000, 9999)}"
+    production_data['production_number'] = DocumentNumberService.next_number(db, "production")
     new_production = BatchProduction(**production_data)
     db.add(new_production)
     db.commit()
@@ -1,53 +1,129 @@
 """
 KOT (Kitchen Order Ticket) and BOT (Bar Order Ticket) management routes
 """
-from fastapi import APIRouter, Depends, HTTPException, Body
-from sqlalchemy.orm import Session
-from typing import Optional
-from datetime import datetime
-import random
+from fastapi import APIRouter, Depends, HTTPException, Body, Header, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, Set
+import asyncio
+import json
 
-from app.database import get_db
-from app.dependencies import get_current_user
-from app.models import KOT, Order, KOTItem
-from sqlalchemy.orm import joinedload
+from app.database import get_async_db
+from app.dependencies import get_current_user, get_branch_user, get_scope_branch_ids_detached
+from app.models import KOT, KOTItem
+from app.services.document_number_service import DocumentNumberService
+from app.services.kot_event_service import kot_events, publish_kot_event, event_matches
+from app.services.loader_profiles import loader_options
 
 router = APIRouter()
 
+# Seconds between keep-alive comments on idle streams
+STREAM_KEEPALIVE_SECONDS = 15
+
+
+def format_sse(event_id: str, event_type: str, data: dict) -> str:
+    """Format a single Server-Sent Events message"""
+    return f"id: {event_id}\nevent: {event_type}\ndata: {json.dumps(data)}\n\n"
+
 
 @router.get("")
 async def get_kots(
     kot_type: Optional[str] = None,  # KOT or BOT
     status: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Get all KOTs/BOTs, optionally filtered by type and status"""
-    query = db.query(KOT).options(
-        joinedload(KOT.order).joinedload(Order.table),
-        joinedload(KOT.items).joinedload(KOTItem.menu_item)
-    )
+    query = select(KOT).options(*loader_options("kot_board"))
     
     if kot_type:
-        query = query.filter(KOT.kot_type == kot_type)
+        query = query.where(KOT.kot_type == kot_type)
     if status:
-        query = query.filter(KOT.status == status)
+        query = query.where(KOT.status == status)
     
-    kots = query.order_by(KOT.created_at.desc()).all()
+    kots = (await db.scalars(query.order_by(KOT.created_at.desc()))).all()
     return kots
 
 
+@router.get("/stream")
+async def stream_kots(
+    request: Request,
+    kot_type: Optional[str] = None,  # KOT or BOT
+    status: Optional[str] = None,  # comma-separated, e.g. "Pending,In Progress"
+    cursor: Optional[str] = None,
+    last_event_id: Optional[str] = Header(None),
+    branch_ids: Set[int] = Depends(get_scope_branch_ids_detached)
+):
+    """
+    Stream KOT/BOT events to kitchen displays as Server-Sent Events.
+
+    Pass the last seen event id as `cursor` (or the standard Last-Event-ID
+    header) to replay only missed events. A `reset` event means the cursor is
+    too old or was issued before a restart, and the display should reload the
+    board with GET /kots.
+
+    The stream holds no database connection: the user is authenticated with a
+    session that is closed before streaming starts, and events come from the
+    in-process broker.
+
+    Displays only receive tickets of the branch in their token, or of every
+    branch of its organization; tokens with neither claim are rejected.
+    """
+    statuses = [s.strip() for s in status.split(",") if s.strip()] if status else None
+    cursor = cursor or last_event_id
+    
+    # Subscribe before replaying so nothing published in between is lost
+    subscriber = kot_events.subscribe()
+
+    async def event_stream():
+        try:
+            last_sent = kot_events.last_seq
+            last_id = kot_events.event_id(last_sent)
+            if cursor:
+                backlog = kot_events.replay(cursor)
+                if backlog is None:
+                    yield format_sse(last_id, "reset", {"last_event_id": last_id})
+                else:
+                    for event in backlog:
+                        if event["seq"] > last_sent:
+                            break
+                        if event_matches(event, kot_type, statuses, branch_ids):
+                            yield format_sse(event["id"], event["type"], event)
+            else:
+                yield format_sse(last_id, "ready", {"last_event_id": last_id})
+
+            while not (subscriber.overflowed and subscriber.queue.empty()):
+                if await request.is_disconnected():
+                    break
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), STREAM_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event["seq"] <= last_sent:
+                    continue
+                last_sent = event["seq"]
+                if event_matches(event, kot_type, statuses, branch_ids):
+                    yield format_sse(event["id"], event["type"], event)
+        finally:
+            kot_events.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/{kot_id}")
 async def get_kot(
     kot_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Get KOT by ID"""
-    kot = db.query(KOT).options(
-        joinedload(KOT.order).joinedload(Order.table),
-        joinedload(KOT.items).joinedload(KOTItem.menu_item)
-    ).filter(KOT.id == kot_id).first()
+    kot = await db.scalar(select(KOT).options(*loader_options("kot_board")).where(KOT.id == kot_id))
     
     if not kot:
         raise HTTPException(status_code=404, detail="KOT not found")
@@ -57,23 +133,22 @@ async def get_kot(
 @router.post("")
 async def create_kot(
     kot_data: dict = Body(...),
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_branch_user)
 ):
     """Create a new KOT or BOT"""
     items_data = kot_data.pop('items', [])
     
     # Generate KOT number if not provided
     if 'kot_number' not in kot_data:
-        kot_type = kot_data.get('kot_type', 'KOT')
-        prefix = 'KOT' if kot_type == 'KOT' else 'BOT'
-        kot_data['kot_number'] = f"{prefix}-{datetime.now().strftime('%Y%m%d')}-{random.randint(1000, 9999)}"
+        doc_type = 'kot' if kot_data.get('kot_type', 'KOT') == 'KOT' else 'bot'
+        kot_data['kot_number'] = await db.run_sync(DocumentNumberService.next_number, doc_type)
     
     kot_data['created_by'] = current_user.id
     
     new_kot = KOT(**kot_data)
     db.add(new_kot)
-    db.flush()
+    await db.flush()
     
     # Add items
     for item in items_data:
@@ -85,8 +160,9 @@ async def create_kot(
         )
         db.add(kot_item)
         
-    db.commit()
-    db.refresh(new_kot)
+    await db.commit()
+    await db.run_sync(publish_kot_event, new_kot.id, "created")
+    await db.refresh(new_kot)
     return new_kot
 
 
@@ -94,19 +170,21 @@ async def create_kot(
 async def update_kot(
     kot_id: int,
     kot_data: dict = Body(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Update a KOT/BOT"""
-    kot = db.query(KOT).filter(KOT.id == kot_id).first()
+    kot = await db.get(KOT, kot_id)
     if not kot:
         raise HTTPException(status_code=404, detail="KOT not found")
     
+    previous_status = kot.status
     for key, value in kot_data.items():
         setattr(kot, key, value)
     
-    db.commit()
-    db.refresh(kot)
+    await db.commit()
+    await db.run_sync(publish_kot_event, kot.id, "updated", previous_status=previous_status)
+    await db.refresh(kot)
     return kot
 
 
@@ -114,15 +192,17 @@ async def update_kot(
 async def update_kot_status(
     kot_id: int,
     status: str = Body(..., embed=True),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Update KOT/BOT status"""
-    kot = db.query(KOT).filter(KOT.id == kot_id).first()
+    kot = await db.get(KOT, kot_id)
     if not kot:
         raise HTTPException(status_code=404, detail="KOT not found")
     
+    previous_status = kot.status
     kot.status = status
-    db.commit()
-    db.refresh(kot)
+    await db.commit()
+    await db.run_sync(publish_kot_event, kot.id, "status_changed", previous_status=previous_status)
+    await db.refresh(kot)
     return kot
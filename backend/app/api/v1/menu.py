@@ -1,16 +1,53 @@
 """
 Menu management routes
 """
-from fastapi import APIRouter, Depends, HTTPException, Body
+from fastapi import APIRouter, Depends, HTTPException, Body, Header, Response
 from sqlalchemy.orm import Session
+from typing import Optional
 
 from app.database import get_db
 from app.dependencies import get_current_user
 from app.models import MenuItem, Category, MenuGroup
+from app.services.menu_service import MenuService
+from app.utils.catalog_cache import catalog_cache, catalog_etag
+from app.utils.tenant_scope import tenant_cache_key
+from app.utils.price_cache import price_cache
 
 router = APIRouter()
 
 
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header covers the given ETag"""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+@router.get("/catalog")
+async def get_menu_catalog(
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Get categories, groups and items in one response.
+
+    The response carries an ETag for the current menu version; send it back
+    as If-None-Match to get an empty 304 when nothing changed.
+    """
+    version = MenuService.get_catalog_version(db)
+    scope_key = tenant_cache_key()
+    etag = catalog_etag(version, scope_key)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    
+    snapshot = catalog_cache.get(scope_key, version, lambda: MenuService.build_catalog(db, version))
+    headers["ETag"] = snapshot.etag
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
+
+
 @router.get("/items")
 async def get_menu_items(
     db: Session = Depends(get_db),
@@ -30,7 +67,9 @@ async def create_menu_item(
     """Create a new menu item"""
     new_item = MenuItem(**item_data)
     db.add(new_item)
+    MenuService.bump_catalog_version(db)
     db.commit()
+    price_cache.invalidate()
     db.refresh(new_item)
     return new_item
 
@@ -54,6 +93,7 @@ async def create_category(
     """Create a new category"""
     new_category = Category(**category_data)
     db.add(new_category)
+    MenuService.bump_catalog_version(db)
     db.commit()
     db.refresh(new_category)
     return new_category
@@ -78,11 +118,41 @@ async def create_group(
     """Create a new menu group"""
     new_group = MenuGroup(**group_data)
     db.add(new_group)
+    MenuService.bump_catalog_version(db)
     db.commit()
     db.refresh(new_group)
     return new_group
 
 
+@router.put("/items/bulk-update")
+async def bulk_update_menu_items(
+    updates: list[dict] = Body(...),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """Bulk update menu items (e.g., for price list imports)
+    
+    Example:
+    [
+        {"id": 1, "price": 150},
+        {"id": 2, "price": 200, "is_active": false}
+    ]
+    
+    Returns counts plus the ids that changed and the ids that don't exist.
+    """
+    try:
+        summary = MenuService.bulk_update_menu_items(db, updates)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if summary["updated_count"]:
+        MenuService.bump_catalog_version(db)
+    db.commit()
+    if summary["updated_count"]:
+        price_cache.invalidate()
+    return summary
+
+
 @router.put("/items/{item_id}")
 async def update_menu_item(
     item_id: int,
@@ -99,50 +169,13 @@ async def update_menu_item(
         if hasattr(item, key):
             setattr(item, key, value)
     
+    MenuService.bump_catalog_version(db)
     db.commit()
+    price_cache.invalidate()
     db.refresh(item)
     return item
 
 
-@router.put("/items/bulk-update")
-async def bulk_update_menu_items(
-    updates: list[dict] = Body(...),
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
-):
-    """Bulk update menu items (e.g., for price updates)
-    
-    Example:
-    [
-        {"id": 1, "price": 150},
-        {"id": 2, "price": 200}
-    ]
-    """
-    updated_items = []
-    
-    for update in updates:
-        item_id = update.get("id")
-        if not item_id:
-            continue
-        
-        item = db.query(MenuItem).filter(MenuItem.id == item_id).first()
-        if not item:
-            continue
-        
-        for key, value in update.items():
-            if key != "id" and hasattr(item, key):
-                setattr(item, key, value)
-        
-        updated_items.append(item)
-    
-    db.commit()
-    
-    for item in updated_items:
-        db.refresh(item)
-    
-    return {"updated_count": len(updated_items), "items": updated_items}
-
-
 @router.delete("/items/{item_id}")
 async def delete_menu_item(
     item_id: int,
@@ -155,7 +188,9 @@ async def delete_menu_item(
         raise HTTPException(status_code=404, detail="Menu item not found")
     
     db.delete(item)
+    MenuService.bump_catalog_version(db)
     db.commit()
+    price_cache.invalidate()
     return {"message": "Menu item deleted"}
 
 
@@ -175,6 +210,7 @@ async def update_category(
         if hasattr(category, key):
             setattr(category, key, value)
     
+    MenuService.bump_catalog_version(db)
     db.commit()
     db.refresh(category)
     return category
@@ -192,6 +228,7 @@ async def delete_category(
         raise HTTPException(status_code=404, detail="Category not found")
     
     db.delete(category)
+    MenuService.bump_catalog_version(db)
     db.commit()
     return {"message": "Category deleted"}
 
@@ -212,6 +249,7 @@ async def update_group(
         if hasattr(group, key):
             setattr(group, key, value)
     
+    MenuService.bump_catalog_version(db)
     db.commit()
     db.refresh(group)
     return group
@@ -229,6 +267,7 @@ async def delete_group(
         raise HTTPException(status_code=404, detail="Menu group not found")
     
     db.delete(group)
+    MenuService.bump_catalog_version(db)
     db.commit()
     return {"message": "Menu group deleted"}
 
@@ -1,58 +1,140 @@
 """
 Order management routes
 """
-from fastapi import APIRouter, Depends, Body, HTTPException
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, Body, HTTPException, Query, Response
+from sqlalchemy import select, update, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
-import random
 from datetime import datetime
 
-from app.database import get_db
-from app.dependencies import get_current_user
-from app.models import Order, OrderItem, KOT, KOTItem, Table, Customer, POSSession
+from app.database import get_async_db
+from app.dependencies import get_current_user, get_branch_user
+from app.models import Order, KOT, KOTItem, Table, Customer, POSSession
 from app.schemas import OrderResponse
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.services.rollup_service import SalesRollupService, ROLLUP_STATUSES
+from app.services.order_service import OrderService
+from app.services.order_archive_service import OrderArchiveService
+from app.services.pricing_service import PricingService
+from app.services.kot_event_service import publish_kot_event
+from app.services.loader_profiles import loader_options
 
 router = APIRouter()
 
+# Upper bound for a single page of orders
+MAX_PAGE_SIZE = 500
+
+# Upper bound for orders created by one batch request
+MAX_BATCH_ORDERS = 200
+
+# Order columns PUT /orders/{id} may change; keys, ownership and branch never come from the body
+EDITABLE_FIELDS = {
+    'table_id', 'customer_id', 'order_type', 'status', 'discount', 'discount_rule_id',
+    'gross_amount', 'net_amount', 'total_amount', 'paid_amount', 'credit_amount',
+    'payment_type', 'session_id'
+}
+
+# Fields that change how an order is priced; amounts sent by clients are recomputed
+PRICING_FIELDS = {'order_type', 'discount', 'discount_rule_id', 'gross_amount', 'net_amount', 'total_amount'}
+
+
+async def reload_order(db: AsyncSession, order_id: int) -> Order:
+    """Load an order with the full loader profile, replacing stale session state"""
+    return await db.scalar(
+        select(Order)
+        .options(*loader_options("order_full"))
+        .where(Order.id == order_id)
+        .execution_options(populate_existing=True)
+    )
+
+
+async def get_order_or_404(db: AsyncSession, order_id: int) -> Order:
+    order = await db.get(Order, order_id)
+    if not order:
+        raise HTTPException(status_code=404, detail="Order not found")
+    return order
+
+
+async def rollup_snapshot(db: AsyncSession, order: Order) -> Optional[dict]:
+    """The order's current contribution to the sales rollups, or None when it isn't counted"""
+    if order.status not in ROLLUP_STATUSES:
+        return None
+    return await db.run_sync(SalesRollupService.snapshot, order)
+
 
 @router.get("", response_model=List[OrderResponse])
 async def get_orders(
+    response: Response,
     order_type: Optional[str] = None,
     status: Optional[str] = None,
-    db: Session = Depends(get_db),
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    table_id: Optional[int] = None,
+    customer_id: Optional[int] = None,
+    created_by: Optional[int] = None,
+    include_kots: bool = True,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
-    """Get all orders, optionally filtered by order_type and status"""
-    query = db.query(Order).options(
-        joinedload(Order.table),
-        joinedload(Order.customer),
-        joinedload(Order.items).joinedload(OrderItem.menu_item),
-        joinedload(Order.kots).joinedload(KOT.items).joinedload(KOTItem.menu_item)
-    )
+    """
+    Get orders, newest first, with optional filters.
+
+    Pass `limit` to page through results; when more rows exist the cursor for
+    the next page is returned in the X-Next-Cursor header and is passed back
+    as `cursor`. Set `include_kots=false` for a slim listing without tickets.
+    """
+    profile = "order_full" if include_kots else "order_summary"
+    query = select(Order).options(*loader_options(profile))
     
     if order_type:
-        query = query.filter(Order.order_type == order_type)
+        query = query.where(Order.order_type == order_type)
     if status:
-        query = query.filter(Order.status == status)
+        query = query.where(Order.status == status)
+    if start_date:
+        query = query.where(Order.created_at >= start_date)
+    if end_date:
+        query = query.where(Order.created_at < end_date)
+    if table_id:
+        query = query.where(Order.table_id == table_id)
+    if customer_id:
+        query = query.where(Order.customer_id == customer_id)
+    if created_by:
+        query = query.where(Order.created_by == created_by)
+    
+    if cursor:
+        try:
+            cursor_created_at, cursor_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.where(tuple_(Order.created_at, Order.id) < (cursor_created_at, cursor_id))
+    
+    query = query.order_by(Order.created_at.desc(), Order.id.desc())
+    
+    if limit is None:
+        return (await db.scalars(query)).all()
     
-    orders = query.order_by(Order.created_at.desc()).all()
+    # Fetch one extra row to know whether another page exists
+    orders = (await db.scalars(query.limit(limit + 1))).all()
+    if len(orders) > limit:
+        orders = orders[:limit]
+        last = orders[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.created_at, last.id)
     return orders
 
 
 @router.get("/{order_id}", response_model=OrderResponse)
 async def get_order(
     order_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
-    """Get order by ID with items"""
-    order = db.query(Order).options(
-        joinedload(Order.table),
-        joinedload(Order.customer),
-        joinedload(Order.items).joinedload(OrderItem.menu_item),
-        joinedload(Order.kots).joinedload(KOT.items).joinedload(KOTItem.menu_item)
-    ).filter(Order.id == order_id).first()
+    """Get order by ID with items; archived orders are read from cold storage"""
+    order = await db.scalar(select(Order).options(*loader_options("order_full")).where(Order.id == order_id))
     
+    if not order:
+        order = await db.run_sync(OrderArchiveService.get_archived_order, order_id)
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     
@@ -62,135 +144,141 @@ async def get_order(
 @router.post("", response_model=OrderResponse)
 async def create_order(
     order_data: dict = Body(...),
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_branch_user)
 ):
-    """Create a new order"""
-    items_data = order_data.pop('items', [])
-    
-    if 'order_number' not in order_data:
-        order_data['order_number'] = f"ORD-{datetime.now().strftime('%Y%m%d')}-{random.randint(1000, 9999)}"
-    order_data['created_by'] = current_user.id
-    
-    # Calculate amounts if not provided
-    if 'gross_amount' not in order_data:
-        order_data['gross_amount'] = order_data.get('total_amount', 0)
-    if 'net_amount' not in order_data:
-        discount = order_data.get('discount', 0)
-        order_data['net_amount'] = order_data['gross_amount'] - discount
-    
-    # Sync total_amount with net_amount for consistency
-    if 'total_amount' not in order_data or order_data.get('total_amount') == 0:
-        order_data['total_amount'] = order_data.get('net_amount', 0)
-    
-    new_order = Order(**order_data)
-    db.add(new_order)
-    db.flush() # Get ID before adding items
+    """Create a new order; line prices and amounts are computed on the server"""
+    try:
+        orders = await db.run_sync(OrderService.create_orders, [order_data], current_user)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if orders[0] is None:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail=f"Order number already exists: {order_data['order_number']}")
+    await db.commit()
+    return orders[0]
+
+
+@router.post("/batch", response_model=List[OrderResponse])
+async def create_orders_batch(
+    orders_data: List[dict] = Body(...),
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_branch_user)
+):
+    """
+    Create many orders in one request, e.g. orders queued by an offline POS.
+
+    Orders whose `order_number` already exists are returned as stored instead
+    of being created again, so a terminal can safely retry a failed sync.
+    Results are returned in request order. A number taken by an order this
+    token can't see (another branch) fails the whole batch with a 409 that
+    lists the numbers.
+    """
+    if len(orders_data) > MAX_BATCH_ORDERS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_ORDERS} orders per batch")
     
-    # Add items
-    for item in items_data:
-        order_item = OrderItem(
-            order_id=new_order.id,
-            menu_item_id=item['menu_item_id'],
-            quantity=item['quantity'],
-            price=item.get('price', 0),
-            subtotal=item.get('subtotal', item.get('price', 0) * item['quantity']),
-            notes=item.get('notes', '')
+    numbers = [data['order_number'] for data in orders_data if data.get('order_number')]
+    by_number = {}
+    if numbers:
+        existing = await db.scalars(
+            select(Order).options(*loader_options("order_full")).where(Order.order_number.in_(numbers))
         )
-        db.add(order_item)
+        by_number = {order.order_number: order for order in existing}
     
-    # Update table status to Occupied if table order
-    if new_order.table_id:
-        table = db.query(Table).filter(Table.id == new_order.table_id).first()
-        if table:
-            table.status = "Occupied"
-    
-    # Update customer stats if Paid
-    if new_order.status in ['Paid', 'Completed'] and new_order.customer_id:
-        customer = db.query(Customer).filter(Customer.id == new_order.customer_id).first()
-        if customer:
-            customer.total_visits += 1
-            customer.total_spent += new_order.net_amount
-            customer.due_amount += new_order.credit_amount
-            customer.updated_at = datetime.now()
-
-    db.commit()
-    db.refresh(new_order)
+    # Skip orders that were already synced or repeat a number within the batch
+    seen = set(by_number)
+    new_orders = []
+    for data in orders_data:
+        number = data.get('order_number')
+        if number and number in seen:
+            continue
+        if number:
+            seen.add(number)
+        new_orders.append(data)
     
-    # Reload with relationships
-    order = db.query(Order).options(
-        joinedload(Order.table),
-        joinedload(Order.customer),
-        joinedload(Order.items).joinedload(OrderItem.menu_item),
-        joinedload(Order.kots).joinedload(KOT.items).joinedload(KOTItem.menu_item)
-    ).filter(Order.id == new_order.id).first()
+    created = []
+    if new_orders:
+        try:
+            created = await db.run_sync(OrderService.create_orders, new_orders, current_user)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        # Not inserted: synced by a concurrent retry, or the number is taken elsewhere
+        skipped = [data.get('order_number') for data, order in zip(new_orders, created) if order is None]
+        if skipped:
+            stored = await db.scalars(
+                select(Order).options(*loader_options("order_full")).where(Order.order_number.in_(skipped))
+            )
+            by_number.update((order.order_number, order) for order in stored)
+            conflicts = [number for number in skipped if number not in by_number]
+            if conflicts:
+                await db.rollback()
+                raise HTTPException(
+                    status_code=409, detail=f"Order numbers already in use: {', '.join(map(str, conflicts))}"
+                )
+        await db.commit()
     
-    return order
+    created_for = {id(data): order for data, order in zip(new_orders, created) if order is not None}
+    by_number.update((order.order_number, order) for order in created_for.values())
+    return [created_for.get(id(data)) or by_number[data['order_number']] for data in orders_data]
 
 
 @router.put("/{order_id}", response_model=OrderResponse)
 async def update_order(
     order_id: int,
     order_data: dict = Body(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Update an order"""
-    order = db.query(Order).filter(Order.id == order_id).first()
-    if not order:
-        raise HTTPException(status_code=404, detail="Order not found")
+    order = await get_order_or_404(db, order_id)
+    
+    served_kots = []
     
-    old_status = order.status
+    # Capture the order's current rollup contribution before anything changes
+    rollup_before = await rollup_snapshot(db, order)
     
     # Separate items if they exist
     items_data = order_data.pop('items', None)
     
-    for key, value in order_data.items():
-        if hasattr(order, key):
-            setattr(order, key, value)
+    for key in EDITABLE_FIELDS & order_data.keys():
+        setattr(order, key, order_data[key])
     
-    # Update items if provided
-    if items_data is not None:
-        # Simple approach: clear and re-add
-        # For a more robust system, we would diff them.
-        db.query(OrderItem).filter(OrderItem.order_id == order.id).delete()
-        for item_data in items_data:
-            new_order_item = OrderItem(
-                order_id=order.id,
-                menu_item_id=item_data['menu_item_id'],
-                quantity=item_data['quantity'],
-                price=item_data.get('price', 0),
-                subtotal=item_data.get('subtotal', item_data.get('price', 0) * item_data['quantity']),
-                notes=item_data.get('notes', '')
-            )
-            db.add(new_order_item)
-    
-    # Recalculate amounts if items were updated or specific amounts provided
-    if items_data is not None:
-        total = sum(item['price'] * item['quantity'] for item in items_data)
-        order.gross_amount = total
-        order.net_amount = total - order.discount
-        order.total_amount = order.net_amount
-    elif 'gross_amount' in order_data or 'discount' in order_data:
-        order.net_amount = order.gross_amount - order.discount
-        order.total_amount = order.net_amount
+    try:
+        if order_data.get('discount_rule_id') is not None:
+            await db.run_sync(PricingService.check_discount_rule, order_data['discount_rule_id'])
+        
+        # Update items if provided, writing only the lines that changed
+        if items_data is not None:
+            await db.run_sync(OrderService.sync_items, order.id, items_data)
+        
+        # Recompute amounts from the stored lines when anything affecting them changed
+        if items_data is not None or PRICING_FIELDS & order_data.keys():
+            await db.run_sync(OrderService.recalculate_totals, order)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     # Handle KOT status when order status changes
     if 'status' in order_data:
         new_status = order_data['status']
         if new_status in ['Paid', 'Completed']:
             # Mark all associated KOTs as Served when payment is done
-            db.query(KOT).filter(KOT.order_id == order.id).update({"status": "Served"})
+            served_kots = (await db.execute(
+                select(KOT.id, KOT.status).where(
+                    KOT.order_id == order.id,
+                    KOT.status != "Served"
+                )
+            )).all()
+            await db.execute(update(KOT).where(KOT.order_id == order.id).values(status="Served"))
             
             # Update table status if applicable
             if order.table_id:
-                table = db.query(Table).filter(Table.id == order.table_id).first()
+                table = await db.get(Table, order.table_id)
                 if table:
                     table.status = "Available"
             
             # Update customer stats if applicable
             if order.customer_id:
-                customer = db.query(Customer).filter(Customer.id == order.customer_id).first()
+                customer = await db.get(Customer, order.customer_id)
                 if customer:
                     customer.total_visits += 1
                     customer.total_spent += order.net_amount
@@ -199,62 +287,129 @@ async def update_order(
             
             # Update active POS Session for the current user
             if current_user:
-                active_session = db.query(POSSession).filter(
-                    POSSession.user_id == current_user.id,
-                    POSSession.status == "Active"
-                ).first()
+                active_session = await db.scalar(
+                    select(POSSession).where(
+                        POSSession.user_id == current_user.id,
+                        POSSession.status == "Active"
+                    ).limit(1)
+                )
                 
                 if active_session:
                     # Update session stats
                     active_session.total_sales += order.net_amount
                     active_session.total_orders += 1
                     active_session.updated_at = datetime.now()
+                    order.pos_session_id = active_session.id
                     
         elif new_status == 'Cancelled':
             # Optionally mark KOTs as Cancelled too? The user didn't ask, but it makes sense.
             # However, I'll stick to 'Served' for payment as requested.
             if order.table_id:
-                table = db.query(Table).filter(Table.id == order.table_id).first()
+                table = await db.get(Table, order.table_id)
                 if table:
                     table.status = "Available"
         elif new_status == 'BillRequested' and order.table_id:
-            table = db.query(Table).filter(Table.id == order.table_id).first()
+            table = await db.get(Table, order.table_id)
             if table:
                 table.status = "BillRequested"
         elif new_status in ['Pending', 'In Progress'] and order.table_id:
-            table = db.query(Table).filter(Table.id == order.table_id).first()
+            table = await db.get(Table, order.table_id)
             if table:
                 table.status = "Occupied"
     
-    db.commit()
+    # Move the order between hourly sales rollups, or correct its amounts and items there
+    await db.run_sync(SalesRollupService.record_change, rollup_before, order)
     
-    # Reload with relationships
-    updated_order = db.query(Order).options(
-        joinedload(Order.table),
-        joinedload(Order.customer),
-        joinedload(Order.items).joinedload(OrderItem.menu_item)
-    ).filter(Order.id == order_id).first()
+    await db.commit()
+    
+    # Let kitchen displays drop tickets that were served with the payment
+    for kot_id, kot_status in served_kots:
+        await db.run_sync(publish_kot_event, kot_id, "status_changed", previous_status=kot_status)
     
-    return updated_order
+    # Reload with relationships
+    return await reload_order(db, order_id)
 
 
 @router.delete("/{order_id}")
 async def delete_order(
     order_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Delete an order"""
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = await db.get(Order, order_id)
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     
     # Reset table status if this was a table order
     if order.table_id:
-        table = db.query(Table).filter(Table.id == order.table_id).first()
+        table = await db.get(Table, order.table_id)
         if table:
             table.status = "Available"
     
-    db.delete(order)
-    db.commit()
+    # Remove the order's contribution from the sales rollups
+    if order.status in ROLLUP_STATUSES:
+        snapshot = await db.run_sync(SalesRollupService.snapshot, order)
+        await db.run_sync(SalesRollupService.apply, snapshot, sign=-1)
+    
+    await db.delete(order)
+    await db.commit()
     return {"message": "Order deleted successfully"}
+
+
+@router.post("/{order_id}/items", response_model=OrderResponse)
+async def add_order_item(
+    order_id: int,
+    item_data: dict = Body(...),
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    """Append a single line, priced from the menu, to an order"""
+    order = await get_order_or_404(db, order_id)
+    rollup_before = await rollup_snapshot(db, order)
+    try:
+        await db.run_sync(OrderService.add_item, order, item_data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    await db.run_sync(SalesRollupService.record_change, rollup_before, order)
+    await db.commit()
+    return await reload_order(db, order_id)
+
+
+@router.patch("/{order_id}/items/{item_id}", response_model=OrderResponse)
+async def update_order_item(
+    order_id: int,
+    item_id: int,
+    item_data: dict = Body(...),
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    """Change the quantity or notes of a single line on an order"""
+    order = await get_order_or_404(db, order_id)
+    rollup_before = await rollup_snapshot(db, order)
+    try:
+        item = await db.run_sync(OrderService.update_item, order, item_id, item_data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not item:
+        raise HTTPException(status_code=404, detail="Order item not found")
+    await db.run_sync(SalesRollupService.record_change, rollup_before, order)
+    await db.commit()
+    return await reload_order(db, order_id)
+
+
+@router.delete("/{order_id}/items/{item_id}", response_model=OrderResponse)
+async def remove_order_item(
+    order_id: int,
+    item_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    """Remove a single line from an order"""
+    order = await get_order_or_404(db, order_id)
+    rollup_before = await rollup_snapshot(db, order)
+    if not await db.run_sync(OrderService.remove_item, order, item_id):
+        raise HTTPException(status_code=404, detail="Order item not found")
+    await db.run_sync(SalesRollupService.record_change, rollup_before, order)
+    await db.commit()
+    return await reload_order(db, order_id)
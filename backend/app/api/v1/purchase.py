@@ -3,12 +3,11 @@ Purchase management routes
 """
 from fastapi import APIRouter, Depends, Body
 from sqlalchemy.orm import Session
-import random
-from datetime import datetime
 
 from app.database import get_db
 from app.dependencies import get_current_user
 from app.models import Supplier, PurchaseBill, PurchaseReturn
+from app.services.document_number_service import DocumentNumberService
 
 router = APIRouter()
 
@@ -54,7 +53,7 @@ async def create_bill(
     current_user = Depends(get_current_user)
 ):
     """Create a new purchase bill"""
-    bill_data['bill_number'] = f"PO-{datetime.now().strftime('%Y%m%d')}-{random.randint(1000, 9999)}"
+    bill_data['bill_number'] = DocumentNumberService.next_number(db, "purchase_bill")
     new_bill = PurchaseBill(**bill_data)
     db.add(new_bill)
     db.commit()
@@ -79,7 +78,7 @@ async def create_return(
     current_user = Depends(get_current_user)
 ):
     """Create a new purchase return"""
-    return_data['return_number'] = f"RET-{datetime.now().strftime('%Y%m%d')}-{random.randint(1000, 9999)}"
+    return_data['return_number'] = DocumentNumberService.next_number(db, "purchase_return")
     new_return = PurchaseReturn(**return_data)
     db.add(new_return)
     db.commit()
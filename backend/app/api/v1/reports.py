@@ -1,171 +1,123 @@
 """
 Reports and export routes
 """
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
-from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse, FileResponse, PlainTextResponse
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, Dict, Any
+import asyncio
+from datetime import datetime, timedelta
 
-from app.database import get_db
-from app.dependencies import get_current_user
+from app.database import get_async_db
+from app.dependencies import get_current_user, get_scoped_user, check_admin_role, require_tenant_scope
 from app.models import Order
-from app.utils.pdf_generator import generate_pdf_report, generate_invoice_pdf
-from app.utils.excel_generator import generate_excel_report
+from app.services.dashboard_service import DashboardService
+from app.services.loader_profiles import loader_options
+from app.services.report_service import ReportService
+from app.services.session_report_service import SessionReportService
+from app.services.report_job_service import report_jobs, ReportJob, REPORT_FORMATS
+from app.services.rollup_service import SalesRollupService
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.utils.receipt_cache import receipt_templates
+from app.utils.receipt_renderer import DEFAULT_RECEIPT_WIDTH
+from app.utils.streaming_export import stream_csv, stream_xlsx
 
 router = APIRouter()
 
+# Largest page of the paginated report listings
+MAX_PAGE_SIZE = 500
 
-@router.get("/dashboard-summary")
-async def get_dashboard_summary(
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
-):
-    """Get summarized data for the admin dashboard - Last 24 Hours"""
-    from app.models import Table, Order
-    from datetime import timedelta
-    
-    total_tables = db.query(Table).count()
-    occupied_tables = db.query(Table).filter(Table.status == 'Occupied').count()
-    occupancy = (occupied_tables / total_tables * 100) if total_tables > 0 else 0
-    
-    # Last 24 hours instead of calendar day
-    twenty_four_hours_ago = datetime.now() - timedelta(hours=24)
-    orders_24h_list = db.query(Order).filter(Order.created_at >= twenty_four_hours_ago).all()
-    
-    # Sales breakdown
-    sales_24h = sum(order.net_amount or 0 for order in orders_24h_list)
-    paid_sales = sum(order.paid_amount or 0 for order in orders_24h_list)
-    credit_sales = sum(order.credit_amount or 0 for order in orders_24h_list)
-    discount = sum(order.discount or 0 for order in orders_24h_list)
-    
-    # Order type breakdown - Table and Dine-In are the same
-    dine_in_count = len([o for o in orders_24h_list if o.order_type in ['Dine-In', 'Table']])
-    takeaway_count = len([o for o in orders_24h_list if o.order_type == 'Takeaway'])
-    delivery_count = len([o for o in orders_24h_list if o.order_type == 'Delivery'])
+# Rows fetched per round trip by streaming exports
+EXPORT_BATCH_SIZE = 1000
 
-    # Outstanding revenue (all time credit)
-    outstanding_revenue = sum(order.credit_amount or 0 for order in db.query(Order).all())
+# Order reports that are streamed row by row: report type -> title
+STREAMED_REPORTS = {"day-book": "Day Book", "orders": "Order History"}
 
-    # Top 3 items with outstanding revenue (from credit orders)
-    from app.models import OrderItem, MenuItem
-    from sqlalchemy import func
-    
-    # Get all order items from orders with credit
-    credit_orders = db.query(Order).filter(Order.credit_amount > 0).all()
-    credit_order_ids = [o.id for o in credit_orders]
+
+class ReportJobRequest(BaseModel):
+    report_type: str  # sales-summary, day-book, orders, sessions
+    format: str = "pdf"  # pdf, xlsx
+    params: Dict[str, Any] = {}
+
+
+async def stream_order_export(
+    db: AsyncSession,
+    report_type: str,
+    file_format: str,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    status: Optional[str] = None,
+    order_type: Optional[str] = None
+) -> StreamingResponse:
+    """Stream an order report as CSV or XLSX straight from a server-side cursor"""
+    if report_type == "day-book":
+        start_date = datetime.combine(datetime.now().date(), datetime.min.time())
+        end_date = None
+    header, query = ReportService.order_export_query(start_date, end_date, status, order_type)
     
-    if credit_order_ids:
-        # Aggregate by menu item
-        top_items_query = db.query(
-            MenuItem.name,
-            func.sum(OrderItem.quantity * OrderItem.price).label('total_credit')
-        ).join(
-            OrderItem, MenuItem.id == OrderItem.menu_item_id
-        ).filter(
-            OrderItem.order_id.in_(credit_order_ids)
-        ).group_by(
-            MenuItem.id, MenuItem.name
-        ).order_by(
-            func.sum(OrderItem.quantity * OrderItem.price).desc()
-        ).limit(3).all()
-        
-        top_outstanding_items = [
-            {"name": item.name, "amount": float(item.total_credit)}
-            for item in top_items_query
-        ]
-    else:
-        top_outstanding_items = []
+    async def batches():
+        result = await db.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for partition in result.partitions():
+            yield partition
     
-    # Top selling items (by total revenue in last 24h) for comparison
-    if orders_24h_list:
-        order_24h_ids = [o.id for o in orders_24h_list]
-        top_selling_query = db.query(
-            MenuItem.name,
-            func.sum(OrderItem.quantity).label('total_quantity'),
-            func.sum(OrderItem.quantity * OrderItem.price).label('total_revenue')
-        ).join(
-            OrderItem, MenuItem.id == OrderItem.menu_item_id
-        ).filter(
-            OrderItem.order_id.in_(order_24h_ids)
-        ).group_by(
-            MenuItem.id, MenuItem.name
-        ).order_by(
-            func.sum(OrderItem.quantity * OrderItem.price).desc()
-        ).limit(3).all()
-        
-        top_selling_items = [
-            {
-                "name": item.name, 
-                "quantity": int(item.total_quantity),
-                "revenue": float(item.total_revenue)
-            }
-            for item in top_selling_query
-        ]
+    if file_format == "csv":
+        content, media_type = stream_csv(header, batches()), "text/csv; charset=utf-8"
     else:
-        top_selling_items = []
-
-    # Sales by area/floor
-    from app.models import Floor
-    sales_by_area = []
-    floors = db.query(Floor).all()
-    for floor in floors:
-        floor_tables = [t.id for t in floor.tables] if floor.tables else []
-        floor_sales = sum(
-            order.net_amount or 0 
-            for order in orders_24h_list 
-            if order.table_id in floor_tables
-        )
-        if floor_sales > 0:
-            sales_by_area.append({
-                "area": floor.name,
-                "amount": floor_sales
-            })
-    
-    # Peak time data - 24 hourly slots
-    peak_time_data = [0] * 24
-    hourly_sales = [0.0] * 24
-    
-    for order in orders_24h_list:
-        if order.created_at:
-            hours_ago = int((datetime.now() - order.created_at).total_seconds() / 3600)
-            if 0 <= hours_ago < 24:
-                index = 23 - hours_ago
-                peak_time_data[index] += 1
-                hourly_sales[index] += (order.net_amount or 0)
+        content, media_type = stream_xlsx(header, batches(), STREAMED_REPORTS[report_type]), REPORT_FORMATS["xlsx"]
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={report_type}.{file_format}"}
+    )
 
-    return {
-        "occupancy": round(occupancy, 1),
-        "total_tables": total_tables,
-        "occupied_tables": occupied_tables,
-        "sales_24h": sales_24h,
-        "paid_sales": paid_sales,
-        "credit_sales": credit_sales,
-        "discount": discount,
-        "orders_24h": len(orders_24h_list),
-        "dine_in_count": dine_in_count,
-        "takeaway_count": takeaway_count,
-        "delivery_count": delivery_count,
-        "outstanding_revenue": outstanding_revenue,
-        "top_outstanding_items": top_outstanding_items,
-        "top_selling_items": top_selling_items,
-        "sales_by_area": sales_by_area,
-        "peak_time_data": peak_time_data,
-        "hourly_sales": hourly_sales,
-        "period": "Last 24 Hours"
-    }
+
+async def submit_report_job(db: AsyncSession, user, report_type: str, file_format: str,
+                            params: Optional[dict] = None) -> ReportJob:
+    """Submit a report job for a user, turning bad requests into a 400"""
+    try:
+        return await report_jobs.submit(db, user.id, report_type, file_format, params)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
+def report_file_response(job: ReportJob) -> FileResponse:
+    """Download response for a finished report job"""
+    if job.status == "failed":
+        raise HTTPException(status_code=500, detail=f"Report generation failed: {job.error}")
+    if job.status != "done":
+        raise HTTPException(status_code=409, detail="Report is not ready yet")
+    return FileResponse(job.path, media_type=job.media_type, filename=job.filename)
+
+
+async def render_report_file(db: AsyncSession, user, report_type: str, file_format: str,
+                             params: Optional[dict] = None) -> FileResponse:
+    """Render a report in the job workers and wait for it without blocking the event loop"""
+    job = await submit_report_job(db, user, report_type, file_format, params)
+    await job.done.wait()
+    return report_file_response(job)
+
+
+@router.get("/dashboard-summary")
+async def get_dashboard_summary(
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    """Get summarized data for the admin dashboard - Last 24 Hours"""
+    return await db.run_sync(DashboardService.get_summary)
 
 
 @router.get("/sales-summary")
 async def get_sales_summary(
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_scoped_user)
 ):
-    """Get sales summary"""
-    orders = db.query(Order).filter(Order.status == 'Completed').all()
-    total_sales = sum(order.total_amount or 0 for order in orders)
-    total_orders = len(orders)
+    """Get sales summary (read from the hourly sales rollups)"""
+    totals = await db.run_sync(SalesRollupService.get_sales_totals, statuses=['Completed'])
+    total_sales = totals["net_amount"]
+    total_orders = totals["order_count"]
     return {
         "total_sales": total_sales,
         "total_orders": total_orders,
@@ -173,86 +125,139 @@ async def get_sales_summary(
     }
 
 
+@router.get("/hourly-sales")
+async def get_hourly_sales(
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_scoped_user)
+):
+    """Get hourly sales by order type and payment type (defaults to today)"""
+    start_date = start_date or datetime.combine(datetime.now().date(), datetime.min.time())
+    end_date = end_date or start_date + timedelta(days=1)
+    return await db.run_sync(SalesRollupService.get_hourly_sales, start_date, end_date)
+
+
+@router.get("/item-sales")
+async def get_item_sales(
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_scoped_user)
+):
+    """Get quantity and revenue per menu item (defaults to today)"""
+    start_date = start_date or datetime.combine(datetime.now().date(), datetime.min.time())
+    end_date = end_date or start_date + timedelta(days=1)
+    return await db.run_sync(SalesRollupService.get_item_sales, start_date, end_date)
+
+
+@router.post("/rollups/rebuild")
+async def rebuild_sales_rollups(
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(check_admin_role)
+):
+    """Recompute the hourly sales rollups of the token's branches from order history (Admin only)"""
+    require_tenant_scope()
+    return await db.run_sync(SalesRollupService.rebuild)
+
+
 @router.get("/day-book")
 async def get_day_book(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Get day book (all transactions for today)"""
     today = datetime.now().date()
-    orders = db.query(Order).filter(Order.created_at >= today).all()
+    orders = (await db.scalars(select(Order).where(Order.created_at >= today))).all()
     return orders
 
 
 @router.get("/export/pdf/{report_type}")
 async def export_pdf(
     report_type: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
-    """Export report as PDF"""
-    if report_type == "sales-summary":
-        result = await get_sales_summary(db, current_user)
-        data = [{"Metric": k, "Value": v} for k, v in result.items()]
-        pdf_buffer = generate_pdf_report(data, "Sales Summary")
-    elif report_type == "day-book":
-        orders = await get_day_book(db, current_user)
-        data = [{"Order Number": o.order_number, "Total": o.total_amount, "Date": str(o.created_at)} for o in orders]
-        pdf_buffer = generate_pdf_report(data, "Day Book")
-    else:
+    """Export report as PDF (rendered by the report job workers)"""
+    if report_type not in ("sales-summary", "day-book"):
         raise HTTPException(status_code=404, detail="Report type not found")
-    
-    return StreamingResponse(
-        pdf_buffer,
-        media_type="application/pdf",
-        headers={"Content-Disposition": f"attachment; filename={report_type}.pdf"}
-    )
+    return await render_report_file(db, current_user, report_type, "pdf")
 
 
 @router.get("/export/excel/{report_type}")
 async def export_excel(
     report_type: str,
-    db: Session = Depends(get_db),
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    status: Optional[str] = None,
+    order_type: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
-    """Export report as Excel"""
+    """
+    Export report as Excel.
+
+    `day-book` (today's orders) and `orders` (order history, filtered by the
+    query parameters) are streamed in constant memory.
+    """
+    if report_type in STREAMED_REPORTS:
+        return await stream_order_export(db, report_type, "xlsx", start_date, end_date, status, order_type)
     if report_type == "sales-summary":
-        result = await get_sales_summary(db, current_user)
-        data = [{"Metric": k, "Value": v} for k, v in result.items()]
-        excel_buffer = generate_excel_report(data, "Sales Summary")
-    elif report_type == "day-book":
-        orders = await get_day_book(db, current_user)
-        data = [{"Order Number": o.order_number, "Total": o.total_amount, "Date": str(o.created_at)} for o in orders]
-        excel_buffer = generate_excel_report(data, "Day Book")
-    else:
+        return await render_report_file(db, current_user, report_type, "xlsx")
+    raise HTTPException(status_code=404, detail="Report type not found")
+
+
+@router.get("/export/csv/{report_type}")
+async def export_csv(
+    report_type: str,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    status: Optional[str] = None,
+    order_type: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    """Export `day-book` or `orders` (order history) as a streamed CSV file"""
+    if report_type not in STREAMED_REPORTS:
         raise HTTPException(status_code=404, detail="Report type not found")
-    
-    return StreamingResponse(
-        excel_buffer,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": f"attachment; filename={report_type}.xlsx"}
-    )
+    return await stream_order_export(db, report_type, "csv", start_date, end_date, status, order_type)
 
 
 @router.get("/orders/{order_id}/invoice")
 async def get_order_invoice(
     order_id: int,
-    db: Session = Depends(get_db),
+    format: str = "pdf",  # pdf, text, escpos
+    width: int = Query(DEFAULT_RECEIPT_WIDTH, ge=24, le=64),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
-    """Generate invoice PDF for an order"""
-    order = db.query(Order).filter(Order.id == order_id).first()
+    """
+    Render an order's invoice with the branch's receipt template.
+
+    `text` returns a plain-text receipt and `escpos` raw ESC/POS bytes for
+    thermal printers, both `width` characters wide; `pdf` returns a PDF.
+    """
+    if format not in ("pdf", "text", "escpos"):
+        raise HTTPException(status_code=400, detail="format must be pdf, text or escpos")
+    order = await db.scalar(
+        select(Order).options(*loader_options("order_summary")).where(Order.id == order_id)
+    )
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     
-    order_data = {
-        "order_number": order.order_number,
-        "customer": {"name": order.customer.name if order.customer else None},
-        "table": {"table_id": order.table.table_id if order.table else None},
-        "items": []
-    }
+    template = await db.run_sync(receipt_templates.get, order.branch_id or current_user.current_branch_id)
+    invoice = ReportService.invoice_data(order)
+    if format == "text":
+        return PlainTextResponse(template.render_text(invoice, width))
+    if format == "escpos":
+        return Response(
+            template.render_escpos(invoice, width),
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": f"attachment; filename=receipt_{order.order_number}.bin"}
+        )
     
-    pdf_buffer = generate_invoice_pdf(order_data)
+    # Building the PDF takes tens of milliseconds; keep it off the event loop
+    pdf_buffer = await asyncio.to_thread(template.render_pdf, invoice)
     return StreamingResponse(
         pdf_buffer,
         media_type="application/pdf",
@@ -262,99 +267,96 @@ async def get_order_invoice(
 
 @router.get("/sessions")
 async def get_sessions_report(
-    db: Session = Depends(get_db),
+    response: Response,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    user_id: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
-    """Get all POS sessions for reporting"""
-    from app.models.pos_session import POSSession
-    from app.models.auth import User
+    """
+    Get POS sessions for reporting, newest first, with sales worked out from
+    the orders settled in each session.
+
+    Pass `limit` to page through results; the cursor for the next page is
+    returned in the X-Next-Cursor header.
+    """
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
     
-    sessions = db.query(POSSession).order_by(POSSession.start_time.desc()).all()
+    # Fetch one extra row to know whether another page exists
+    sessions = await db.run_sync(
+        SessionReportService.get_sessions, start_date, end_date, user_id,
+        limit + 1 if limit is not None else None, after
+    )
+    if limit is not None and len(sessions) > limit:
+        sessions = sessions[:limit]
+        last = sessions[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last["start_time"], last["id"])
     
-    result = []
     for session in sessions:
-        user = db.query(User).filter(User.id == session.user_id).first()
-        result.append({
-            "id": session.id,
-            "user_id": session.user_id,
-            "user_name": user.full_name if user else "Unknown",
-            "start_time": session.start_time.isoformat() if session.start_time else None,
-            "end_time": session.end_time.isoformat() if session.end_time else None,
-            "status": session.status,
-            "opening_balance": session.opening_balance,
-            "closing_balance": session.closing_balance,
-            "total_sales": session.total_sales,
-            "total_orders": session.total_orders,
-            "notes": session.notes
-        })
-    
-    return result
+        session["start_time"] = session["start_time"].isoformat() if session["start_time"] else None
+        session["end_time"] = session["end_time"].isoformat() if session["end_time"] else None
+    return sessions
 
 
 @router.get("/export/sessions/pdf")
 async def export_sessions_pdf(
-    db: Session = Depends(get_db),
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    user_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
-    """Export session report as PDF"""
-    from app.models.pos_session import POSSession
-    from app.models.auth import User
-    from io import BytesIO
-    from reportlab.lib.pagesizes import A4, landscape
-    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-    from reportlab.lib.styles import getSampleStyleSheet
-    from reportlab.lib import colors
-    from reportlab.lib.units import inch
-    
-    sessions = db.query(POSSession).order_by(POSSession.start_time.desc()).all()
-    
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=landscape(A4))
-    elements = []
-    styles = getSampleStyleSheet()
-    
-    # Title
-    title = Paragraph("<b>Session Report</b>", styles['Title'])
-    elements.append(title)
-    elements.append(Spacer(1, 0.3 * inch))
-    
-    # Prepare table data
-    table_data = [['Session ID', 'Staff', 'Start Time', 'End Time', 'Status', 'Opening', 'Closing', 'Sales', 'Orders']]
-    
-    for session in sessions:
-        user = db.query(User).filter(User.id == session.user_id).first()
-        table_data.append([
-            f'#{session.id}',
-            user.full_name if user else 'Unknown',
-            session.start_time.strftime('%Y-%m-%d %H:%M') if session.start_time else '-',
-            session.end_time.strftime('%Y-%m-%d %H:%M') if session.end_time else '-',
-            session.status,
-            f'Rs. {session.opening_balance:,.0f}',
-            f'Rs. {session.closing_balance:,.0f}' if session.closing_balance else '-',
-            f'Rs. {session.total_sales:,.0f}',
-            str(session.total_orders)
-        ])
-    
-    # Create table
-    table = Table(table_data)
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('FONTSIZE', (0, 1), (-1, -1), 8),
-    ]))
-    
-    elements.append(table)
-    doc.build(elements)
-    
-    buffer.seek(0)
-    return StreamingResponse(
-        buffer,
-        media_type="application/pdf",
-        headers={"Content-Disposition": "attachment; filename=session_report.pdf"}
+    """Export session report as PDF (rendered by the report job workers)"""
+    return await render_report_file(
+        db, current_user, "sessions", "pdf",
+        {"start_date": start_date, "end_date": end_date, "user_id": user_id}
     )
+
+
+@router.post("/jobs", status_code=202)
+async def create_report_job(
+    job_request: ReportJobRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Start rendering a PDF or Excel report in the background.
+
+    Poll GET /reports/jobs/{job_id} until `status` is `done`, then fetch the
+    file from its `download_url`. Identical requests share one job, and a
+    file rendered earlier is reused while the underlying data is unchanged.
+    """
+    job = await submit_report_job(db, current_user, job_request.report_type, job_request.format, job_request.params)
+    return job.to_dict()
+
+
+@router.get("/jobs/{job_id}")
+async def get_report_job(
+    job_id: str,
+    current_user = Depends(get_current_user)
+):
+    """Get the status of a report job submitted by the current user"""
+    job = report_jobs.get(job_id, current_user.id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Report job not found")
+    return job.to_dict()
+
+
+@router.get("/jobs/{job_id}/download")
+async def download_report_job(
+    job_id: str,
+    current_user = Depends(get_current_user)
+):
+    """Download the file of a finished report job submitted by the current user"""
+    job = report_jobs.get(job_id, current_user.id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Report job not found")
+    return report_file_response(job)
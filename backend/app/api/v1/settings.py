@@ -7,6 +7,7 @@ from typing import List
 from app.database import get_db
 from app.dependencies import get_current_user
 from app.models import User, CompanySettings, PaymentMode, StorageArea, DiscountRule
+from app.utils.settings_cache import settings_cache, bump_settings_version
 from pydantic import BaseModel
 from datetime import datetime
 
@@ -94,22 +95,26 @@ async def get_company_settings(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get company settings"""
-    settings = db.query(CompanySettings).first()
-    if not settings:
-        # Create default settings if none exist
-        settings = CompanySettings(
-            company_name="Dautari Adda",
-            email="fisap73734@ahanim.com",
-            phone="32908409328",
-            address="Kirtipur",
-            vat_pan_no="39284032",
-            registration_no="23432432",
-            start_date="2025-08-26"
-        )
-        db.add(settings)
-        db.commit()
-        db.refresh(settings)
+    """Get company settings (from the settings snapshot)"""
+    company = settings_cache.get(db).company
+    if company is not None:
+        return company
+    
+    # Create default settings if none exist
+    settings = CompanySettings(
+        company_name="Dautari Adda",
+        email="fisap73734@ahanim.com",
+        phone="32908409328",
+        address="Kirtipur",
+        vat_pan_no="39284032",
+        registration_no="23432432",
+        start_date="2025-08-26"
+    )
+    db.add(settings)
+    bump_settings_version(db)
+    db.commit()
+    settings_cache.invalidate()
+    db.refresh(settings)
     return settings
 
 
@@ -134,7 +139,9 @@ async def update_company_settings(
         for key, value in settings_data.model_dump().items():
             setattr(settings, key, value)
     
+    bump_settings_version(db)
     db.commit()
+    settings_cache.invalidate()
     db.refresh(settings)
     return settings
 
@@ -145,8 +152,8 @@ async def get_payment_modes(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get all payment modes"""
-    return db.query(PaymentMode).order_by(PaymentMode.display_order).all()
+    """Get all payment modes (from the settings snapshot)"""
+    return settings_cache.get(db).payment_modes
 
 
 @router.post("/payment-modes", response_model=PaymentModeResponse)
@@ -172,7 +179,9 @@ async def create_payment_mode(
     
     new_payment_mode = PaymentMode(**payment_mode.model_dump())
     db.add(new_payment_mode)
+    bump_settings_version(db)
     db.commit()
+    settings_cache.invalidate()
     db.refresh(new_payment_mode)
     return new_payment_mode
 
@@ -198,7 +207,9 @@ async def update_payment_mode(
     for key, value in payment_mode_data.model_dump().items():
         setattr(payment_mode, key, value)
     
+    bump_settings_version(db)
     db.commit()
+    settings_cache.invalidate()
     db.refresh(payment_mode)
     return payment_mode
 
@@ -221,7 +232,9 @@ async def delete_payment_mode(
         raise HTTPException(status_code=404, detail="Payment mode not found")
     
     db.delete(payment_mode)
+    bump_settings_version(db)
     db.commit()
+    settings_cache.invalidate()
     return {"message": "Payment mode deleted successfully"}
 
 
@@ -231,8 +244,8 @@ async def get_storage_areas(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get all storage areas"""
-    return db.query(StorageArea).all()
+    """Get all storage areas (from the settings snapshot)"""
+    return settings_cache.get(db).storage_areas
 
 
 @router.post("/storage-areas", response_model=StorageAreaResponse)
@@ -250,7 +263,9 @@ async def create_storage_area(
     
     new_storage_area = StorageArea(**storage_area.model_dump())
     db.add(new_storage_area)
+    bump_settings_version(db)
     db.commit()
+    settings_cache.invalidate()
     db.refresh(new_storage_area)
     return new_storage_area
 
@@ -276,7 +291,9 @@ async def update_storage_area(
     for key, value in storage_area_data.model_dump().items():
         setattr(storage_area, key, value)
     
+    bump_settings_version(db)
     db.commit()
+    settings_cache.invalidate()
     db.refresh(storage_area)
     return storage_area
 
@@ -299,7 +316,9 @@ async def delete_storage_area(
         raise HTTPException(status_code=404, detail="Storage area not found")
     
     db.delete(storage_area)
+    bump_settings_version(db)
     db.commit()
+    settings_cache.invalidate()
     return {"message": "Storage area deleted successfully"}
 
 
@@ -309,8 +328,8 @@ async def get_discount_rules(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get all discount rules"""
-    return db.query(DiscountRule).all()
+    """Get all discount rules (from the settings snapshot)"""
+    return settings_cache.get(db).discount_rules
 
 
 @router.post("/discounts", response_model=DiscountRuleResponse)
@@ -328,7 +347,9 @@ async def create_discount_rule(
     
     new_discount = DiscountRule(**discount.model_dump())
     db.add(new_discount)
+    bump_settings_version(db)
     db.commit()
+    settings_cache.invalidate()
     db.refresh(new_discount)
     return new_discount
 
@@ -354,7 +375,9 @@ async def update_discount_rule(
     for key, value in discount_data.model_dump().items():
         setattr(discount, key, value)
     
+    bump_settings_version(db)
     db.commit()
+    settings_cache.invalidate()
     db.refresh(discount)
     return discount
 
@@ -377,5 +400,7 @@ async def delete_discount_rule(
         raise HTTPException(status_code=404, detail="Discount rule not found")
     
     db.delete(discount)
+    bump_settings_version(db)
     db.commit()
+    settings_cache.invalidate()
     return {"message": "Discount rule deleted successfully"}
@@ -9,6 +9,7 @@ from app.dependencies import get_current_user, check_admin_role, get_password_ha
 from app.models import User as DBUser, Role, UserBranchAssignment
 from app.schemas import UserResponse, UserCreateByAdmin, UserUpdate
 from app.config import settings
+from app.utils.principal_cache import principal_cache
 
 router = APIRouter()
 
@@ -127,6 +128,7 @@ async def update_user(
         setattr(user, key, value)
     
     db.commit()
+    principal_cache.invalidate_user(user.id)
     db.refresh(user)
     return user
 
@@ -148,4 +150,5 @@ async def delete_user(
     
     db.delete(user)
     db.commit()
+    principal_cache.invalidate_user(user_id)
     return {"message": "User deleted successfully"}
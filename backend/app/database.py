@@ -1,13 +1,17 @@
 """
 Database configuration and session management
 """
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.exc import OperationalError
 import psycopg2
 from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from pathlib import Path
 from urllib.parse import urlparse
+from uuid import uuid4
 from app.config import settings
+from app.utils.pool_metrics import MeteredQueuePool, MeteredAsyncAdaptedQueuePool, MeteredNullPool
 
 # Base class for models
 Base = declarative_base()
@@ -16,6 +20,73 @@ Base = declarative_base()
 engine = None
 SessionLocal = None
 
+# Async engine for async route handlers (asyncpg driver)
+async_engine = None
+AsyncSessionLocal = None
+
+# Alembic migrations (backend/alembic.ini, backend/migrations)
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+BASELINE_REVISION = "0001"
+
+
+def build_engine(db_url: str, is_async: bool = False):
+    """
+    Create a sync or async engine with the pool settings from app.config
+
+    With DB_TRANSACTION_POOLING (pgbouncer in transaction mode) the client
+    side pool is disabled, asyncpg's prepared statement caches are turned
+    off, and the statement timeout is applied per transaction with
+    SET LOCAL since pgbouncer rejects it as a startup parameter.
+    """
+    statement_timeout = settings.DB_STATEMENT_TIMEOUT_MS
+    if settings.DB_TRANSACTION_POOLING:
+        options = {"poolclass": MeteredNullPool}
+        if is_async:
+            connect_args = {
+                "timeout": settings.DB_CONNECT_TIMEOUT,
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                # Unnamed statements can collide across pgbouncer clients
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__"
+            }
+        else:
+            connect_args = {"connect_timeout": settings.DB_CONNECT_TIMEOUT}
+    else:
+        options = {
+            "poolclass": MeteredAsyncAdaptedQueuePool if is_async else MeteredQueuePool,
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT,
+            "pool_recycle": settings.DB_POOL_RECYCLE
+        }
+        if is_async:
+            connect_args = {
+                "timeout": settings.DB_CONNECT_TIMEOUT,
+                "server_settings": {"statement_timeout": str(statement_timeout)}
+            }
+        else:
+            connect_args = {
+                "connect_timeout": settings.DB_CONNECT_TIMEOUT,
+                "options": f"-c statement_timeout={statement_timeout}"
+            }
+
+    factory = create_async_engine if is_async else create_engine
+    new_engine = factory(
+        db_url,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args=connect_args,
+        **options
+    )
+
+    if settings.DB_TRANSACTION_POOLING:
+        sync_engine = new_engine.sync_engine if is_async else new_engine
+
+        @event.listens_for(sync_engine, "begin")
+        def set_statement_timeout(conn):
+            conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(statement_timeout)}")
+
+    return new_engine
+
 
 def create_database_if_not_exists():
     """Create the database if it doesn't exist (PostgreSQL only)"""
@@ -75,7 +146,7 @@ def create_database_if_not_exists():
 
 
 def init_db():
-    """Initialize database - create database if needed, then create all tables"""
+    """Initialize database - create database if needed, then apply migrations"""
     global engine, SessionLocal
     
     # Import all models to ensure they're registered with Base
@@ -85,7 +156,8 @@ def init_db():
         Supplier, PurchaseBill, PurchaseReturn,
         Table, Session, Order, OrderItem, KOT,
         DeliveryPartner, BillOfMaterials, BOMItem, BatchProduction,
-        POSSession
+        POSSession, SalesHourlyRollup, MenuItemHourlyRollup, DocumentCounter,
+        CacheVersion
     )
     
     # Create database if it doesn't exist (PostgreSQL only)
@@ -93,48 +165,46 @@ def init_db():
         if not create_database_if_not_exists():
             raise Exception("Database creation failed. Please create it manually.")
     
-    # Create database engine with optimized settings
-    engine = create_engine(
-        settings.DATABASE_URL,
-        pool_pre_ping=True,  # Verify connections before using
-        pool_size=5,  # Reduced pool size for better performance
-        max_overflow=10,  # Reduced overflow
-        pool_recycle=3600,  # Recycle connections after 1 hour
-        pool_timeout=30,  # Timeout for getting connection from pool
-        connect_args={
-            "connect_timeout": 10,  # Connection timeout in seconds
-            "options": "-c statement_timeout=30000"  # Query timeout 30 seconds
-        }
-    )
-    
-    # Create session factory
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    # Create database engine and session factory (reused if already created)
+    engine = get_engine()
+    if SessionLocal is None:
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     
-    # Create all tables
+    # Bring the schema up to date
     try:
-        Base.metadata.create_all(bind=engine)
+        run_migrations()
         print("✅ Database tables initialized")
     except OperationalError as e:
         print(f"❌ Error creating tables: {e}")
         raise
 
 
+def run_migrations():
+    """
+    Upgrade the database to the latest Alembic revision
+
+    Databases created by the old create_all startup have tables but no
+    alembic_version; they are stamped at the baseline revision first so only
+    the later migrations run against them. The baseline is the schema from
+    before the rollup tables, which 0001a adds when they are missing.
+    """
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(str(ALEMBIC_INI))
+    with get_engine().begin() as connection:
+        config.attributes["connection"] = connection
+        inspector = inspect(connection)
+        if not inspector.has_table("alembic_version") and inspector.has_table("orders"):
+            command.stamp(config, BASELINE_REVISION)
+        command.upgrade(config, "head")
+
+
 def get_engine():
     """Get the database engine"""
     global engine
     if engine is None:
-        engine = create_engine(
-            settings.DATABASE_URL,
-            pool_pre_ping=True,
-            pool_size=5,
-            max_overflow=10,
-            pool_recycle=3600,
-            pool_timeout=30,
-            connect_args={
-                "connect_timeout": 10,
-                "options": "-c statement_timeout=30000"
-            }
-        )
+        engine = build_engine(settings.DATABASE_URL)
     return engine
 
 
@@ -152,3 +222,51 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_async_database_url(db_url: str) -> str:
+    """Translate the configured PostgreSQL URL to the asyncpg driver"""
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if db_url.startswith(prefix):
+            return "postgresql+asyncpg://" + db_url[len(prefix):]
+    return db_url
+
+
+def get_async_engine():
+    """Get the async database engine"""
+    global async_engine
+    if async_engine is None:
+        async_engine = build_engine(get_async_database_url(settings.DATABASE_URL), is_async=True)
+    return async_engine
+
+
+def get_pool_metrics() -> dict:
+    """Checkout, wait and overflow metrics for the engines created so far"""
+    metrics = {}
+    if engine is not None:
+        metrics["sync"] = engine.pool.get_metrics()
+    if async_engine is not None:
+        metrics["async"] = async_engine.sync_engine.pool.get_metrics()
+    return metrics
+
+
+async def get_async_db():
+    """
+    Async database dependency for FastAPI routes
+    Yields an AsyncSession and closes it after use.
+
+    Objects are not expired on commit so they can be serialized after the
+    handler returns without another (awaitable) load. Existing synchronous
+    query code runs on it through `await db.run_sync(fn, ...)`.
+    """
+    global AsyncSessionLocal
+    if AsyncSessionLocal is None:
+        AsyncSessionLocal = async_sessionmaker(
+            bind=get_async_engine(),
+            class_=AsyncSession,
+            autoflush=False,
+            expire_on_commit=False
+        )
+    
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -2,7 +2,7 @@
 Dependencies for FastAPI routes (authentication, authorization, etc.)
 """
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Set
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
@@ -12,6 +12,9 @@ from sqlalchemy.orm import Session
 from app.config import settings
 from app.database import get_db
 from app.models import User as DBUser
+from app.models.tenancy import BranchRequiredError, scope_branch_ids, write_branch_id
+from app.utils.principal_cache import principal_cache
+from app.utils.tenant_scope import get_tenant_scope, set_tenant_scope
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -54,11 +57,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
 
 # ============ Authentication Dependencies ============
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> DBUser:
-    """Get the current authenticated user from JWT token"""
+def authenticate_token(token: str, db: Session) -> DBUser:
+    """Resolve a bearer token to its user and set the request's tenant scope"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -68,17 +68,97 @@ async def get_current_user(
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         username: str = payload.get("sub")
         role: str = payload.get("role")
+        jti: Optional[str] = payload.get("jti")
         if username is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
     
+    # Limit the request's queries to the token's branch/organization
+    set_tenant_scope(payload.get("organization_id"), payload.get("branch_id"))
+    
+    # Warm path: token already resolved to a user
+    if jti:
+        user = principal_cache.get(jti, db)
+        if user is not None:
+            return user
+    
     user = db.query(DBUser).filter(DBUser.username == username).first()
     if user is None:
         raise credentials_exception
+    
+    if jti:
+        principal_cache.put(jti, user, token_expires_at=payload.get("exp"))
     return user
 
 
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> DBUser:
+    """Get the current authenticated user from JWT token"""
+    return authenticate_token(token, db)
+
+
+async def get_current_user_detached(token: str = Depends(oauth2_scheme)) -> DBUser:
+    """
+    Get the current user for long-lived responses such as event streams.
+
+    Yield dependencies like get_db are only closed after the response ends,
+    so the lookup uses its own session that is closed before the handler
+    runs; the user is returned detached with its columns loaded.
+    """
+    sessions = get_db()
+    db = next(sessions)
+    try:
+        return authenticate_token(token, db)
+    finally:
+        sessions.close()
+
+
+def require_tenant_scope():
+    """Reject tokens that carry neither an organization nor a branch claim"""
+    if get_tenant_scope() is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Token is not limited to an organization or branch"
+        )
+
+
+async def get_scoped_user(current_user: DBUser = Depends(get_current_user)) -> DBUser:
+    """
+    Get the current user for routes reading data that isn't a branch-scoped
+    model (e.g. rollups), which filter by the tenant scope by hand
+    """
+    require_tenant_scope()
+    return current_user
+
+
+async def get_branch_user(current_user: DBUser = Depends(get_current_user)) -> DBUser:
+    """
+    Get the current user for routes creating branch-owned rows (orders,
+    KOTs), which need a branch claim when the token is scoped
+    """
+    try:
+        write_branch_id()
+    except BranchRequiredError as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+    return current_user
+
+
+async def get_scope_branch_ids_detached(
+    current_user: DBUser = Depends(get_current_user_detached)
+) -> Set[int]:
+    """Branch ids the token is limited to, looked up like get_current_user_detached"""
+    require_tenant_scope()
+    sessions = get_db()
+    db = next(sessions)
+    try:
+        return scope_branch_ids(db, get_tenant_scope())
+    finally:
+        sessions.close()
+
+
 def check_role(required_role: str):
     """
     Dependency factory to check if user has required role
@@ -1,15 +1,21 @@
 """
 Main FastAPI application
 """
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 # Force reload for route registration
 from app.config import settings
-from app.database import init_db, get_db
-from app.dependencies import get_password_hash
+from app.database import init_db, get_db, get_pool_metrics
+from app.dependencies import check_admin_role, get_password_hash
 from app.models import User as DBUser
+from app.models.tenancy import BranchRequiredError
 from app.api.v1 import api_router
+from app.services.partition_service import PartitionService
+from app.services.report_job_service import report_jobs
+from app.utils.cache import cache
+from app.utils.settings_cache import settings_cache
 
 # Create FastAPI app
 app = FastAPI(
@@ -25,8 +31,15 @@ app.add_middleware(
     allow_credentials=settings.CORS_ALLOW_CREDENTIALS,
     allow_methods=settings.CORS_ALLOW_METHODS,
     allow_headers=settings.CORS_ALLOW_HEADERS,
+    expose_headers=settings.CORS_EXPOSE_HEADERS,
 )
 
+@app.exception_handler(BranchRequiredError)
+async def branch_required_handler(request: Request, exc: BranchRequiredError):
+    """Branch-owned rows created with an organization-wide token"""
+    return JSONResponse(status_code=403, content={"detail": str(exc)})
+
+
 # Include auth routes at root level (for compatibility with frontend)
 from app.api.v1 import auth
 app.include_router(auth.router, tags=["Authentication"])
@@ -41,6 +54,8 @@ def startup_event():
     """Initialize database tables"""
     try:
         init_db()
+        ensure_order_partitions()
+        settings_cache.start_listener()
         print("✅ Database initialized successfully")
         print("📝 No default users created - use signup to create your account")
     except Exception as e:
@@ -56,6 +71,25 @@ def startup_event():
         raise
 
 
+def ensure_order_partitions():
+    """Create upcoming monthly partitions when the order tables are partitioned"""
+    db = next(get_db())
+    try:
+        created = PartitionService.ensure_partitions(db)
+        if created:
+            print(f"✅ Created partitions: {', '.join(created)}")
+    finally:
+        db.close()
+
+
+@app.on_event("shutdown")
+def shutdown_event():
+    """Stop the report job worker processes, the settings change listener and the cache I/O threads"""
+    report_jobs.shutdown()
+    settings_cache.stop_listener()
+    cache.backend.close()
+
+
 @app.get("/")
 async def root():
     """Root endpoint - API health check"""
@@ -83,6 +117,18 @@ async def welcome_admin():
     return {"message": "Welcome to the Admin Command Center!"}
 
 
+@app.get("/health/db-pool")
+async def db_pool_health(current_user: DBUser = Depends(check_admin_role)):
+    """Connection pool checkout, wait and overflow metrics (Admin only)"""
+    return get_pool_metrics()
+
+
+@app.get("/health/cache")
+async def cache_health(current_user: DBUser = Depends(check_admin_role)):
+    """Cache backend stats and hit/miss counters per namespace (Admin only)"""
+    return cache.metrics()
+
+
 if __name__ == "__main__":
     """
     Run the FastAPI application directly
@@ -17,6 +17,9 @@ from app.models.purchase import Supplier, PurchaseBill, PurchaseReturn
 from app.models.delivery import DeliveryPartner
 from app.models.settings import CompanySettings, PaymentMode, StorageArea, DiscountRule
 from app.models.pos_session import POSSession
+from app.models.reporting import SalesHourlyRollup, MenuItemHourlyRollup
+from app.models.sequence import DocumentCounter, CacheVersion
+from app.models.archive import ArchivedOrder
 
 __all__ = [
     # Auth
@@ -59,4 +62,12 @@ __all__ = [
     "PaymentMode",
     "StorageArea",
     "DiscountRule",
+    # Reporting
+    "SalesHourlyRollup",
+    "MenuItemHourlyRollup",
+    # Document numbering and cache versions
+    "DocumentCounter",
+    "CacheVersion",
+    # Archive
+    "ArchivedOrder",
 ]
@@ -0,0 +1,29 @@
+"""
+Cold storage for closed orders moved out of the order tables
+"""
+from sqlalchemy import Column, Integer, String, Float, DateTime, LargeBinary, Index
+from datetime import datetime
+from app.database import Base
+from app.models.tenancy import BranchScopedMixin
+
+
+class ArchivedOrder(BranchScopedMixin, Base):
+    """
+    A closed order with its items, KOTs and KOT items, stored as one
+    compressed document (see OrderArchiveService). A few columns are kept
+    alongside it for lookups.
+    """
+    __tablename__ = "archived_orders"
+
+    __table_args__ = (
+        Index("ix_archived_orders_branch_id_created_at", "branch_id", "created_at"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=False)  # id the order had in orders
+    order_number = Column(String, nullable=False, index=True)
+    customer_id = Column(Integer, nullable=True, index=True)
+    status = Column(String, nullable=False)
+    net_amount = Column(Float, default=0)
+    created_at = Column(DateTime, nullable=False)
+    archived_at = Column(DateTime, default=datetime.now)
+    payload = Column(LargeBinary, nullable=False)  # zlib-compressed JSON
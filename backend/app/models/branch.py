@@ -33,10 +33,8 @@ class Branch(Base):
     organization = relationship("Organization", back_populates="branches")
     user_assignments = relationship("UserBranchAssignment", back_populates="branch", cascade="all, delete-orphan")
     
-    # Operational data relationships (will be added to existing models)
-    # tables = relationship("Table", back_populates="branch")
-    # sessions = relationship("Session", back_populates="branch")
-    # orders = relationship("Order", back_populates="branch")
+    # Operational data (tables, orders, KOTs, menu items and products) is
+    # linked through BranchScopedMixin.branch_id
     
     def __repr__(self):
         return f"<Branch(id={self.id}, code='{self.code}', name='{self.name}', org_id={self.organization_id})>"
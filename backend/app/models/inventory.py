@@ -1,10 +1,11 @@
 """
 Inventory-related models (Products, Units, Transactions, BOM, Production)
 """
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
+from app.models.tenancy import BranchScopedMixin
 
 
 class UnitOfMeasurement(Base):
@@ -17,9 +18,14 @@ class UnitOfMeasurement(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
 
 
-class Product(Base):
-    """Product/Inventory item model"""
+class Product(BranchScopedMixin, Base):
+    """Product/Inventory item model (products without a branch are stocked by every branch)"""
     __tablename__ = "products"
+    __branch_shared__ = True
+    
+    __table_args__ = (
+        Index("ix_products_branch_id_name", "branch_id", "name"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
@@ -40,7 +46,7 @@ class InventoryTransaction(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     product_id = Column(Integer, ForeignKey("products.id"))
-    transaction_type = Column(String, nullable=False)  # Add, Remove, Adjustment, Production, Count
+    transaction_type = Column(String, nullable=False, index=True)  # Add, Remove, Adjustment, Production, Count
     quantity = Column(Float, nullable=False)
     notes = Column(Text, nullable=True)
     created_by = Column(Integer, ForeignKey("users.id"))
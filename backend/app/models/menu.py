@@ -1,10 +1,11 @@
 """
 Menu-related models (Categories, Menu Groups, Menu Items)
 """
-from sqlalchemy import Column, Integer, String, Boolean, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, Float, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
+from app.models.tenancy import BranchScopedMixin
 
 
 class Category(Base):
@@ -35,9 +36,14 @@ class MenuGroup(Base):
     category = relationship("Category")
 
 
-class MenuItem(Base):
-    """Menu item model"""
+class MenuItem(BranchScopedMixin, Base):
+    """Menu item model (items without a branch are on every branch's menu)"""
     __tablename__ = "menu_items"
+    __branch_shared__ = True
+    
+    __table_args__ = (
+        Index("ix_menu_items_branch_id_category_id", "branch_id", "category_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
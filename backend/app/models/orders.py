@@ -1,10 +1,11 @@
 """
 Order-related models (Floors, Tables, Sessions, Orders, Order Items, KOTs)
 """
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Boolean, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
+from app.models.tenancy import BranchScopedMixin
 
 
 class Floor(Base):
@@ -20,12 +21,18 @@ class Floor(Base):
     tables = relationship("Table", back_populates="floor_rel")
 
 
-class Table(Base):
-    """Table model for restaurant tables"""
+class Table(BranchScopedMixin, Base):
+    """Table model for restaurant tables (tables without a branch are on every branch's floor)"""
     __tablename__ = "tables"
+    __branch_shared__ = True
+    
+    __table_args__ = (
+        # Table names are unique per branch (tables without a branch count as one branch)
+        Index("uq_tables_branch_id_table_id", text("coalesce(branch_id, 0)"), "table_id", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    table_id = Column(String, unique=True, nullable=False)  # Display name: T1, VIP2, etc.
+    table_id = Column(String, nullable=False)  # Display name: T1, VIP2, etc.
     floor_id = Column(Integer, ForeignKey("floors.id"), nullable=True)
     floor = Column(String, nullable=False)  # Legacy field for backward compatibility
     table_type = Column(String, default="Regular")  # Regular, VIP, Outdoor
@@ -53,10 +60,23 @@ class Session(Base):
     created_at = Column(DateTime, default=datetime.now)
 
 
-class Order(Base):
+class Order(BranchScopedMixin, Base):
     """Order model"""
     __tablename__ = "orders"
     
+    __table_args__ = (
+        Index("ix_orders_branch_id_created_at_id", "branch_id", "created_at", "id"),
+        Index("ix_orders_branch_id_status", "branch_id", "status"),
+        Index("ix_orders_table_id_status", "table_id", "status"),
+        Index("ix_orders_created_at_id", "created_at", "id"),  # Listings and keyset pagination
+        # Open orders per table (floor plan); covers the active and billable status sets
+        Index(
+            "ix_orders_open_by_table", "table_id", "id",
+            postgresql_where=text("status IN ('Pending', 'In Progress', 'BillRequested')")
+        ),
+        Index("ix_orders_outstanding_credit", "customer_id", postgresql_where=text("credit_amount > 0")),
+    )
+    
     id = Column(Integer, primary_key=True, index=True)
     order_number = Column(String, unique=True, nullable=False)
     table_id = Column(Integer, ForeignKey("tables.id"), nullable=True)
@@ -66,11 +86,14 @@ class Order(Base):
     total_amount = Column(Float, default=0)
     gross_amount = Column(Float, default=0)
     discount = Column(Float, default=0)
+    discount_rule_id = Column(Integer, ForeignKey("discount_rules.id", ondelete="SET NULL"), nullable=True)
     net_amount = Column(Float, default=0)
     paid_amount = Column(Float, default=0)
     credit_amount = Column(Float, default=0)
     payment_type = Column(String, nullable=True)  # Cash, Fonepay, Credit Card, etc.
     session_id = Column(Integer, ForeignKey("sessions.id"), nullable=True)
+    # POS session (staff shift) the order was settled in; source of the session report totals
+    pos_session_id = Column(Integer, ForeignKey("pos_sessions.id", ondelete="SET NULL"), nullable=True, index=True)
     created_by = Column(Integer, ForeignKey("users.id"))
     created_at = Column(DateTime, default=datetime.now)
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
@@ -88,7 +111,7 @@ class OrderItem(Base):
     __tablename__ = "order_items"
     
     id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(Integer, ForeignKey("orders.id"))
+    order_id = Column(Integer, ForeignKey("orders.id"), index=True)
     menu_item_id = Column(Integer, ForeignKey("menu_items.id"))
     quantity = Column(Integer, nullable=False)
     price = Column(Float, nullable=False)
@@ -100,13 +123,18 @@ class OrderItem(Base):
     menu_item = relationship("MenuItem")
 
 
-class KOT(Base):
+class KOT(BranchScopedMixin, Base):
     """Kitchen Order Ticket model (also handles BOT - Bar Order Ticket)"""
     __tablename__ = "kots"
     
+    __table_args__ = (
+        Index("ix_kots_branch_id_kot_type_status_created_at", "branch_id", "kot_type", "status", "created_at"),
+        Index("ix_kots_kot_type_status_created_at", "kot_type", "status", "created_at"),
+    )
+    
     id = Column(Integer, primary_key=True, index=True)
     kot_number = Column(String, unique=True, nullable=False)
-    order_id = Column(Integer, ForeignKey("orders.id"))
+    order_id = Column(Integer, ForeignKey("orders.id"), index=True)
     kot_type = Column(String, default="KOT")  # KOT or BOT
     status = Column(String, default="Pending")  # Pending, In Progress, Ready, Served
     created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
@@ -123,7 +151,7 @@ class KOTItem(Base):
     __tablename__ = "kot_items"
     
     id = Column(Integer, primary_key=True, index=True)
-    kot_id = Column(Integer, ForeignKey("kots.id"))
+    kot_id = Column(Integer, ForeignKey("kots.id"), index=True)
     menu_item_id = Column(Integer, ForeignKey("menu_items.id"))
     quantity = Column(Integer, nullable=False)
     notes = Column(String, nullable=True)
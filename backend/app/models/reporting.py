@@ -0,0 +1,58 @@
+"""
+Reporting rollup models (hourly sales and per-menu-item aggregates)
+"""
+from sqlalchemy import Column, Integer, String, Float, DateTime, UniqueConstraint
+from datetime import datetime
+from app.database import Base
+
+
+class SalesHourlyRollup(Base):
+    """Hourly sales aggregate per branch, order type, payment type and status"""
+    __tablename__ = "sales_hourly_rollups"
+
+    __table_args__ = (
+        UniqueConstraint(
+            'branch_id', 'hour', 'order_type', 'payment_type', 'status',
+            name='uq_sales_hourly_rollup_key'
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    # Key columns are non-nullable so they can be used as an upsert conflict target
+    branch_id = Column(Integer, nullable=False, default=0)  # 0 = no branch
+    hour = Column(DateTime, nullable=False, index=True)  # created_at truncated to the hour
+    order_type = Column(String, nullable=False)
+    payment_type = Column(String, nullable=False, default="")
+    status = Column(String, nullable=False)  # Paid, Completed, Cancelled
+
+    order_count = Column(Integer, nullable=False, default=0)
+    gross_amount = Column(Float, nullable=False, default=0)
+    net_amount = Column(Float, nullable=False, default=0)
+    discount = Column(Float, nullable=False, default=0)
+    paid_amount = Column(Float, nullable=False, default=0)
+    credit_amount = Column(Float, nullable=False, default=0)
+
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+
+class MenuItemHourlyRollup(Base):
+    """Hourly quantity and revenue aggregate per branch, menu item and status"""
+    __tablename__ = "menu_item_hourly_rollups"
+
+    __table_args__ = (
+        UniqueConstraint(
+            'branch_id', 'hour', 'menu_item_id', 'status',
+            name='uq_menu_item_hourly_rollup_key'
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    branch_id = Column(Integer, nullable=False, default=0)  # 0 = no branch
+    hour = Column(DateTime, nullable=False, index=True)
+    menu_item_id = Column(Integer, nullable=False)
+    status = Column(String, nullable=False)
+
+    quantity = Column(Integer, nullable=False, default=0)
+    gross_amount = Column(Float, nullable=False, default=0)
+
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
@@ -0,0 +1,33 @@
+"""
+Document number and cache version counter models
+"""
+from sqlalchemy import Column, Integer, String, Date, DateTime, UniqueConstraint
+from datetime import datetime
+from app.database import Base
+
+
+class DocumentCounter(Base):
+    """Last issued document number per branch, document type and day"""
+    __tablename__ = "document_counters"
+
+    __table_args__ = (
+        UniqueConstraint('branch_id', 'doc_type', 'day', name='uq_document_counter_key'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    branch_id = Column(Integer, nullable=False, default=0)  # 0 = no branch
+    doc_type = Column(String, nullable=False)  # order, kot, bot, purchase_bill, purchase_return, production
+    day = Column(Date, nullable=False)
+    last_value = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+
+class CacheVersion(Base):
+    """Version of a cached dataset, bumped in the same transaction as every write to it"""
+    __tablename__ = "cache_versions"
+
+    name = Column(String, primary_key=True)  # e.g. menu
+    version = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
@@ -0,0 +1,91 @@
+"""
+Branch scoping for operational models
+
+Models that inherit BranchScopedMixin carry a branch_id. A session-level
+`do_orm_execute` hook adds the current tenant scope (app.utils.tenant_scope)
+to every ORM select, update and delete on them, including relationship
+loads, so route and service code never filters by branch by hand.
+
+New rows are stamped with the request's branch. A token limited to a whole
+organization has no branch to stamp, so it can't create rows on models
+that aren't shared (BranchRequiredError); the row would otherwise be
+written without a branch and be invisible to every scoped request.
+"""
+from typing import Optional, Set
+from sqlalchemy import Column, Integer, ForeignKey, event, or_, select
+from sqlalchemy.orm import Session, declared_attr, with_loader_criteria
+
+from app.models.branch import Branch
+from app.utils.tenant_scope import ALL_BRANCHES, TenantScope, current_branch_id, get_tenant_scope
+
+
+class BranchScopedMixin:
+    """Adds branch_id, defaulting to the branch of the current request"""
+
+    # Rows without a branch are shared by every branch (e.g. a chain-wide menu)
+    __branch_shared__ = False
+
+    @declared_attr
+    def branch_id(cls):
+        return Column(Integer, ForeignKey("branches.id"), nullable=True, default=current_branch_id)
+
+
+class BranchRequiredError(PermissionError):
+    """A token without a branch claim tried to create branch-owned rows"""
+
+
+def write_branch_id() -> Optional[int]:
+    """Branch for new branch-owned rows (None when unscoped); requires a branch claim when scoped"""
+    scope = get_tenant_scope()
+    if scope is not None and not scope.branch_id:
+        raise BranchRequiredError("Select a branch to create orders, KOTs and other branch records")
+    return current_branch_id()
+
+
+def scope_branch_criteria(column, scope: TenantScope):
+    """Limit a branch id column to the scope's branch, or to every branch of its organization"""
+    if scope.branch_id:
+        return column == scope.branch_id
+    return column.in_(
+        select(Branch.id).where(Branch.organization_id == scope.organization_id).scalar_subquery()
+    )
+
+
+def scope_branch_ids(db: Session, scope: TenantScope) -> Set[int]:
+    """Ids of the branches a scope covers"""
+    if scope.branch_id:
+        return {scope.branch_id}
+    return set(db.scalars(select(Branch.id).where(Branch.organization_id == scope.organization_id)).all())
+
+
+def _branch_criteria(model, scope):
+    criteria = scope_branch_criteria(model.branch_id, scope)
+    if model.__branch_shared__:
+        criteria = or_(criteria, model.branch_id.is_(None))
+    return criteria
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _apply_tenant_scope(execute_state):
+    if not (execute_state.is_select or execute_state.is_update or execute_state.is_delete):
+        return
+    if execute_state.is_column_load or execute_state.execution_options.get("all_branches"):
+        return
+    scope = get_tenant_scope()
+    if scope is None:
+        return
+    execute_state.statement = execute_state.statement.options(*(
+        with_loader_criteria(model, _branch_criteria(model, scope), include_aliases=True)
+        for model in BranchScopedMixin.__subclasses__()
+    ))
+
+
+@event.listens_for(BranchScopedMixin, "before_insert", propagate=True)
+def _stamp_branch(mapper, connection, target):
+    # A request limited to a branch can't create rows for another one
+    if target.__branch_shared__:
+        branch_id = current_branch_id()
+    else:
+        branch_id = write_branch_id()
+    if branch_id:
+        target.branch_id = branch_id
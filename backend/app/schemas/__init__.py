@@ -386,6 +386,9 @@ class OrderResponse(BaseModel):
     total_amount: float
     gross_amount: float
     discount: float
+    discount_rule_id: Optional[int] = None
+    branch_id: Optional[int] = None
+    pos_session_id: Optional[int] = None
     net_amount: float
     paid_amount: float
     credit_amount: float
@@ -409,6 +412,7 @@ class OrderCreate(BaseModel):
     session_id: Optional[int] = None
     gross_amount: Optional[float] = 0
     discount: Optional[float] = 0
+    discount_rule_id: Optional[int] = None
     net_amount: Optional[float] = 0
     paid_amount: Optional[float] = 0
     credit_amount: Optional[float] = 0
@@ -3,18 +3,32 @@ Business logic services organized by domain
 """
 from app.services.auth_service import AuthService
 from app.services.customer_service import CustomerService
+from app.services.dashboard_service import DashboardService
+from app.services.document_number_service import DocumentNumberService
 from app.services.menu_service import MenuService
 from app.services.inventory_service import InventoryService
 from app.services.order_service import OrderService
+from app.services.order_archive_service import OrderArchiveService
+from app.services.pricing_service import PricingService
 from app.services.purchase_service import PurchaseService
 from app.services.report_service import ReportService
+from app.services.rollup_service import SalesRollupService
+from app.services.session_report_service import SessionReportService
+from app.services.table_service import TableService
 
 __all__ = [
     "AuthService",
     "CustomerService",
+    "DashboardService",
+    "DocumentNumberService",
     "MenuService",
     "InventoryService",
     "OrderService",
+    "OrderArchiveService",
+    "PricingService",
     "PurchaseService",
     "ReportService",
+    "SalesRollupService",
+    "SessionReportService",
+    "TableService",
 ]
@@ -0,0 +1,187 @@
+"""
+Dashboard aggregation service
+
+All dashboard figures are computed with SUM/COUNT/GROUP BY in the database so
+the cost of a summary does not grow with the number of orders in history.
+"""
+from typing import Dict, List
+from datetime import datetime, timedelta
+from sqlalchemy import func, case, DateTime
+from sqlalchemy.orm import Session
+from app.models.orders import Floor, Table, Order, OrderItem
+from app.models.menu import MenuItem
+
+
+DINE_IN_ORDER_TYPES = ["Dine-In", "Table"]
+
+
+class DashboardService:
+    """Service for SQL-side dashboard aggregation"""
+
+    @staticmethod
+    def get_table_occupancy(db: Session) -> Dict:
+        """Get total and occupied table counts"""
+        total_tables, occupied_tables = db.query(
+            func.count(Table.id),
+            func.coalesce(func.sum(case((Table.status == "Occupied", 1), else_=0)), 0)
+        ).one()
+        occupancy = (occupied_tables / total_tables * 100) if total_tables > 0 else 0
+
+        return {
+            "occupancy": round(occupancy, 1),
+            "total_tables": total_tables,
+            "occupied_tables": int(occupied_tables)
+        }
+
+    @staticmethod
+    def get_order_totals(db: Session, since: datetime) -> Dict:
+        """Get sales, payment and order-type totals for orders created since a point in time"""
+        row = db.query(
+            func.count(Order.id).label("orders"),
+            func.coalesce(func.sum(Order.net_amount), 0).label("sales"),
+            func.coalesce(func.sum(Order.paid_amount), 0).label("paid_sales"),
+            func.coalesce(func.sum(Order.credit_amount), 0).label("credit_sales"),
+            func.coalesce(func.sum(Order.discount), 0).label("discount"),
+            func.coalesce(func.sum(case((Order.order_type.in_(DINE_IN_ORDER_TYPES), 1), else_=0)), 0).label("dine_in"),
+            func.coalesce(func.sum(case((Order.order_type == "Takeaway", 1), else_=0)), 0).label("takeaway"),
+            func.coalesce(func.sum(case((Order.order_type == "Delivery", 1), else_=0)), 0).label("delivery")
+        ).filter(Order.created_at >= since).one()
+
+        return {
+            "sales_24h": float(row.sales),
+            "paid_sales": float(row.paid_sales),
+            "credit_sales": float(row.credit_sales),
+            "discount": float(row.discount),
+            "orders_24h": int(row.orders),
+            "dine_in_count": int(row.dine_in),
+            "takeaway_count": int(row.takeaway),
+            "delivery_count": int(row.delivery)
+        }
+
+    @staticmethod
+    def get_outstanding_revenue(db: Session) -> float:
+        """Get all-time outstanding credit"""
+        # Same predicate as the partial index ix_orders_outstanding_credit
+        total = db.query(
+            func.coalesce(func.sum(Order.credit_amount), 0)
+        ).filter(Order.credit_amount > 0).scalar()
+        return float(total)
+
+    @staticmethod
+    def get_top_outstanding_items(db: Session, limit: int = 3) -> List[Dict]:
+        """Get menu items with the highest value on orders that still carry credit"""
+        revenue = func.sum(OrderItem.quantity * OrderItem.price)
+        rows = db.query(
+            MenuItem.name,
+            revenue.label("total_credit")
+        ).join(
+            OrderItem, MenuItem.id == OrderItem.menu_item_id
+        ).join(
+            Order, Order.id == OrderItem.order_id
+        ).filter(
+            Order.credit_amount > 0
+        ).group_by(
+            MenuItem.id, MenuItem.name
+        ).order_by(revenue.desc()).limit(limit).all()
+
+        return [{"name": row.name, "amount": float(row.total_credit)} for row in rows]
+
+    @staticmethod
+    def get_top_selling_items(db: Session, since: datetime, limit: int = 3) -> List[Dict]:
+        """Get best-selling menu items by revenue for orders created since a point in time"""
+        revenue = func.sum(OrderItem.quantity * OrderItem.price)
+        rows = db.query(
+            MenuItem.name,
+            func.sum(OrderItem.quantity).label("total_quantity"),
+            revenue.label("total_revenue")
+        ).join(
+            OrderItem, MenuItem.id == OrderItem.menu_item_id
+        ).join(
+            Order, Order.id == OrderItem.order_id
+        ).filter(
+            Order.created_at >= since,
+            # Items are never older than their order; lets partitioned tables skip old months
+            OrderItem.created_at >= since
+        ).group_by(
+            MenuItem.id, MenuItem.name
+        ).order_by(revenue.desc()).limit(limit).all()
+
+        return [
+            {
+                "name": row.name,
+                "quantity": int(row.total_quantity),
+                "revenue": float(row.total_revenue)
+            }
+            for row in rows
+        ]
+
+    @staticmethod
+    def get_sales_by_area(db: Session, since: datetime) -> List[Dict]:
+        """Get net sales per floor for orders created since a point in time"""
+        amount = func.sum(func.coalesce(Order.net_amount, 0))
+        rows = db.query(
+            Floor.name,
+            amount.label("amount")
+        ).join(
+            Table, Table.floor_id == Floor.id
+        ).join(
+            Order, Order.table_id == Table.id
+        ).filter(
+            Order.created_at >= since
+        ).group_by(
+            Floor.id, Floor.name
+        ).having(amount > 0).order_by(Floor.id).all()
+
+        return [{"area": row.name, "amount": float(row.amount)} for row in rows]
+
+    @staticmethod
+    def get_hourly_breakdown(db: Session, now: datetime, hours: int = 24) -> Dict:
+        """
+        Get order counts and net sales in hourly buckets, oldest first.
+
+        Buckets are computed with date_trunc in the database; the last slot is
+        the current hour.
+        """
+        current_hour = now.replace(minute=0, second=0, microsecond=0)
+        since = current_hour - timedelta(hours=hours - 1)
+        bucket = func.date_trunc("hour", Order.created_at, type_=DateTime)
+
+        rows = db.query(
+            bucket.label("bucket"),
+            func.count(Order.id).label("orders"),
+            func.coalesce(func.sum(Order.net_amount), 0).label("sales")
+        ).filter(
+            Order.created_at >= since
+        ).group_by(bucket).all()
+
+        peak_time_data = [0] * hours
+        hourly_sales = [0.0] * hours
+        for row in rows:
+            if row.bucket is None:
+                continue
+            hours_ago = int((current_hour - row.bucket).total_seconds() // 3600)
+            if 0 <= hours_ago < hours:
+                index = hours - 1 - hours_ago
+                peak_time_data[index] += int(row.orders)
+                hourly_sales[index] += float(row.sales)
+
+        return {
+            "peak_time_data": peak_time_data,
+            "hourly_sales": hourly_sales
+        }
+
+    @staticmethod
+    def get_summary(db: Session) -> Dict:
+        """Get the full dashboard summary for the last 24 hours"""
+        now = datetime.now()
+        since = now - timedelta(hours=24)
+
+        summary = DashboardService.get_table_occupancy(db)
+        summary.update(DashboardService.get_order_totals(db, since))
+        summary["outstanding_revenue"] = DashboardService.get_outstanding_revenue(db)
+        summary["top_outstanding_items"] = DashboardService.get_top_outstanding_items(db)
+        summary["top_selling_items"] = DashboardService.get_top_selling_items(db, since)
+        summary["sales_by_area"] = DashboardService.get_sales_by_area(db, since)
+        summary.update(DashboardService.get_hourly_breakdown(db, now))
+        summary["period"] = "Last 24 Hours"
+        return summary
@@ -0,0 +1,119 @@
+"""
+Document number service
+
+Issues order, KOT/BOT, purchase and production numbers from a per-branch,
+per-day counter row instead of random suffixes. The counter is incremented
+with a single upsert in its own short transaction: concurrent requests queue
+on the row lock only for that statement instead of colliding and retrying,
+and the lock isn't held while the caller's document transaction runs. A
+rolled back document therefore leaves a gap in its day's numbers.
+
+That transaction runs on a small engine of its own without a pool, so
+allocating a number never waits for a second connection from the request
+pool while the request already holds one.
+
+The branch defaults to the branch of the current request's tenant scope.
+"""
+from datetime import date, datetime
+from threading import Lock
+from typing import Dict, List, Optional
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app.models.sequence import DocumentCounter
+from app.utils.tenant_scope import current_branch_id
+
+# Number prefix per document type
+DOCUMENT_PREFIXES = {
+    "order": "ORD",
+    "kot": "KOT",
+    "bot": "BOT",
+    "purchase_bill": "PO",
+    "purchase_return": "RET",
+    "production": "PROD",
+}
+
+# Zero-padded width of the daily sequence part
+SEQUENCE_WIDTH = 5
+
+# Counter engines by database URL, see _counter_engine
+_counter_engines: Dict[str, Engine] = {}
+_counter_engines_lock = Lock()
+
+
+def _counter_engine(bind: Engine) -> Engine:
+    """Unpooled engine on the same database as `bind`, for counter updates
+
+    For an async bind this is the sync facade of an async engine, which works
+    inside `AsyncSession.run_sync` like the bind itself.
+    """
+    url = bind.url.render_as_string(hide_password=False)
+    with _counter_engines_lock:
+        counter_engine = _counter_engines.get(url)
+        if counter_engine is None:
+            if bind.dialect.is_async:
+                counter_engine = create_async_engine(url, poolclass=NullPool).sync_engine
+            else:
+                counter_engine = create_engine(url, poolclass=NullPool)
+            _counter_engines[url] = counter_engine
+    return counter_engine
+
+
+class DocumentNumberService:
+    """Service for issuing document numbers"""
+
+    @staticmethod
+    def reserve(db: Session, doc_type: str, count: int = 1,
+                branch_id: Optional[int] = None, day: Optional[date] = None) -> List[int]:
+        """Reserve the next `count` sequence values for a document type and day"""
+        if doc_type not in DOCUMENT_PREFIXES:
+            raise ValueError(f"Unknown document type: {doc_type}")
+        if count < 1:
+            return []
+
+        stmt = pg_insert(DocumentCounter).values(
+            branch_id=branch_id or 0,
+            doc_type=doc_type,
+            day=day or datetime.now().date(),
+            last_value=count,
+            updated_at=datetime.now()
+        )
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_document_counter_key",
+            set_={
+                "last_value": DocumentCounter.last_value + stmt.excluded.last_value,
+                "updated_at": stmt.excluded.updated_at
+            }
+        ).returning(DocumentCounter.last_value)
+
+        # Committed on a connection of its own, so the counter row is locked
+        # for this statement only and not until the caller's commit
+        with _counter_engine(db.get_bind().engine).begin() as connection:
+            last_value = connection.execute(stmt).scalar_one()
+        return list(range(last_value - count + 1, last_value + 1))
+
+    @staticmethod
+    def format_number(doc_type: str, value: int, day: date, branch_id: Optional[int] = None) -> str:
+        """Format a sequence value, e.g. ORD-20250101-00042 or ORD-20250101-3-00042 for branch 3"""
+        parts = [DOCUMENT_PREFIXES[doc_type], day.strftime('%Y%m%d')]
+        if branch_id:
+            parts.append(str(branch_id))
+        parts.append(str(value).zfill(SEQUENCE_WIDTH))
+        return "-".join(parts)
+
+    @staticmethod
+    def next_numbers(db: Session, doc_type: str, count: int, branch_id: Optional[int] = None) -> List[str]:
+        """Issue `count` consecutive document numbers (for the request's branch unless `branch_id` is given)"""
+        if branch_id is None:
+            branch_id = current_branch_id()
+        day = datetime.now().date()
+        values = DocumentNumberService.reserve(db, doc_type, count, branch_id=branch_id, day=day)
+        return [DocumentNumberService.format_number(doc_type, value, day, branch_id) for value in values]
+
+    @staticmethod
+    def next_number(db: Session, doc_type: str, branch_id: Optional[int] = None) -> str:
+        """Issue the next document number"""
+        return DocumentNumberService.next_numbers(db, doc_type, 1, branch_id=branch_id)[0]
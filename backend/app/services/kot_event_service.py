@@ -0,0 +1,189 @@
+"""
+KOT/BOT event broker for kitchen display push updates
+
+Ticket writes publish events here; kitchen displays subscribe through the
+Server-Sent Events endpoint in app/api/v1/kots.py. Every event gets an id of
+the form "<epoch>-<sequence>" and the most recent events are kept in memory
+so a display that reconnects with its last seen id only replays what it
+missed. The epoch is random per broker, so an id from before a restart, or
+from another worker, never matches a sequence number here; such displays get
+a full resync instead of a wrong or partial replay.
+
+The broker is per process: there is no fan-out across workers, so a display
+only receives events for ticket writes handled by the worker it is connected
+to. Run a single API worker (the way app.main runs uvicorn) while displays
+depend on the stream.
+"""
+import asyncio
+import threading
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Collection, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.orders import KOT
+from app.services.loader_profiles import loader_options
+
+
+class KOTSubscriber:
+    """A single stream consumer with its own bounded queue"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_queue: int):
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.overflowed = False
+
+    def push(self, event: Dict):
+        """Queue an event; runs on the subscriber's event loop"""
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # A slow display is disconnected and resumes from its cursor
+            self.overflowed = True
+
+
+class KOTEventBroker:
+    """In-memory pub/sub with a bounded replay buffer"""
+
+    def __init__(self, history_size: int = 1000, max_queue: int = 500):
+        self.epoch = uuid.uuid4().hex[:12]
+        self._history = deque(maxlen=history_size)
+        self._next_seq = 1
+        self._lock = threading.Lock()
+        self._subscribers: List[KOTSubscriber] = []
+        self._max_queue = max_queue
+
+    def event_id(self, seq: int) -> str:
+        """Wire id of the event with sequence number `seq`"""
+        return f"{self.epoch}-{seq}"
+
+    def parse_event_id(self, event_id: Optional[str]) -> Optional[int]:
+        """Sequence number of an id issued by this broker, or None (other epoch or malformed)"""
+        epoch, _, seq = (event_id or "").rpartition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        return int(seq)
+
+    @property
+    def last_seq(self) -> int:
+        """Sequence number of the most recent event (0 when nothing was published yet)"""
+        return self._next_seq - 1
+
+    def publish(self, event_type: str, ticket: Dict, previous_status: Optional[str] = None) -> Dict:
+        """Record an event and fan it out to every subscriber"""
+        with self._lock:
+            seq = self._next_seq
+            event = {
+                "id": self.event_id(seq),
+                "seq": seq,
+                "type": event_type,
+                "kot": ticket,
+                "previous_status": previous_status,
+                "published_at": datetime.now().isoformat()
+            }
+            self._next_seq += 1
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+
+        for subscriber in subscribers:
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber.push, event)
+            except RuntimeError:
+                # Subscriber loop already closed
+                self.unsubscribe(subscriber)
+        return event
+
+    def replay(self, cursor: str) -> Optional[List[Dict]]:
+        """
+        Get the events published after the event id `cursor`.
+
+        Returns None when the cursor was issued by another broker (before a
+        restart or by another worker) or is older than the replay buffer, in
+        which case the client has to reload the board with GET /kots.
+        """
+        seq = self.parse_event_id(cursor)
+        with self._lock:
+            last_seq = self._next_seq - 1
+            if seq is None or seq > last_seq:
+                return None
+            if seq == last_seq:
+                return []
+            if not self._history or seq < self._history[0]["seq"] - 1:
+                return None
+            return [event for event in self._history if event["seq"] > seq]
+
+    def subscribe(self) -> KOTSubscriber:
+        """Register a subscriber bound to the running event loop"""
+        subscriber = KOTSubscriber(asyncio.get_running_loop(), self._max_queue)
+        with self._lock:
+            self._subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: KOTSubscriber):
+        """Remove a subscriber"""
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+
+
+def serialize_kot(kot: KOT) -> Dict:
+    """Build the event payload for a ticket (expects order.table and items.menu_item loaded)"""
+    table = kot.order.table if kot.order else None
+    return {
+        "id": kot.id,
+        "kot_number": kot.kot_number,
+        "order_id": kot.order_id,
+        "branch_id": kot.branch_id,
+        "kot_type": kot.kot_type,
+        "status": kot.status,
+        "table_id": table.table_id if table else None,
+        "created_at": kot.created_at.isoformat() if kot.created_at else None,
+        "updated_at": kot.updated_at.isoformat() if kot.updated_at else None,
+        "items": [
+            {
+                "id": item.id,
+                "menu_item_id": item.menu_item_id,
+                "name": item.menu_item.name if item.menu_item else None,
+                "quantity": item.quantity,
+                "notes": item.notes
+            }
+            for item in kot.items
+        ]
+    }
+
+
+def event_matches(
+    event: Dict,
+    kot_type: Optional[str],
+    statuses: Optional[List[str]],
+    branch_ids: Collection[int]
+) -> bool:
+    """
+    Check whether an event passes a display's branch, ticket type and status filter.
+
+    Only tickets of `branch_ids` (the branches the display's token covers)
+    match. A ticket leaving a watched status still matches so the display
+    can drop it.
+    """
+    ticket = event["kot"]
+    if ticket.get("branch_id") not in branch_ids:
+        return False
+    if kot_type and ticket["kot_type"] != kot_type:
+        return False
+    if statuses and ticket["status"] not in statuses and event.get("previous_status") not in statuses:
+        return False
+    return True
+
+
+kot_events = KOTEventBroker()
+
+
+def publish_kot_event(db: Session, kot_id: int, event_type: str, previous_status: Optional[str] = None):
+    """Reload a committed ticket with its items and push it to connected kitchen displays"""
+    kot = db.query(KOT).options(*loader_options("kot_board")).filter(KOT.id == kot_id).first()
+    if kot:
+        kot_events.publish(event_type, serialize_kot(kot), previous_status=previous_status)
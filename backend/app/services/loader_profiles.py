@@ -0,0 +1,58 @@
+"""
+Eager-loading profiles for order and KOT reads
+
+Each profile names the relationship loading strategy for one kind of read so
+endpoints don't repeat chained loader options. Many-to-one references use a
+joined load (one row per parent), collections use selectinload (one extra
+IN query per level instead of a cartesian product of items x KOT items), and
+everything not listed raises instead of lazy loading behind our back.
+"""
+from typing import Callable, Dict, List
+from sqlalchemy.orm import joinedload, selectinload, noload, raiseload
+from app.models.orders import Order, OrderItem, KOT, KOTItem
+
+
+def _order_full() -> List:
+    """Order with table, customer, items and KOTs with their items"""
+    return [
+        joinedload(Order.table),
+        joinedload(Order.customer),
+        selectinload(Order.items).joinedload(OrderItem.menu_item),
+        selectinload(Order.kots).selectinload(KOT.items).joinedload(KOTItem.menu_item),
+        raiseload("*")
+    ]
+
+
+def _order_summary() -> List:
+    """Order with table, customer and items, without KOTs"""
+    return [
+        joinedload(Order.table),
+        joinedload(Order.customer),
+        selectinload(Order.items).joinedload(OrderItem.menu_item),
+        noload(Order.kots),
+        raiseload("*")
+    ]
+
+
+def _kot_board() -> List:
+    """KOT with its order's table and items, as shown on kitchen displays"""
+    return [
+        joinedload(KOT.order).joinedload(Order.table),
+        selectinload(KOT.items).joinedload(KOTItem.menu_item),
+        raiseload("*")
+    ]
+
+
+LOADER_PROFILES: Dict[str, Callable[[], List]] = {
+    "order_full": _order_full,
+    "order_summary": _order_summary,
+    "kot_board": _kot_board,
+}
+
+
+def loader_options(profile: str) -> List:
+    """Get the query options for a named loader profile"""
+    try:
+        return LOADER_PROFILES[profile]()
+    except KeyError:
+        raise ValueError(f"Unknown loader profile: {profile}")
@@ -1,9 +1,32 @@
 """
 Menu management service
 """
-from typing import List, Optional
+from typing import Dict, List, Optional
+from datetime import datetime
+from sqlalchemy import Integer, cast, column, inspect, or_, select, update, values
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 from app.models.menu import Category, MenuGroup, MenuItem
+from app.models.sequence import CacheVersion
+
+# CacheVersion row tracking changes to categories, groups and items
+CATALOG_VERSION_NAME = "menu"
+
+# Menu item columns a bulk update may set, with the accepted value types
+BULK_UPDATE_FIELDS = {
+    "name": (str,),
+    "price": (int, float),
+    "category_id": (int, type(None)),
+    "group_id": (int, type(None)),
+    "description": (str, type(None)),
+    "image": (str, type(None)),
+    "inventory_tracking": (bool,),
+    "kot_bot": (str,),
+    "is_active": (bool,),
+}
+
+# Rows per UPDATE .. FROM (VALUES ..) statement
+BULK_UPDATE_CHUNK_SIZE = 1000
 
 
 class MenuService:
@@ -72,3 +95,101 @@ class MenuService:
         db.commit()
         db.refresh(item)
         return item
+    
+    @staticmethod
+    def bulk_update_menu_items(db: Session, updates: List[dict]) -> Dict:
+        """
+        Apply many menu item updates with set-based UPDATE .. FROM (VALUES ..).
+
+        Updates setting the same columns share a statement, and rows whose
+        values are already current are left untouched. Raises ValueError
+        for a missing id or a column that can't be bulk updated. Does not
+        commit.
+        """
+        by_id: Dict[int, dict] = {}
+        for entry in updates:
+            item_id = entry.get("id")
+            if not isinstance(item_id, int) or isinstance(item_id, bool):
+                raise ValueError("Each update needs an integer id")
+            fields = {key: value for key, value in entry.items() if key != "id"}
+            for key, value in fields.items():
+                if key not in BULK_UPDATE_FIELDS:
+                    raise ValueError(f"Field '{key}' can't be bulk updated")
+                allowed = BULK_UPDATE_FIELDS[key]
+                if not isinstance(value, allowed) or (isinstance(value, bool) and bool not in allowed):
+                    raise ValueError(f"Invalid value for '{key}' on menu item {item_id}")
+            if fields.get("price", 0) < 0:
+                raise ValueError(f"Price of menu item {item_id} can't be negative")
+            by_id.setdefault(item_id, {}).update(fields)
+        
+        existing = set(db.scalars(select(MenuItem.id).where(MenuItem.id.in_(by_id))).all()) if by_id else set()
+        
+        groups: Dict[tuple, List[dict]] = {}
+        for item_id, fields in by_id.items():
+            if item_id in existing and fields:
+                groups.setdefault(tuple(sorted(fields)), []).append({"id": item_id, **fields})
+        
+        table = MenuItem.__table__
+        updated_ids = []
+        now = datetime.now()
+        for keys, rows in groups.items():
+            for start in range(0, len(rows), BULK_UPDATE_CHUNK_SIZE):
+                chunk = rows[start:start + BULK_UPDATE_CHUNK_SIZE]
+                data = values(
+                    column("id", Integer), *(column(key, table.c[key].type) for key in keys),
+                    name="data"
+                ).data([tuple(row[key] for key in ("id",) + keys) for row in chunk])
+                # NULLs in VALUES are untyped, so cast to the column types
+                new_values = {key: cast(data.c[key], table.c[key].type) for key in keys}
+                stmt = (
+                    update(MenuItem)
+                    .where(MenuItem.id == data.c.id)
+                    .where(or_(*(table.c[key].is_distinct_from(value) for key, value in new_values.items())))
+                    .values({**new_values, "updated_at": now})
+                    .returning(MenuItem.id)
+                )
+                updated_ids.extend(db.execute(stmt, execution_options={"synchronize_session": False}).scalars())
+        
+        return {
+            "requested_count": len(by_id),
+            "updated_count": len(updated_ids),
+            "unchanged_count": len(existing) - len(updated_ids),
+            "updated_ids": sorted(updated_ids),
+            "not_found_ids": sorted(set(by_id) - existing)
+        }
+    
+    # Catalog snapshot
+    @staticmethod
+    def bump_catalog_version(db: Session) -> int:
+        """Mark the menu as changed; call in the same transaction as the write"""
+        stmt = pg_insert(CacheVersion).values(
+            name=CATALOG_VERSION_NAME, version=1, updated_at=datetime.now()
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CacheVersion.name],
+            set_={"version": CacheVersion.version + 1, "updated_at": stmt.excluded.updated_at}
+        ).returning(CacheVersion.version)
+        return db.execute(stmt).scalar_one()
+    
+    @staticmethod
+    def get_catalog_version(db: Session) -> int:
+        """Current menu version (0 before the first write)"""
+        version = db.query(CacheVersion.version).filter(CacheVersion.name == CATALOG_VERSION_NAME).scalar()
+        return version or 0
+    
+    @staticmethod
+    def build_catalog(db: Session, version: int) -> Dict:
+        """Categories, groups and items as plain column values"""
+        def rows(model) -> List[Dict]:
+            columns = [attr.key for attr in inspect(model).column_attrs]
+            return [
+                {key: getattr(row, key) for key in columns}
+                for row in db.query(model).order_by(model.id)
+            ]
+        
+        return {
+            "version": version,
+            "categories": rows(Category),
+            "groups": rows(MenuGroup),
+            "items": rows(MenuItem)
+        }
@@ -0,0 +1,203 @@
+"""
+Cold storage for closed orders
+
+Paid, completed and cancelled orders older than ORDER_ARCHIVE_AFTER_MONTHS
+are moved, with their items, KOTs and KOT items, out of the order tables
+into archived_orders: one zlib-compressed JSON document per order holding
+every column of every row. This keeps orders, order_items, kots and
+kot_items (and their indexes) down to the recent working set.
+
+Orders with outstanding credit stay in place, since customer balances and
+the outstanding reports read them. The hourly sales rollups are left as
+they are, so dashboards keep the archived history; day-book and order
+history reports only cover orders that are still in the order tables.
+
+Archived orders stay readable by id through get_archived_order, which
+returns the same shape as OrderResponse.
+"""
+import json
+import zlib
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import select, delete, func
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.archive import ArchivedOrder
+from app.models.customers import Customer
+from app.models.menu import MenuItem
+from app.models.orders import Order, OrderItem, KOT, KOTItem, Table
+from app.services.rollup_service import ROLLUP_STATUSES
+from app.utils.tenant_scope import ALL_BRANCHES
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot archive value of type {type(value).__name__}")
+
+
+def _rows(db: Session, table, column, ids: List[int]) -> List[Dict]:
+    if not ids:
+        return []
+    return [dict(row) for row in db.execute(select(table).where(column.in_(ids)).order_by(table.c.id)).mappings()]
+
+
+class OrderArchiveService:
+    """Service for moving closed orders to cold storage and reading them back"""
+
+    @staticmethod
+    def encode(document: Dict) -> bytes:
+        return zlib.compress(json.dumps(document, default=_json_default, separators=(",", ":")).encode())
+
+    @staticmethod
+    def decode(payload: bytes) -> Dict:
+        return json.loads(zlib.decompress(payload))
+
+    @staticmethod
+    def cutoff(older_than_months: int, today: Optional[date] = None) -> datetime:
+        """Start of the day `older_than_months` months before today"""
+        today = today or date.today()
+        index = today.year * 12 + today.month - 1 - older_than_months
+        year, month = index // 12, index % 12 + 1
+        # Clamp the day for shorter months (e.g. 31 March - 1 month)
+        day = today.day
+        while True:
+            try:
+                return datetime(year, month, day)
+            except ValueError:
+                day -= 1
+
+    @staticmethod
+    def archivable_order_ids(db: Session, before: datetime, limit: int) -> List[int]:
+        """Closed orders created before `before` without outstanding credit, oldest id first"""
+        return db.execute(
+            select(Order.id)
+            .where(
+                Order.status.in_(ROLLUP_STATUSES),
+                Order.created_at < before,
+                func.coalesce(Order.credit_amount, 0) <= 0
+            )
+            .order_by(Order.id)
+            .limit(limit)
+            .execution_options(**ALL_BRANCHES)
+        ).scalars().all()
+
+    @staticmethod
+    def archive_orders(db: Session, order_ids: List[int]) -> int:
+        """Move the given orders with their items and KOTs to archived_orders (caller commits)"""
+        orders = _rows(db, Order.__table__, Order.__table__.c.id, order_ids)
+        if not orders:
+            return 0
+        ids = [order["id"] for order in orders]
+        items = _rows(db, OrderItem.__table__, OrderItem.__table__.c.order_id, ids)
+        kots = _rows(db, KOT.__table__, KOT.__table__.c.order_id, ids)
+        kot_ids = [kot["id"] for kot in kots]
+        kot_items = _rows(db, KOTItem.__table__, KOTItem.__table__.c.kot_id, kot_ids)
+
+        items_by_order: Dict[int, List[Dict]] = {}
+        for item in items:
+            items_by_order.setdefault(item["order_id"], []).append(item)
+        items_by_kot: Dict[int, List[Dict]] = {}
+        for item in kot_items:
+            items_by_kot.setdefault(item["kot_id"], []).append(item)
+        kots_by_order: Dict[int, List[Dict]] = {}
+        for kot in kots:
+            kots_by_order.setdefault(kot["order_id"], []).append(
+                {**kot, "items": items_by_kot.get(kot["id"], [])}
+            )
+
+        now = datetime.now()
+        db.execute(ArchivedOrder.__table__.insert(), [
+            {
+                "id": order["id"],
+                "order_number": order["order_number"],
+                "branch_id": order["branch_id"],
+                "customer_id": order["customer_id"],
+                "status": order["status"],
+                "net_amount": order["net_amount"],
+                "created_at": order["created_at"],
+                "archived_at": now,
+                "payload": OrderArchiveService.encode({
+                    "order": order,
+                    "items": items_by_order.get(order["id"], []),
+                    "kots": kots_by_order.get(order["id"], [])
+                })
+            }
+            for order in orders
+        ])
+
+        # Children first; the foreign keys don't cascade
+        if kot_ids:
+            db.execute(delete(KOTItem.__table__).where(KOTItem.__table__.c.kot_id.in_(kot_ids)))
+            db.execute(delete(KOT.__table__).where(KOT.__table__.c.id.in_(kot_ids)))
+        db.execute(delete(OrderItem.__table__).where(OrderItem.__table__.c.order_id.in_(ids)))
+        db.execute(delete(Order.__table__).where(Order.__table__.c.id.in_(ids)))
+        return len(orders)
+
+    @staticmethod
+    def archive_closed_orders(
+        db: Session,
+        older_than_months: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        today: Optional[date] = None
+    ) -> int:
+        """
+        Archive every closed order older than `older_than_months` months,
+        committing after each batch so locks stay short. Returns the number
+        of orders archived.
+        """
+        if older_than_months is None:
+            older_than_months = settings.ORDER_ARCHIVE_AFTER_MONTHS
+        if older_than_months < 1:
+            raise ValueError("older_than_months must be at least 1")
+        batch_size = batch_size or settings.ORDER_ARCHIVE_BATCH_SIZE
+        before = OrderArchiveService.cutoff(older_than_months, today)
+
+        archived = 0
+        while True:
+            order_ids = OrderArchiveService.archivable_order_ids(db, before, batch_size)
+            if not order_ids:
+                return archived
+            archived += OrderArchiveService.archive_orders(db, order_ids)
+            db.commit()
+
+    @staticmethod
+    def get_archived_order(db: Session, order_id: int) -> Optional[Dict]:
+        """An archived order in the shape of OrderResponse, or None"""
+        archived = db.scalar(select(ArchivedOrder).where(ArchivedOrder.id == order_id))
+        if archived is None:
+            return None
+        document = OrderArchiveService.decode(archived.payload)
+        order = document["order"]
+
+        # References are resolved against the current tables, as for live orders
+        lines = document["items"] + [item for kot in document["kots"] for item in kot["items"]]
+        menu_item_ids = {line["menu_item_id"] for line in lines if line["menu_item_id"] is not None}
+        menu_items = {
+            menu_item.id: {"id": menu_item.id, "name": menu_item.name, "price": menu_item.price}
+            for menu_item in db.execute(
+                select(MenuItem).where(MenuItem.id.in_(menu_item_ids)).execution_options(**ALL_BRANCHES)
+            ).scalars()
+        } if menu_item_ids else {}
+        table = db.execute(
+            select(Table).where(Table.id == order["table_id"]).execution_options(**ALL_BRANCHES)
+        ).scalar() if order["table_id"] else None
+        customer = db.get(Customer, order["customer_id"]) if order["customer_id"] else None
+
+        def with_menu_item(line: Dict) -> Dict:
+            return {**line, "menu_item": menu_items.get(line["menu_item_id"])}
+
+        return {
+            **order,
+            "table": {
+                "id": table.id, "table_id": table.table_id, "floor": table.floor, "status": table.status
+            } if table else None,
+            "customer": {"id": customer.id, "name": customer.name, "phone": customer.phone} if customer else None,
+            "items": [with_menu_item(item) for item in document["items"]],
+            "kots": [
+                {**kot, "items": [with_menu_item(item) for item in kot["items"]]}
+                for kot in document["kots"]
+            ]
+        }
@@ -1,20 +1,45 @@
 """
 Order management service
 """
-from typing import List, Optional
-from sqlalchemy.orm import Session
+from typing import Dict, List, Optional
 from datetime import datetime
-import random
+from sqlalchemy import delete, func, insert, inspect
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 from app.models.orders import Order, OrderItem, KOT, Table, Session
+from app.models.customers import Customer
+from app.models.menu import MenuItem
+from app.services.document_number_service import DocumentNumberService
+from app.services.pricing_service import PricingService
+from app.services.rollup_service import SalesRollupService, ROLLUP_STATUSES
+from app.models.tenancy import write_branch_id
+
+# Keys a request may send when creating an order: the order columns except
+# the primary key, plus its items. The branch, creator and amounts are always
+# set on the server, whatever the request says.
+ORDER_CREATE_FIELDS = {attr.key for attr in inspect(Order).column_attrs} - {'id'} | {'items'}
+
+# Order item fields read from requests, with the accepted value types; prices
+# and subtotals always come from the menu
+ITEM_FIELDS = {
+    "id": (int, type(None)),
+    "menu_item_id": (int,),
+    "quantity": (int,),
+    "notes": (str, type(None)),
+}
+
+# Fields every new or replacing line must have
+REQUIRED_ITEM_FIELDS = ("menu_item_id", "quantity")
 
 
 class OrderService:
     """Service for order operations"""
     
     @staticmethod
-    def generate_order_number() -> str:
+    def generate_order_number(db: Session) -> str:
         """Generate a unique order number"""
-        return f"ORD-{datetime.now().strftime('%Y%m%d')}-{random.randint(1000, 9999)}"
+        return DocumentNumberService.next_number(db, "order")
     
     @staticmethod
     def get_all_orders(db: Session) -> List[Order]:
@@ -30,7 +55,7 @@ class OrderService:
     def create_order(db: Session, order_data: dict) -> Order:
         """Create a new order"""
         if 'order_number' not in order_data:
-            order_data['order_number'] = OrderService.generate_order_number()
+            order_data['order_number'] = OrderService.generate_order_number(db)
         
         new_order = Order(**order_data)
         db.add(new_order)
@@ -38,6 +63,277 @@ class OrderService:
         db.refresh(new_order)
         return new_order
     
+    @staticmethod
+    def validate_items(items_data, required=REQUIRED_ITEM_FIELDS):
+        """
+        Check item payloads before anything is written: `required` fields are
+        present, known fields have the right type and quantities are positive.
+        Raises ValueError (a 400 response) instead of failing halfway through.
+        Menu items are checked to exist when the lines are priced.
+        """
+        if not isinstance(items_data, list):
+            raise ValueError("Items must be a list")
+        for position, item_data in enumerate(items_data, start=1):
+            if not isinstance(item_data, dict):
+                raise ValueError(f"Item {position} must be an object")
+            for key in required:
+                if key not in item_data:
+                    raise ValueError(f"Item {position} is missing '{key}'")
+            for key, allowed in ITEM_FIELDS.items():
+                value = item_data.get(key)
+                if key in item_data and (not isinstance(value, allowed) or isinstance(value, bool)):
+                    raise ValueError(f"Invalid value for '{key}' on item {position}")
+            if 'quantity' in item_data and item_data['quantity'] <= 0:
+                raise ValueError(f"Quantity of item {position} must be greater than zero")
+    
+    @staticmethod
+    def validate_order_fields(order_data: dict):
+        """Reject keys that aren't order fields instead of dropping them silently (ValueError, a 400)"""
+        unknown = sorted(set(order_data) - ORDER_CREATE_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown order fields: {', '.join(unknown)}")
+    
+    @staticmethod
+    def prepare_order_data(db: Session, order_data: dict, lines: List[dict]) -> dict:
+        """Normalise request data and price the order the same way for single and bulk creation"""
+        # Timestamps from offline terminals arrive as ISO strings
+        for key in ('created_at', 'updated_at'):
+            if isinstance(order_data.get(key), str):
+                order_data[key] = datetime.fromisoformat(order_data[key])
+        
+        # Amounts are always computed on the server from the priced lines
+        if order_data.get('discount_rule_id') is not None:
+            PricingService.check_discount_rule(db, order_data['discount_rule_id'])
+        order_data.update(PricingService.compute_totals(
+            db,
+            order_data.get('order_type'),
+            sum(line['subtotal'] for line in lines),
+            order_data.get('discount_rule_id'),
+            order_data.get('discount', 0)
+        ))
+        return order_data
+    
+    @staticmethod
+    def create_orders(db: Session, orders_data: List[dict], user) -> List[Optional[Order]]:
+        """
+        Create orders with their items using bulk INSERT .. RETURNING.
+
+        All orders are inserted in one statement and all items in another;
+        the returned rows populate the order objects directly, and table,
+        customer and menu item references are loaded once for the whole
+        batch. Line prices and order amounts are computed by PricingService.
+        Orders are returned in input order, ready for OrderResponse.
+
+        Bulk inserts skip the before_insert hook that stamps the branch, so
+        the branch is set here from the tenant scope; a branch_id sent by
+        the client is ignored. A token scoped to a whole organization raises
+        BranchRequiredError.
+
+        Orders are inserted with ON CONFLICT DO NOTHING: an order whose number
+        already exists (in any branch, or inserted concurrently) isn't
+        created, and None is returned in its place.
+        """
+        branch_id = write_branch_id()
+        orders_data = [dict(order_data) for order_data in orders_data]
+        for order_data in orders_data:
+            OrderService.validate_order_fields(order_data)
+            OrderService.validate_items(order_data.get('items') or [])
+        lines_data = [
+            PricingService.price_lines(db, order_data.pop('items', None) or [])
+            for order_data in orders_data
+        ]
+        
+        missing_numbers = sum(1 for order_data in orders_data if 'order_number' not in order_data)
+        numbers = iter(DocumentNumberService.next_numbers(db, "order", missing_numbers))
+        now = datetime.now()
+        for order_data, lines in zip(orders_data, lines_data):
+            if 'order_number' not in order_data:
+                order_data['order_number'] = next(numbers)
+            order_data['created_by'] = user.id
+            order_data['branch_id'] = branch_id
+            order_data.setdefault('created_at', now)
+            order_data.setdefault('updated_at', now)
+            OrderService.prepare_order_data(db, order_data, lines)
+        
+        # Rows with different key sets are inserted in separate batches, so
+        # match the returned orders back to the input by order number
+        inserted = db.scalars(pg_insert(Order).on_conflict_do_nothing().returning(Order), orders_data).all()
+        by_number = {order.order_number: order for order in inserted}
+        results = [by_number.get(order_data['order_number']) for order_data in orders_data]
+        orders = [order for order in results if order is not None]
+        
+        item_rows = [
+            {"order_id": order.id, "created_at": now, **line}
+            for order, lines in zip(results, lines_data) if order is not None
+            for line in lines
+        ]
+        items = []
+        if item_rows:
+            items = db.scalars(
+                insert(OrderItem).returning(OrderItem, sort_by_parameter_order=True),
+                item_rows
+            ).all()
+        
+        # Load every referenced table, customer and menu item once
+        table_ids = {order.table_id for order in orders if order.table_id}
+        customer_ids = {order.customer_id for order in orders if order.customer_id}
+        menu_item_ids = {item.menu_item_id for item in items if item.menu_item_id}
+        tables = OrderService._load_by_id(db, Table, table_ids)
+        customers = OrderService._load_by_id(db, Customer, customer_ids)
+        menu_items = OrderService._load_by_id(db, MenuItem, menu_item_ids)
+        
+        items_by_order: Dict[int, List[OrderItem]] = {order.id: [] for order in orders}
+        for item in items:
+            set_committed_value(item, "menu_item", menu_items.get(item.menu_item_id))
+            items_by_order[item.order_id].append(item)
+        
+        for order in orders:
+            order_items = items_by_order[order.id]
+            set_committed_value(order, "items", order_items)
+            set_committed_value(order, "kots", [])
+            set_committed_value(order, "table", tables.get(order.table_id))
+            set_committed_value(order, "customer", customers.get(order.customer_id))
+            
+            # Update table status to Occupied if table order
+            if order.table:
+                order.table.status = "Occupied"
+            
+            # Update customer stats if Paid
+            if order.status in ['Paid', 'Completed'] and order.customer:
+                order.customer.total_visits += 1
+                order.customer.total_spent += order.net_amount
+                order.customer.due_amount += order.credit_amount
+                order.customer.updated_at = now
+            
+            # Closed on creation (e.g. Pay First) - count it in the sales rollups
+            if order.status in ROLLUP_STATUSES:
+                SalesRollupService.record_change(db, None, order, items=order_items)
+        
+        return results
+    
+    @staticmethod
+    def _load_by_id(db: Session, model, ids) -> Dict:
+        """Load rows of a model by primary key in one query"""
+        if not ids:
+            return {}
+        return {row.id: row for row in db.query(model).filter(model.id.in_(ids)).all()}
+    
+    @staticmethod
+    def sync_items(db: Session, order_id: int, items_data: List[dict]) -> Dict[str, int]:
+        """
+        Make an order's items match `items_data` with the fewest writes.
+
+        Incoming lines are matched to existing rows by `id` first, then by
+        (menu_item_id, notes). Matched rows keep the price they were ordered
+        at and are only updated when the quantity or notes changed; unmatched
+        rows are deleted in one statement and new lines are priced from the
+        menu and inserted in one statement.
+        """
+        OrderService.validate_items(items_data)
+        existing = db.query(OrderItem).filter(OrderItem.order_id == order_id).all()
+        by_id = {item.id: item for item in existing}
+        matched = {}  # existing item id -> incoming line
+        unmatched_data = []
+        
+        for item_data in items_data:
+            item = by_id.get(item_data.get('id'))
+            if item is not None and item.id not in matched and item.menu_item_id == item_data['menu_item_id']:
+                matched[item.id] = item_data
+            else:
+                unmatched_data.append(item_data)
+        
+        by_key: Dict[tuple, List[OrderItem]] = {}
+        for item in existing:
+            if item.id not in matched:
+                by_key.setdefault((item.menu_item_id, item.notes or ''), []).append(item)
+        
+        new_lines = []
+        for item_data in unmatched_data:
+            candidates = by_key.get((item_data['menu_item_id'], item_data.get('notes') or ''))
+            if candidates:
+                matched[candidates.pop(0).id] = item_data
+            else:
+                new_lines.append(item_data)
+        
+        now = datetime.now()
+        inserts = [
+            {"order_id": order_id, "created_at": now, **line}
+            for line in PricingService.price_lines(db, new_lines)
+        ]
+        
+        updated = 0
+        for item_id, item_data in matched.items():
+            item = by_id[item_id]
+            values = {
+                "quantity": item_data['quantity'],
+                "subtotal": PricingService.line_subtotal(item.price, item_data['quantity']),
+                "notes": item_data.get('notes', '')
+            }
+            changed = False
+            for key, value in values.items():
+                if getattr(item, key) != value:
+                    setattr(item, key, value)
+                    changed = True
+            updated += changed
+        
+        deleted_ids = [item.id for item in existing if item.id not in matched]
+        if deleted_ids:
+            db.execute(delete(OrderItem).where(OrderItem.id.in_(deleted_ids)))
+        if inserts:
+            db.execute(insert(OrderItem), inserts)
+        
+        return {"inserted": len(inserts), "updated": updated, "deleted": len(deleted_ids)}
+    
+    @staticmethod
+    def add_item(db: Session, order: Order, item_data: dict) -> OrderItem:
+        """Append a single line, priced from the menu, and refresh the order totals"""
+        OrderService.validate_items([item_data])
+        item = OrderItem(order_id=order.id, **PricingService.price_lines(db, [item_data])[0])
+        db.add(item)
+        db.flush()
+        OrderService.recalculate_totals(db, order)
+        return item
+    
+    @staticmethod
+    def update_item(db: Session, order: Order, item_id: int, item_data: dict) -> Optional[OrderItem]:
+        """Change the quantity or notes of a single line and refresh the order totals"""
+        OrderService.validate_items([item_data], required=())
+        item = db.query(OrderItem).filter(OrderItem.id == item_id, OrderItem.order_id == order.id).first()
+        if not item:
+            return None
+        
+        for key in ('quantity', 'notes'):
+            if key in item_data:
+                setattr(item, key, item_data[key])
+        item.subtotal = PricingService.line_subtotal(item.price, item.quantity)
+        db.flush()
+        OrderService.recalculate_totals(db, order)
+        return item
+    
+    @staticmethod
+    def remove_item(db: Session, order: Order, item_id: int) -> bool:
+        """Remove a single line from an order and refresh its totals"""
+        result = db.execute(
+            delete(OrderItem).where(OrderItem.id == item_id, OrderItem.order_id == order.id)
+        )
+        if not result.rowcount:
+            return False
+        OrderService.recalculate_totals(db, order)
+        return True
+    
+    @staticmethod
+    def recalculate_totals(db: Session, order: Order):
+        """Recompute gross, discount, net and total amounts from the stored items"""
+        db.flush()
+        gross = db.query(
+            func.coalesce(func.sum(OrderItem.price * OrderItem.quantity), 0)
+        ).filter(OrderItem.order_id == order.id).scalar()
+        totals = PricingService.compute_totals(
+            db, order.order_type, float(gross), order.discount_rule_id, order.discount
+        )
+        for key, value in totals.items():
+            setattr(order, key, value)
+    
     @staticmethod
     def update_order_status(db: Session, order_id: int, status: str) -> Optional[Order]:
         """Update order status"""
@@ -53,7 +349,7 @@ class OrderService:
     @staticmethod
     def create_kot(db: Session, order_id: int) -> KOT:
         """Create a KOT for an order"""
-        kot_number = f"KOT-{datetime.now().strftime('%Y%m%d')}-{random.randint(1000, 9999)}"
+        kot_number = DocumentNumberService.next_number(db, "kot")
         new_kot = KOT(
             kot_number=kot_number,
             order_id=order_id,
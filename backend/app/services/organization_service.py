@@ -6,6 +6,7 @@ from typing import List, Optional
 from app.models.organization import Organization, SubscriptionPlan, SubscriptionStatus
 from app.models.auth import User
 from app.schemas import OrganizationCreate, OrganizationUpdate
+from app.utils.principal_cache import principal_cache
 from datetime import datetime
 
 
@@ -69,6 +70,7 @@ def create_organization(
         user.organization_id = db_organization.id
         user.is_organization_owner = True
         db.commit()
+        principal_cache.invalidate_user(user.id)
     
     return db_organization
 
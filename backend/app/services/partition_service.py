@@ -0,0 +1,261 @@
+"""
+Monthly range partitioning of the order tables
+
+orders, order_items, kots and kot_items can be converted (once, with
+manage_partitions.py) into tables partitioned by `created_at` month. Date
+range reports then only scan the months they cover, and old months can be
+detached, archived to compressed CSV files and dropped instead of deleted
+row by row.
+
+Partitioning changes keys that the unpartitioned schema relies on, because
+Postgres requires the partition key in every unique index of a partitioned
+table:
+
+- primary keys become (id, created_at), and unique indexes (order and KOT
+  numbers) become unique on (number, created_at); see convert_table, and
+- foreign keys pointing at these tables (order_items.order_id,
+  kots.order_id, kot_items.kot_id) are dropped; item and ticket rows are
+  still removed with their order by the ORM cascades.
+
+Each table also gets a DEFAULT partition, so an insert never fails when the
+partition for its month is missing; ensure_partitions moves such rows into
+their month once it is created.
+
+Alembic autogenerate ignores the partitions themselves, but on a converted
+database it reports the key and foreign key differences above; drop those
+operations from generated migrations.
+"""
+import gzip
+import os
+import re
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+
+# Converted in this order so that references between them are dropped first
+PARTITIONED_TABLES = ["orders", "order_items", "kots", "kot_items"]
+
+
+def _month_start(day: date) -> date:
+    return date(day.year, day.month, 1)
+
+
+def _add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class PartitionService:
+    """Service for creating, listing and archiving monthly partitions"""
+
+    @staticmethod
+    def partition_name(table: str, month: date) -> str:
+        return f"{table}_p{month:%Y%m}"
+
+    @staticmethod
+    def is_partitioned(db: Session, table: str) -> bool:
+        return db.execute(text(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table))"
+        ), {"table": table}).scalar()
+
+    @staticmethod
+    def list_partitions(db: Session, table: str) -> List[Tuple[str, str]]:
+        """(partition name, bound expression) of a partitioned table, oldest first"""
+        rows = db.execute(text("""
+            SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+            FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = to_regclass(:table)
+            ORDER BY c.relname
+        """), {"table": table}).all()
+        return [(name, bound) for name, bound in rows]
+
+    @staticmethod
+    def _partition_exists(db: Session, name: str) -> bool:
+        return db.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name}).scalar()
+
+    @staticmethod
+    def create_partition(db: Session, table: str, month: date) -> bool:
+        """Create the partition of `table` for a month; False if it already exists"""
+        month = _month_start(month)
+        name = PartitionService.partition_name(table, month)
+        if PartitionService._partition_exists(db, name):
+            return False
+        bounds = {"start": month, "end": _add_months(month, 1)}
+        bound_sql = f"FOR VALUES FROM ('{bounds['start']}') TO ('{bounds['end']}')"
+
+        default = f"{table}_default"
+        stray = PartitionService._partition_exists(db, default) and db.execute(text(
+            f"SELECT EXISTS (SELECT 1 FROM {default} WHERE created_at >= :start AND created_at < :end)"
+        ), bounds).scalar()
+        if not stray:
+            db.execute(text(f"CREATE TABLE {name} PARTITION OF {table} {bound_sql}"))
+            return True
+
+        # Rows of this month landed in the default partition; move them over
+        # before attaching, since the new range may not overlap the default
+        db.execute(text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS)"))
+        db.execute(text(f"""
+            WITH moved AS (
+                DELETE FROM {default} WHERE created_at >= :start AND created_at < :end RETURNING *
+            )
+            INSERT INTO {name} SELECT * FROM moved
+        """), bounds)
+        db.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {name} {bound_sql}"))
+        return True
+
+    @staticmethod
+    def ensure_partitions(db: Session, months_ahead: Optional[int] = None, today: Optional[date] = None) -> List[str]:
+        """Create missing partitions from the current month up to `months_ahead` months ahead"""
+        if months_ahead is None:
+            months_ahead = settings.PARTITION_MONTHS_AHEAD
+        current = _month_start(today or date.today())
+        created = []
+        for table in PARTITIONED_TABLES:
+            if not PartitionService.is_partitioned(db, table):
+                continue
+            for offset in range(months_ahead + 1):
+                month = _add_months(current, offset)
+                if PartitionService.create_partition(db, table, month):
+                    created.append(PartitionService.partition_name(table, month))
+        db.commit()
+        return created
+
+    @staticmethod
+    def convert_table(db: Session, table: str, months_ahead: Optional[int] = None) -> Dict:
+        """
+        Rebuild an unpartitioned table as a partitioned one with the same
+        columns, data, indexes and outgoing foreign keys. Runs in the caller's
+        transaction and holds an exclusive lock on the table until commit.
+
+        Unique indexes get created_at appended, e.g. orders.order_number
+        becomes unique on (order_number, created_at). Numbers issued by the
+        server stay unique through the document counters. POST /orders/batch
+        stays idempotent for terminals that resend an order with its original
+        created_at: its lookup by number uses the index as a prefix, and the
+        index still rejects a concurrent duplicate insert. Orders sent without
+        created_at are only deduplicated by that lookup.
+        """
+        if PartitionService.is_partitioned(db, table):
+            raise ValueError(f"{table} is already partitioned")
+        if months_ahead is None:
+            months_ahead = settings.PARTITION_MONTHS_AHEAD
+        old = f"{table}_unpartitioned"
+
+        db.execute(text(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE"))
+        db.execute(text(f"ALTER TABLE {table} RENAME TO {old}"))
+        indexes = db.execute(text("""
+            SELECT i.indexname, i.indexdef
+            FROM pg_indexes i
+            WHERE i.tablename = :old
+              AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conname = i.indexname AND c.contype = 'p')
+        """), {"old": old}).all()
+        foreign_keys = db.execute(text("""
+            SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint
+            WHERE conrelid = to_regclass(:old) AND contype = 'f'
+        """), {"old": old}).all()
+        dropped_references = db.execute(text("""
+            SELECT conrelid::regclass::text || '.' || conname FROM pg_constraint
+            WHERE confrelid = to_regclass(:old) AND contype = 'f'
+        """), {"old": old}).scalars().all()
+
+        db.execute(text(f"UPDATE {old} SET created_at = now() WHERE created_at IS NULL"))
+        first, last = db.execute(text(f"SELECT min(created_at), max(created_at) FROM {old}")).one()
+        today = date.today()
+
+        db.execute(text(f"CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS) PARTITION BY RANGE (created_at)"))
+        db.execute(text(f"ALTER TABLE {table} ALTER COLUMN created_at SET NOT NULL"))
+        db.execute(text(f"ALTER SEQUENCE IF EXISTS {table}_id_seq OWNED BY {table}.id"))
+
+        month = _month_start(min(first.date() if first else today, today))
+        until = _add_months(_month_start(max(last.date() if last else today, today)), months_ahead)
+        partitions = 0
+        while month <= until:
+            PartitionService.create_partition(db, table, month)
+            month = _add_months(month, 1)
+            partitions += 1
+        db.execute(text(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT"))
+
+        rows = db.execute(text(f"INSERT INTO {table} SELECT * FROM {old}")).rowcount
+        db.execute(text(f"DROP TABLE {old} CASCADE"))
+
+        db.execute(text(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id, created_at)"))
+        for name, definition in indexes:
+            if definition.startswith("CREATE UNIQUE INDEX"):
+                definition = PartitionService._with_partition_key(definition)
+            db.execute(text(definition.replace(f" ON public.{old} ", f" ON public.{table} ")))
+        for name, definition in foreign_keys:
+            db.execute(text(f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition}"))
+
+        return {"table": table, "rows": rows, "partitions": partitions, "dropped_references": dropped_references}
+
+    @staticmethod
+    def _with_partition_key(definition: str) -> str:
+        """Append created_at to a unique index definition, as partitioned tables require"""
+        columns = re.search(r" USING \w+ \((.*)\)", definition.split(" WHERE ")[0])
+        if "created_at" in [column.strip() for column in columns.group(1).split(",")]:
+            return definition
+        end = columns.end(1)
+        return f"{definition[:end]}, created_at{definition[end:]}"
+
+    @staticmethod
+    def convert_all(db: Session, months_ahead: Optional[int] = None) -> List[Dict]:
+        """Partition every order table that isn't partitioned yet, in one transaction"""
+        results = [
+            PartitionService.convert_table(db, table, months_ahead)
+            for table in PARTITIONED_TABLES
+            if not PartitionService.is_partitioned(db, table)
+        ]
+        db.commit()
+        return results
+
+    @staticmethod
+    def archive_partitions(
+        db: Session,
+        older_than_months: int,
+        archive_dir: Optional[str] = None,
+        today: Optional[date] = None
+    ) -> List[str]:
+        """
+        Detach months that ended more than `older_than_months` months ago,
+        write each to `<archive_dir>/<partition>.csv.gz` and drop it.
+        Returns the archive file paths.
+        """
+        if older_than_months < 1:
+            raise ValueError("older_than_months must be at least 1")
+        archive_dir = archive_dir or settings.PARTITION_ARCHIVE_DIR
+        cutoff = _add_months(_month_start(today or date.today()), -older_than_months)
+        os.makedirs(archive_dir, exist_ok=True)
+
+        # Children first, so a month's items never outlive its orders
+        paths = []
+        for table in reversed(PARTITIONED_TABLES):
+            if not PartitionService.is_partitioned(db, table):
+                continue
+            for name, _ in PartitionService.list_partitions(db, table):
+                suffix = name[len(table) + 2:]
+                if not name.startswith(f"{table}_p") or not suffix.isdigit():
+                    continue
+                if datetime.strptime(suffix, "%Y%m").date() >= cutoff:
+                    continue
+                db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+                path = os.path.join(archive_dir, f"{name}.csv.gz")
+                PartitionService._copy_to_file(db, name, path)
+                db.execute(text(f"DROP TABLE {name}"))
+                db.commit()
+                paths.append(path)
+        return paths
+
+    @staticmethod
+    def _copy_to_file(db: Session, table: str, path: str):
+        tmp_path = f"{path}.tmp"
+        cursor = db.connection().connection.driver_connection.cursor()
+        try:
+            with gzip.open(tmp_path, "wb") as f:
+                cursor.copy_expert(f"COPY {table} TO STDOUT WITH (FORMAT csv, HEADER)", f)
+        finally:
+            cursor.close()
+        os.replace(tmp_path, path)
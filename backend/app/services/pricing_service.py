@@ -0,0 +1,133 @@
+"""
+Order pricing service
+
+Line prices, discounts and order totals are computed here from the cached
+menu prices and discount rules; amounts sent by clients are ignored.
+"""
+from typing import Dict, List, Optional
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.utils.price_cache import price_cache, PriceSnapshot
+from app.utils.tenant_scope import current_branch_id
+
+# Order type -> DiscountRule.applicable_on scope, keyed by normalize_order_type
+ORDER_TYPE_SCOPES = {
+    "table": "Dine-In",
+    "dine-in": "Dine-In",
+    "takeaway": "Takeaway",
+    "pay first": "Takeaway",
+    "delivery": "Delivery",
+    "self delivery": "Delivery",
+    "delivery partner": "Delivery",
+}
+
+
+def normalize_order_type(order_type: Optional[str]) -> str:
+    """Canonical spelling of an order type or scope, e.g. 'Dine In' and 'Dine-in' -> 'dine-in'"""
+    normalized = " ".join((order_type or "").lower().replace("_", " ").split())
+    return normalized.replace("dine in", "dine-in")
+
+
+def order_type_scope(order_type: Optional[str]) -> Optional[str]:
+    """Discount rule scope (Dine-In, Takeaway or Delivery) of an order type"""
+    return ORDER_TYPE_SCOPES.get(normalize_order_type(order_type))
+
+
+class PricingService:
+    """Service for computing order line and order amounts"""
+
+    @staticmethod
+    def _snapshot(db: Session) -> PriceSnapshot:
+        """
+        Cached prices at the current menu and settings version; an item or
+        rule missing from it doesn't exist, so unknown ids never reload it
+        """
+        return price_cache.get(db)
+
+    @staticmethod
+    def line_subtotal(price: float, quantity) -> float:
+        """Subtotal of a line; the quantity must be positive"""
+        if not quantity or quantity <= 0:
+            raise ValueError("Item quantity must be greater than zero")
+        return round(price * quantity, 2)
+
+    @staticmethod
+    def price_lines(db: Session, items_data: List[dict]) -> List[dict]:
+        """Order item column values for new lines, priced from the menu"""
+        if not items_data:
+            return []
+        snapshot = PricingService._snapshot(db)
+        branch_id = current_branch_id()
+
+        lines = []
+        for item_data in items_data:
+            menu_item_id = item_data['menu_item_id']
+            price, is_active, item_branch_id = snapshot.prices.get(menu_item_id, (None, False, None))
+            if price is None or (item_branch_id and branch_id and item_branch_id != branch_id):
+                raise ValueError(f"Menu item {menu_item_id} not found")
+            if not is_active:
+                raise ValueError(f"Menu item {menu_item_id} is not available")
+            lines.append({
+                "menu_item_id": menu_item_id,
+                "quantity": item_data['quantity'],
+                "price": price,
+                "subtotal": PricingService.line_subtotal(price, item_data['quantity']),
+                "notes": item_data.get('notes', '')
+            })
+        return lines
+
+    @staticmethod
+    def check_discount_rule(db: Session, discount_rule_id: int) -> Dict:
+        """Get an active discount rule by ID"""
+        rule = PricingService._snapshot(db).discount_rules.get(discount_rule_id)
+        if rule is None:
+            raise ValueError(f"Discount rule {discount_rule_id} not found or inactive")
+        return rule
+
+    @staticmethod
+    def rule_discount(rule: Dict, order_type: str, gross_amount: float) -> float:
+        """Discount a rule gives an order; 0 when the order doesn't qualify"""
+        scope = normalize_order_type(rule['applicable_on'])
+        if scope != "all" and scope != normalize_order_type(order_type_scope(order_type)):
+            return 0.0
+        if gross_amount < rule['min_order_amount']:
+            return 0.0
+
+        if rule['discount_type'] == "Percentage":
+            discount = gross_amount * rule['discount_value'] / 100
+        else:
+            discount = rule['discount_value']
+        if rule['max_discount_amount'] is not None:
+            discount = min(discount, rule['max_discount_amount'])
+        return discount
+
+    @staticmethod
+    def compute_totals(
+        db: Session,
+        order_type: str,
+        gross_amount: float,
+        discount_rule_id: Optional[int] = None,
+        discount: float = 0
+    ) -> Dict[str, float]:
+        """
+        Gross, discount, net and total amounts of an order.
+
+        The discount comes from `discount_rule_id` when set (a rule that was
+        deactivated since gives no discount), otherwise `discount` is taken
+        as a manual amount. The service charge is added on top of the
+        discounted amount.
+        """
+        if discount_rule_id is not None:
+            snapshot = PricingService._snapshot(db)
+            rule = snapshot.discount_rules.get(discount_rule_id)
+            discount = PricingService.rule_discount(rule, order_type, gross_amount) if rule else 0.0
+        discount = min(max(discount or 0.0, 0.0), gross_amount)
+
+        discounted = gross_amount - discount
+        net_amount = discounted + discounted * settings.SERVICE_CHARGE_PERCENT / 100
+        return {
+            "gross_amount": round(gross_amount, 2),
+            "discount": round(discount, 2),
+            "net_amount": round(net_amount, 2),
+            "total_amount": round(net_amount, 2)
+        }
@@ -3,23 +3,22 @@ Purchase management service
 """
 from typing import List, Optional
 from sqlalchemy.orm import Session
-from datetime import datetime
-import random
 from app.models.purchase import Supplier, PurchaseBill, PurchaseReturn
+from app.services.document_number_service import DocumentNumberService
 
 
 class PurchaseService:
     """Service for purchase operations"""
     
     @staticmethod
-    def generate_bill_number() -> str:
+    def generate_bill_number(db: Session) -> str:
         """Generate a unique purchase bill number"""
-        return f"PO-{datetime.now().strftime('%Y%m%d')}-{random.randint(1000, 9999)}"
+        return DocumentNumberService.next_number(db, "purchase_bill")
     
     @staticmethod
-    def generate_return_number() -> str:
+    def generate_return_number(db: Session) -> str:
         """Generate a unique return number"""
-        return f"RET-{datetime.now().strftime('%Y%m%d')}-{random.randint(1000, 9999)}"
+        return DocumentNumberService.next_number(db, "purchase_return")
     
     @staticmethod
     def get_all_suppliers(db: Session) -> List[Supplier]:
@@ -39,7 +38,7 @@ class PurchaseService:
     def create_purchase_bill(db: Session, bill_data: dict) -> PurchaseBill:
         """Create a new purchase bill"""
         if 'bill_number' not in bill_data:
-            bill_data['bill_number'] = PurchaseService.generate_bill_number()
+            bill_data['bill_number'] = PurchaseService.generate_bill_number(db)
         
         new_bill = PurchaseBill(**bill_data)
         db.add(new_bill)
@@ -51,7 +50,7 @@ class PurchaseService:
     def create_purchase_return(db: Session, return_data: dict) -> PurchaseReturn:
         """Create a new purchase return"""
         if 'return_number' not in return_data:
-            return_data['return_number'] = PurchaseService.generate_return_number()
+            return_data['return_number'] = PurchaseService.generate_return_number(db)
         
         new_return = PurchaseReturn(**return_data)
         db.add(new_return)
@@ -0,0 +1,235 @@
+"""
+Background report jobs
+
+PDF and Excel rendering is CPU bound, so report files are rendered in a
+process pool instead of inside request handlers. A job's id is derived from
+the report type, its parameters, the submitting user, the tenant scope and a
+fingerprint of the underlying data (see ReportService.report_version), which
+gives two properties for free:
+
+- identical requests submitted while a job is running join that job, and
+- a rendered file on disk is reused until it expires or the data changes.
+
+Jobs belong to the user and tenant scope that submitted them; looking one
+up from anyone else finds nothing.
+
+Finished files live in settings.REPORT_CACHE_DIR, next to a small JSON file
+naming their owner, and are evicted after settings.REPORT_CACHE_TTL_SECONDS.
+Because ids are content based, any API worker can serve a file rendered by
+another one.
+"""
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.services.report_service import ReportService, JOB_REPORTS
+from app.utils.report_renderer import render_report
+from app.utils.tenant_scope import tenant_cache_key
+
+# File format -> media type
+REPORT_FORMATS = {
+    "pdf": "application/pdf",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+class ReportJob:
+    """A report file being rendered, or already on disk"""
+
+    def __init__(self, job_id: str, report_type: str, file_format: str, params: Dict, path: str,
+                 user_id: Optional[int] = None, scope_key: Optional[str] = None):
+        self.id = job_id
+        self.report_type = report_type
+        self.file_format = file_format
+        self.params = params
+        self.path = path
+        self.user_id = user_id
+        self.scope_key = scope_key
+        self.status = "queued"  # queued, running, done, failed
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.done = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def filename(self) -> str:
+        return f"{self.report_type}.{self.file_format}"
+
+    @property
+    def media_type(self) -> str:
+        return REPORT_FORMATS[self.file_format]
+
+    def is_owned_by(self, user_id: int, scope_key: str) -> bool:
+        """Whether the job was submitted by this user in this tenant scope"""
+        return self.user_id == user_id and self.scope_key == scope_key
+
+    def finish(self, status: str, error: Optional[str] = None):
+        self.status = status
+        self.error = error
+        self.finished_at = time.time()
+        self.done.set()
+
+    def to_dict(self) -> Dict:
+        return {
+            "job_id": self.id,
+            "report_type": self.report_type,
+            "format": self.file_format,
+            "params": self.params,
+            "status": self.status,
+            "error": self.error,
+            "download_url": f"{settings.API_PREFIX}/reports/jobs/{self.id}/download" if self.status == "done" else None
+        }
+
+
+class ReportJobQueue:
+    """Runs report jobs on a process pool and caches their files on disk"""
+
+    def __init__(self, cache_dir: str, ttl_seconds: int, max_workers: int):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.max_workers = max_workers
+        self._jobs: Dict[str, ReportJob] = {}
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Spawned workers don't inherit the event loop, engines or sockets
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def _path(self, job_id: str, file_format: str) -> str:
+        return os.path.join(self.cache_dir, f"{job_id}.{file_format}")
+
+    def _owner_path(self, job_id: str) -> str:
+        return os.path.join(self.cache_dir, f"{job_id}.json")
+
+    def _is_fresh(self, path: str) -> bool:
+        try:
+            return time.time() - os.path.getmtime(path) < self.ttl_seconds
+        except OSError:
+            return False
+
+    async def submit(self, db: AsyncSession, user_id: int, report_type: str, file_format: str,
+                     params: Optional[Dict] = None) -> ReportJob:
+        """
+        Start rendering a report for a user, or return their running or cached job for it.
+
+        Raises ValueError for an unknown report type, format or parameter.
+        """
+        if file_format not in REPORT_FORMATS:
+            raise ValueError(f"Unsupported format: {file_format}")
+        params = ReportService.normalize_params(report_type, params)
+        self.evict_expired()
+
+        version = await db.run_sync(ReportService.report_version, report_type, params)
+        # Rows are limited to the request's branch, so files are per tenant too
+        scope_key = tenant_cache_key()
+        key = json.dumps([report_type, file_format, params, version, user_id, scope_key])
+        job_id = hashlib.sha256(key.encode()).hexdigest()[:32]
+
+        job = self._jobs.get(job_id)
+        if job is not None and (job.status in ("queued", "running") or
+                                (job.status == "done" and self._is_fresh(job.path))):
+            return job
+
+        job = ReportJob(
+            job_id, report_type, file_format, params, self._path(job_id, file_format), user_id, scope_key
+        )
+        self._jobs[job_id] = job
+        if self._is_fresh(job.path):
+            job.finish("done")
+            return job
+
+        # Registered before loading rows, so concurrent identical requests join it
+        try:
+            rows = await db.run_sync(ReportService.report_rows, report_type, params)
+        except Exception as e:
+            job.finish("failed", str(e))
+            raise
+        job.task = asyncio.create_task(self._run(job, rows))
+        return job
+
+    async def _run(self, job: ReportJob, rows: list):
+        job.status = "running"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            await asyncio.get_running_loop().run_in_executor(
+                self._get_executor(), render_report,
+                job.report_type, job.file_format, JOB_REPORTS[job.report_type][0], rows, job.path
+            )
+            # Written after the file, so it never expires before it
+            with open(self._owner_path(job.id), "w") as owner_file:
+                json.dump({"report_type": job.report_type, "user_id": job.user_id, "scope_key": job.scope_key},
+                          owner_file)
+        except Exception as e:
+            job.finish("failed", str(e) or type(e).__name__)
+        else:
+            job.finish("done")
+
+    def _load(self, job_id: str) -> Optional[ReportJob]:
+        """A finished job from a file rendered by another API worker"""
+        for file_format in REPORT_FORMATS:
+            path = self._path(job_id, file_format)
+            if not self._is_fresh(path):
+                continue
+            try:
+                with open(self._owner_path(job_id)) as owner_file:
+                    owner = json.load(owner_file)
+            except (OSError, ValueError):
+                return None
+            job = ReportJob(job_id, owner["report_type"], file_format, {}, path, owner["user_id"], owner["scope_key"])
+            job.finish("done")
+            return job
+        return None
+
+    def get(self, job_id: str, user_id: int) -> Optional[ReportJob]:
+        """
+        Look up a job submitted by the user in the current tenant scope,
+        including files rendered by another API worker
+        """
+        job = self._jobs.get(job_id) or self._load(job_id)
+        if job is None or not job.is_owned_by(user_id, tenant_cache_key()):
+            return None
+        return job
+
+    def evict_expired(self):
+        """Delete expired report files and forget finished jobs older than the TTL"""
+        now = time.time()
+        for job_id, job in list(self._jobs.items()):
+            if job.finished_at is not None and now - job.finished_at >= self.ttl_seconds:
+                del self._jobs[job_id]
+        try:
+            entries = list(os.scandir(self.cache_dir))
+        except OSError:
+            return
+        for entry in entries:
+            try:
+                if now - entry.stat().st_mtime >= self.ttl_seconds:
+                    os.remove(entry.path)
+            except OSError:
+                pass
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+report_jobs = ReportJobQueue(
+    cache_dir=settings.REPORT_CACHE_DIR,
+    ttl_seconds=settings.REPORT_CACHE_TTL_SECONDS,
+    max_workers=settings.REPORT_WORKERS
+)
@@ -1,13 +1,47 @@
 """
 Report generation service
 """
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select, func, Select
 from sqlalchemy.orm import Session
-from datetime import datetime
-from app.models.orders import Order
+from datetime import datetime, timedelta
+import hashlib
+import json
+from app.models.orders import Order, Table
+from app.models.customers import Customer
+from app.services.rollup_service import SalesRollupService
+from app.services.session_report_service import SessionReportService
 from app.utils.pdf_generator import generate_pdf_report, generate_invoice_pdf
 from app.utils.excel_generator import generate_excel_report
 
+# Order history export: (header, column)
+ORDER_EXPORT_COLUMNS = [
+    ("Order Number", Order.order_number),
+    ("Date", Order.created_at),
+    ("Order Type", Order.order_type),
+    ("Status", Order.status),
+    ("Table", Table.table_id),
+    ("Customer", Customer.name),
+    ("Gross", Order.gross_amount),
+    ("Discount", Order.discount),
+    ("Net", Order.net_amount),
+    ("Paid", Order.paid_amount),
+    ("Credit", Order.credit_amount),
+    ("Payment Type", Order.payment_type),
+]
+
+# Reports that can be rendered by report jobs: report type -> (title, accepted params)
+JOB_REPORTS = {
+    "sales-summary": ("Sales Summary", ()),
+    "day-book": ("Day Book", ("date",)),
+    "orders": ("Order History", ("start_date", "end_date", "status", "order_type")),
+    "sessions": ("Session Report", ("start_date", "end_date", "user_id")),
+}
+
+
+def _parse_datetime(value) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
 
 class ReportService:
     """Service for report generation"""
@@ -15,9 +49,9 @@ class ReportService:
     @staticmethod
     def get_sales_summary(db: Session) -> Dict:
         """Get sales summary report"""
-        orders = db.query(Order).filter(Order.status == 'Completed').all()
-        total_sales = sum(order.total_amount or 0 for order in orders)
-        total_orders = len(orders)
+        totals = SalesRollupService.get_sales_totals(db, statuses=['Completed'])
+        total_sales = totals["net_amount"]
+        total_orders = totals["order_count"]
         
         return {
             "total_sales": total_sales,
@@ -37,6 +71,140 @@ class ReportService:
         
         return orders
     
+    @staticmethod
+    def order_filters(
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        status: Optional[str] = None,
+        order_type: Optional[str] = None
+    ) -> List:
+        """WHERE conditions shared by the order history reports"""
+        conditions = []
+        if start_date:
+            conditions.append(Order.created_at >= start_date)
+        if end_date:
+            conditions.append(Order.created_at < end_date)
+        if status:
+            conditions.append(Order.status == status)
+        if order_type:
+            conditions.append(Order.order_type == order_type)
+        return conditions
+    
+    @staticmethod
+    def order_export_query(
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        status: Optional[str] = None,
+        order_type: Optional[str] = None
+    ) -> Tuple[List[str], Select]:
+        """Header and column-only query for exporting order history, oldest first"""
+        query = (
+            select(*(column for _, column in ORDER_EXPORT_COLUMNS))
+            .outerjoin(Table, Order.table_id == Table.id)
+            .outerjoin(Customer, Order.customer_id == Customer.id)
+            .where(*ReportService.order_filters(start_date, end_date, status, order_type))
+        )
+        header = [name for name, _ in ORDER_EXPORT_COLUMNS]
+        return header, query.order_by(Order.created_at, Order.id)
+    
+    @staticmethod
+    def normalize_params(report_type: str, params: Optional[Dict]) -> Dict[str, str]:
+        """Validate report job parameters and put them in a canonical form"""
+        if report_type not in JOB_REPORTS:
+            raise ValueError(f"Unknown report type: {report_type}")
+        accepted = JOB_REPORTS[report_type][1]
+        normalized = {}
+        for key, value in (params or {}).items():
+            if value is None or value == "":
+                continue
+            if key not in accepted:
+                raise ValueError(f"Unknown parameter '{key}' for {report_type}")
+            if key in ("date", "start_date", "end_date"):
+                try:
+                    value = _parse_datetime(value).isoformat()
+                except (TypeError, ValueError):
+                    raise ValueError(f"Invalid date for '{key}'")
+            elif key == "user_id":
+                try:
+                    value = int(value)
+                except (TypeError, ValueError):
+                    raise ValueError("Invalid user_id")
+            normalized[key] = str(value)
+        return dict(sorted(normalized.items()))
+    
+    @staticmethod
+    def _day_book_range(params: Dict) -> Tuple[datetime, datetime]:
+        day = _parse_datetime(params.get("date")) or datetime.now()
+        start = datetime.combine(day.date(), datetime.min.time())
+        return start, start + timedelta(days=1)
+    
+    @staticmethod
+    def _order_report_filters(report_type: str, params: Dict) -> List:
+        if report_type == "day-book":
+            return ReportService.order_filters(*ReportService._day_book_range(params))
+        return ReportService.order_filters(
+            _parse_datetime(params.get("start_date")),
+            _parse_datetime(params.get("end_date")),
+            params.get("status"),
+            params.get("order_type")
+        )
+    
+    @staticmethod
+    def _session_report_args(params: Dict) -> Tuple:
+        user_id = params.get("user_id")
+        return (
+            _parse_datetime(params.get("start_date")),
+            _parse_datetime(params.get("end_date")),
+            int(user_id) if user_id else None
+        )
+    
+    @staticmethod
+    def report_rows(db: Session, report_type: str, params: Dict) -> List[Dict]:
+        """Rows of a job report, as dicts ready for the PDF/Excel generators"""
+        if report_type == "sales-summary":
+            return [{"Metric": k, "Value": v} for k, v in ReportService.get_sales_summary(db).items()]
+        
+        if report_type == "day-book":
+            query = (
+                select(Order.order_number, Order.total_amount, Order.created_at)
+                .where(*ReportService._order_report_filters(report_type, params))
+                .order_by(Order.created_at, Order.id)
+            )
+            return [
+                {"Order Number": number, "Total": total, "Date": str(created_at)}
+                for number, total, created_at in db.execute(query)
+            ]
+        
+        if report_type == "orders":
+            header, query = ReportService.order_export_query(
+                _parse_datetime(params.get("start_date")),
+                _parse_datetime(params.get("end_date")),
+                params.get("status"),
+                params.get("order_type")
+            )
+            return [dict(zip(header, row)) for row in db.execute(query)]
+        
+        return SessionReportService.get_sessions(db, *ReportService._session_report_args(params))
+    
+    @staticmethod
+    def report_version(db: Session, report_type: str, params: Dict) -> str:
+        """
+        Cheap fingerprint of the data behind a job report.
+
+        It changes whenever rows in the report are added, removed or
+        updated, so cached report files are never served stale.
+        """
+        if report_type == "sales-summary":
+            values = ReportService.report_rows(db, report_type, params)
+        elif report_type in ("day-book", "orders"):
+            values = db.execute(
+                select(func.count(Order.id), func.max(Order.updated_at), func.sum(Order.net_amount))
+                .where(*ReportService._order_report_filters(report_type, params))
+            ).one()
+        else:
+            values = SessionReportService.report_version_values(db, *ReportService._session_report_args(params))
+        return hashlib.sha256(json.dumps(list(values), default=str).encode()).hexdigest()[:16]
+    
     @staticmethod
     def generate_pdf_report(report_type: str, data: List[Dict], title: str = None) -> bytes:
         """Generate PDF report"""
@@ -53,6 +221,37 @@ class ReportService:
         
         return generate_excel_report(data, title)
     
+    @staticmethod
+    def invoice_data(order: Order) -> Dict:
+        """Values printed on an order's invoice/receipt (order loaded with table, customer and items)"""
+        gross = order.gross_amount or 0
+        discount = order.discount or 0
+        net = order.net_amount or 0
+        return {
+            "order_number": order.order_number,
+            "date": (order.created_at or datetime.now()).strftime('%Y-%m-%d %H:%M'),
+            "order_type": order.order_type,
+            "table": order.table.table_id if order.table else None,
+            "customer": order.customer.name if order.customer else None,
+            "items": [
+                {
+                    "name": item.menu_item.name if item.menu_item else f"Item #{item.menu_item_id}",
+                    "quantity": item.quantity,
+                    "price": item.price,
+                    "subtotal": item.subtotal,
+                    "notes": item.notes
+                }
+                for item in order.items
+            ],
+            "gross_amount": gross,
+            "discount": discount,
+            "service_charge": round(net - gross + discount, 2),
+            "net_amount": net,
+            "paid_amount": order.paid_amount,
+            "credit_amount": order.credit_amount,
+            "payment_type": order.payment_type
+        }
+    
     @staticmethod
     def generate_order_invoice(order_data: Dict) -> bytes:
         """Generate invoice PDF for an order"""
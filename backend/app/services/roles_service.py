@@ -4,12 +4,15 @@ Role service for managing dynamic roles and permissions
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.models.role import Role
-from app.schemas import RoleCreate, RoleUpdate
+from app.schemas import RoleCreate, RoleUpdate, RoleResponse
+from app.utils.cache import cached, invalidates
 
 
-def get_roles(db: Session, skip: int = 0, limit: int = 100) -> List[Role]:
-    """Get all roles"""
-    return db.query(Role).offset(skip).limit(limit).all()
+@cached("roles", shared=True)
+def get_roles(db: Session, skip: int = 0, limit: int = 100) -> List[dict]:
+    """Get all roles (cached)"""
+    roles = db.query(Role).order_by(Role.id).offset(skip).limit(limit).all()
+    return [RoleResponse.model_validate(role).model_dump() for role in roles]
 
 
 def get_role(db: Session, role_id: int) -> Optional[Role]:
@@ -22,6 +25,7 @@ def get_role_by_name(db: Session, name: str) -> Optional[Role]:
     return db.query(Role).filter(Role.name == name).first()
 
 
+@invalidates("roles")
 def create_role(db: Session, role_data: RoleCreate) -> Role:
     """Create a new role"""
     db_role = Role(
@@ -35,6 +39,7 @@ def create_role(db: Session, role_data: RoleCreate) -> Role:
     return db_role
 
 
+@invalidates("roles")
 def update_role(db: Session, role_id: int, role_data: RoleUpdate) -> Optional[Role]:
     """Update an existing role"""
     db_role = get_role(db, role_id)
@@ -50,6 +55,7 @@ def update_role(db: Session, role_id: int, role_data: RoleUpdate) -> Optional[Ro
     return db_role
 
 
+@invalidates("roles")
 def delete_role(db: Session, role_id: int) -> bool:
     """Delete a role"""
     db_role = get_role(db, role_id)
@@ -0,0 +1,334 @@
+"""
+Sales rollup service
+
+Maintains the hourly sales and menu-item rollup tables. Rollups are updated
+incrementally whenever an order in a tracked status changes, or enters or
+leaves one, inside the same transaction as the order change, so reports can
+read O(hours) rows instead of rescanning orders and order items.
+"""
+from typing import Dict, List, Optional
+from datetime import datetime, timedelta
+from sqlalchemy import func, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from app.models.archive import ArchivedOrder
+from app.models.orders import Order, OrderItem
+from app.models.reporting import SalesHourlyRollup, MenuItemHourlyRollup
+from app.models.tenancy import scope_branch_criteria
+from app.utils.tenant_scope import get_tenant_scope
+
+
+# Order statuses that are accumulated in the rollups
+ROLLUP_STATUSES = ["Paid", "Completed", "Cancelled"]
+
+SALES_AMOUNT_FIELDS = ["gross_amount", "net_amount", "discount", "paid_amount", "credit_amount"]
+
+
+def _filter_branches(query, model, branch_id: Optional[int]):
+    # Rollups aren't branch-scoped models, so apply the request's scope by hand:
+    # its branch, or the branches of its organization
+    scope = get_tenant_scope()
+    if scope is not None:
+        query = query.filter(scope_branch_criteria(model.branch_id, scope))
+    if branch_id is not None:
+        query = query.filter(model.branch_id == branch_id)
+    return query
+
+
+class SalesRollupService:
+    """Service for maintaining and reading sales rollups"""
+
+    @staticmethod
+    def snapshot(db: Session, order: Order, items: Optional[List[OrderItem]] = None) -> Dict:
+        """
+        Capture the rollup contribution of an order in its current state.
+
+        Pass `items` when the order's items are already in memory (e.g. just
+        inserted) to skip the per-order item query.
+        """
+        created_at = order.created_at or datetime.now()
+
+        if items is None:
+            items = db.query(
+                OrderItem.menu_item_id,
+                func.sum(OrderItem.quantity),
+                func.sum(OrderItem.subtotal)
+            ).filter(
+                OrderItem.order_id == order.id
+            ).group_by(OrderItem.menu_item_id).all()
+        else:
+            totals: Dict[int, List] = {}
+            for item in items:
+                total = totals.setdefault(item.menu_item_id, [0, 0.0])
+                total[0] += item.quantity or 0
+                total[1] += item.subtotal or 0
+            items = [(menu_item_id, quantity, subtotal) for menu_item_id, (quantity, subtotal) in totals.items()]
+
+        return {
+            "branch_id": order.branch_id or 0,
+            "hour": created_at.replace(minute=0, second=0, microsecond=0),
+            "order_type": order.order_type,
+            "payment_type": order.payment_type or "",
+            "status": order.status,
+            "amounts": {field: getattr(order, field) or 0 for field in SALES_AMOUNT_FIELDS},
+            "items": sorted(
+                (menu_item_id, int(quantity or 0), float(subtotal or 0))
+                for menu_item_id, quantity, subtotal in items
+                if menu_item_id is not None
+            )
+        }
+
+    @staticmethod
+    def apply(db: Session, snapshot: Dict, sign: int = 1):
+        """Add (sign=1) or remove (sign=-1) a snapshot's contribution with upserts"""
+        if snapshot["status"] not in ROLLUP_STATUSES:
+            return
+
+        values = {
+            "branch_id": snapshot["branch_id"],
+            "hour": snapshot["hour"],
+            "order_type": snapshot["order_type"],
+            "payment_type": snapshot["payment_type"],
+            "status": snapshot["status"],
+            "order_count": sign,
+            "updated_at": datetime.now()
+        }
+        for field, amount in snapshot["amounts"].items():
+            values[field] = sign * amount
+
+        stmt = pg_insert(SalesHourlyRollup).values(**values)
+        increments = {
+            field: getattr(SalesHourlyRollup, field) + getattr(stmt.excluded, field)
+            for field in ["order_count"] + SALES_AMOUNT_FIELDS
+        }
+        increments["updated_at"] = stmt.excluded.updated_at
+        db.execute(stmt.on_conflict_do_update(
+            constraint="uq_sales_hourly_rollup_key",
+            set_=increments
+        ))
+
+        if not snapshot["items"]:
+            return
+
+        stmt = pg_insert(MenuItemHourlyRollup).values([
+            {
+                "branch_id": snapshot["branch_id"],
+                "hour": snapshot["hour"],
+                "menu_item_id": menu_item_id,
+                "status": snapshot["status"],
+                "quantity": sign * quantity,
+                "gross_amount": sign * subtotal,
+                "updated_at": datetime.now()
+            }
+            for menu_item_id, quantity, subtotal in snapshot["items"]
+        ])
+        db.execute(stmt.on_conflict_do_update(
+            constraint="uq_menu_item_hourly_rollup_key",
+            set_={
+                "quantity": MenuItemHourlyRollup.quantity + stmt.excluded.quantity,
+                "gross_amount": MenuItemHourlyRollup.gross_amount + stmt.excluded.gross_amount,
+                "updated_at": stmt.excluded.updated_at
+            }
+        ))
+
+    @staticmethod
+    def record_change(db: Session, before: Optional[Dict], order: Order,
+                      items: Optional[List[OrderItem]] = None):
+        """
+        Move an order's contribution after any change to it: status, amounts,
+        payment or order type, or items.
+
+        `before` is the snapshot taken prior to the change (or None when the
+        previous status was not tracked). Pending changes are flushed so the
+        new item set is visible to the snapshot query. Nothing is written
+        when the contribution didn't change.
+        """
+        after = None
+        if order.status in ROLLUP_STATUSES:
+            db.flush()
+            after = SalesRollupService.snapshot(db, order, items=items)
+        if after == before:
+            return
+
+        if before is not None:
+            SalesRollupService.apply(db, before, sign=-1)
+        if after is not None:
+            SalesRollupService.apply(db, after, sign=1)
+
+    @staticmethod
+    def rebuild(db: Session) -> Dict:
+        """
+        Recompute both rollup tables from orders and order items. Hours up to
+        the newest archived order are kept as they are, since their orders
+        are no longer (all) in the order tables.
+
+        Only the branches of the request's tenant scope are rebuilt; without
+        a scope (maintenance jobs) every branch is.
+        """
+        archived_until = db.scalar(select(func.max(ArchivedOrder.created_at)))
+        since = (
+            archived_until.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+            if archived_until else None
+        )
+        item_rollups = _filter_branches(db.query(MenuItemHourlyRollup), MenuItemHourlyRollup, None)
+        sales_rollups = _filter_branches(db.query(SalesHourlyRollup), SalesHourlyRollup, None)
+        order_filters = [Order.status.in_(ROLLUP_STATUSES)]
+        # Inserts from a select aren't filtered by the tenant scope hook
+        scope = get_tenant_scope()
+        if scope is not None:
+            order_filters.append(scope_branch_criteria(Order.branch_id, scope))
+        if since:
+            item_rollups = item_rollups.filter(MenuItemHourlyRollup.hour >= since)
+            sales_rollups = sales_rollups.filter(SalesHourlyRollup.hour >= since)
+            order_filters.append(Order.created_at >= since)
+        item_rollups.delete(synchronize_session=False)
+        sales_rollups.delete(synchronize_session=False)
+
+        hour = func.date_trunc("hour", Order.created_at)
+        branch_id = func.coalesce(Order.branch_id, 0)
+        payment_type = func.coalesce(Order.payment_type, "")
+        now = literal(datetime.now())
+
+        sales = select(
+            branch_id,
+            hour,
+            Order.order_type,
+            payment_type,
+            Order.status,
+            func.count(Order.id),
+            *[func.coalesce(func.sum(getattr(Order, field)), 0) for field in SALES_AMOUNT_FIELDS],
+            now
+        ).select_from(Order).where(
+            *order_filters
+        ).group_by(branch_id, hour, Order.order_type, payment_type, Order.status)
+
+        db.execute(SalesHourlyRollup.__table__.insert().from_select(
+            ["branch_id", "hour", "order_type", "payment_type", "status", "order_count"]
+            + SALES_AMOUNT_FIELDS + ["updated_at"],
+            sales
+        ))
+
+        items = select(
+            branch_id,
+            hour,
+            OrderItem.menu_item_id,
+            Order.status,
+            func.coalesce(func.sum(OrderItem.quantity), 0),
+            func.coalesce(func.sum(OrderItem.subtotal), 0),
+            now
+        ).select_from(OrderItem).join(
+            Order, Order.id == OrderItem.order_id
+        ).where(
+            *order_filters,
+            OrderItem.menu_item_id.isnot(None)
+        ).group_by(branch_id, hour, OrderItem.menu_item_id, Order.status)
+
+        db.execute(MenuItemHourlyRollup.__table__.insert().from_select(
+            ["branch_id", "hour", "menu_item_id", "status", "quantity", "gross_amount", "updated_at"],
+            items
+        ))
+
+        db.commit()
+        return {
+            "sales_rows": _filter_branches(
+                db.query(func.count(SalesHourlyRollup.id)), SalesHourlyRollup, None
+            ).scalar(),
+            "menu_item_rows": _filter_branches(
+                db.query(func.count(MenuItemHourlyRollup.id)), MenuItemHourlyRollup, None
+            ).scalar()
+        }
+
+    @staticmethod
+    def get_sales_totals(
+        db: Session,
+        statuses: List[str],
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        branch_id: Optional[int] = None
+    ) -> Dict:
+        """Sum rollup rows for the given statuses and hour range"""
+        query = db.query(
+            func.coalesce(func.sum(SalesHourlyRollup.order_count), 0),
+            *[func.coalesce(func.sum(getattr(SalesHourlyRollup, field)), 0) for field in SALES_AMOUNT_FIELDS]
+        ).filter(SalesHourlyRollup.status.in_(statuses))
+
+        if start:
+            query = query.filter(SalesHourlyRollup.hour >= start)
+        if end:
+            query = query.filter(SalesHourlyRollup.hour < end)
+        row = _filter_branches(query, SalesHourlyRollup, branch_id).one()
+        totals = {"order_count": int(row[0])}
+        totals.update({field: float(value) for field, value in zip(SALES_AMOUNT_FIELDS, row[1:])})
+        return totals
+
+    @staticmethod
+    def get_hourly_sales(
+        db: Session,
+        start: datetime,
+        end: datetime,
+        statuses: List[str] = ["Paid", "Completed"],
+        branch_id: Optional[int] = None
+    ) -> List[Dict]:
+        """Get per-hour sales broken down by order type and payment type"""
+        query = db.query(
+            SalesHourlyRollup.hour,
+            SalesHourlyRollup.order_type,
+            SalesHourlyRollup.payment_type,
+            func.sum(SalesHourlyRollup.order_count).label("order_count"),
+            *[func.sum(getattr(SalesHourlyRollup, field)).label(field) for field in SALES_AMOUNT_FIELDS]
+        ).filter(
+            SalesHourlyRollup.status.in_(statuses),
+            SalesHourlyRollup.hour >= start,
+            SalesHourlyRollup.hour < end
+        )
+        rows = _filter_branches(query, SalesHourlyRollup, branch_id).group_by(
+            SalesHourlyRollup.hour,
+            SalesHourlyRollup.order_type,
+            SalesHourlyRollup.payment_type
+        ).having(
+            func.sum(SalesHourlyRollup.order_count) != 0
+        ).order_by(SalesHourlyRollup.hour).all()
+
+        return [
+            {
+                "hour": row.hour,
+                "order_type": row.order_type,
+                "payment_type": row.payment_type or None,
+                "order_count": int(row.order_count),
+                **{field: float(getattr(row, field)) for field in SALES_AMOUNT_FIELDS}
+            }
+            for row in rows
+        ]
+
+    @staticmethod
+    def get_item_sales(
+        db: Session,
+        start: datetime,
+        end: datetime,
+        statuses: List[str] = ["Paid", "Completed"],
+        branch_id: Optional[int] = None
+    ) -> List[Dict]:
+        """Get quantity and revenue per menu item over an hour range"""
+        query = db.query(
+            MenuItemHourlyRollup.menu_item_id,
+            func.sum(MenuItemHourlyRollup.quantity).label("quantity"),
+            func.sum(MenuItemHourlyRollup.gross_amount).label("revenue")
+        ).filter(
+            MenuItemHourlyRollup.status.in_(statuses),
+            MenuItemHourlyRollup.hour >= start,
+            MenuItemHourlyRollup.hour < end
+        )
+        rows = _filter_branches(query, MenuItemHourlyRollup, branch_id).group_by(MenuItemHourlyRollup.menu_item_id).having(
+            func.sum(MenuItemHourlyRollup.quantity) != 0
+        ).order_by(
+            func.sum(MenuItemHourlyRollup.gross_amount).desc()
+        ).all()
+
+        return [
+            {
+                "menu_item_id": row.menu_item_id,
+                "quantity": int(row.quantity),
+                "revenue": float(row.revenue)
+            }
+            for row in rows
+        ]
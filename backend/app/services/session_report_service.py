@@ -0,0 +1,133 @@
+"""
+POS session (staff shift) report service
+"""
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select, func, tuple_
+from sqlalchemy.orm import Session
+
+from app.models.orders import Order
+from app.models.pos_session import POSSession
+from app.models.auth import User
+
+# Order statuses that count as a sale of the session they were settled in
+SESSION_SALE_STATUSES = ["Paid", "Completed"]
+
+
+class SessionReportService:
+    """Service for the POS session report"""
+
+    @staticmethod
+    def session_filters(
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        user_id: Optional[int] = None
+    ) -> List:
+        """WHERE conditions on sessions; the date range applies to the session start"""
+        conditions = []
+        if start_date:
+            conditions.append(POSSession.start_time >= start_date)
+        if end_date:
+            conditions.append(POSSession.start_time < end_date)
+        if user_id:
+            conditions.append(POSSession.user_id == user_id)
+        return conditions
+
+    @staticmethod
+    def order_totals(db: Session, session_ids: List[int]) -> Dict[int, Dict]:
+        """Sales, order count and payment split per session, from the orders settled in it"""
+        if not session_ids:
+            return {}
+        query = (
+            select(
+                Order.pos_session_id,
+                func.count(Order.id),
+                func.coalesce(func.sum(Order.net_amount), 0),
+                func.coalesce(func.sum(Order.paid_amount), 0),
+                func.coalesce(func.sum(Order.credit_amount), 0)
+            )
+            .where(
+                Order.pos_session_id.in_(session_ids),
+                Order.status.in_(SESSION_SALE_STATUSES)
+            )
+            .group_by(Order.pos_session_id)
+        )
+        return {
+            session_id: {"orders": orders, "sales": sales, "paid": paid, "credit": credit}
+            for session_id, orders, sales, paid, credit in db.execute(query)
+        }
+
+    @staticmethod
+    def get_sessions(
+        db: Session,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        user_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        after: Optional[Tuple[datetime, int]] = None
+    ) -> List[Dict]:
+        """
+        Session report rows, newest first.
+
+        Pass `limit` and the (start_time, id) of the last row seen as `after`
+        to page through sessions. `total_sales`/`total_orders` are the
+        counters kept on the session; `actual_*` are worked out from orders.
+        """
+        query = (
+            select(POSSession, User.full_name)
+            .outerjoin(User, POSSession.user_id == User.id)
+            .where(*SessionReportService.session_filters(start_date, end_date, user_id))
+        )
+        if after is not None:
+            query = query.where(tuple_(POSSession.start_time, POSSession.id) < after)
+        query = query.order_by(POSSession.start_time.desc(), POSSession.id.desc())
+        if limit is not None:
+            query = query.limit(limit)
+
+        rows = db.execute(query).all()
+        totals = SessionReportService.order_totals(db, [session.id for session, _ in rows])
+
+        result = []
+        for session, user_name in rows:
+            actual = totals.get(session.id, {})
+            result.append({
+                "id": session.id,
+                "user_id": session.user_id,
+                "user_name": user_name or "Unknown",
+                "start_time": session.start_time,
+                "end_time": session.end_time,
+                "status": session.status,
+                "opening_balance": session.opening_balance,
+                "closing_balance": session.closing_balance,
+                "total_sales": session.total_sales,
+                "total_orders": session.total_orders,
+                "actual_sales": actual.get("sales", 0),
+                "actual_orders": actual.get("orders", 0),
+                "paid_amount": actual.get("paid", 0),
+                "credit_amount": actual.get("credit", 0),
+                "notes": session.notes
+            })
+        return result
+
+    @staticmethod
+    def report_version_values(
+        db: Session,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        user_id: Optional[int] = None
+    ) -> List:
+        """Aggregates that change whenever a session in the report or its orders change"""
+        sessions = db.execute(
+            select(
+                func.count(POSSession.id),
+                func.max(POSSession.id),
+                func.max(func.coalesce(POSSession.updated_at, POSSession.created_at)),
+                func.sum(POSSession.total_sales)
+            ).where(*SessionReportService.session_filters(start_date, end_date, user_id))
+        ).one()
+        orders = db.execute(
+            select(func.count(Order.id), func.max(Order.updated_at), func.sum(Order.net_amount))
+            .where(Order.pos_session_id.is_not(None))
+        ).one()
+        return list(sessions) + list(orders)
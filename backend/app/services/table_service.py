@@ -0,0 +1,149 @@
+"""
+Table and floor-plan service
+"""
+from typing import List, Optional
+from sqlalchemy import func, case
+from sqlalchemy.orm import Session
+from app.models.orders import Floor, Table, Order, KOT
+from app.utils.cache import cached
+
+
+# Order statuses that keep a table occupied
+ACTIVE_ORDER_STATUSES = ["Pending", "In Progress"]
+BILLABLE_ORDER_STATUSES = ["Pending", "In Progress", "BillRequested"]
+
+
+class TableService:
+    """Service for table and floor-plan operations"""
+
+    @staticmethod
+    def get_floor_plan(
+        db: Session,
+        statuses: List[str] = ACTIVE_ORDER_STATUSES,
+        floor: Optional[str] = None,
+        floor_id: Optional[int] = None,
+        include_inactive: bool = False
+    ) -> List[dict]:
+        """
+        Get tables with their active order and KOT/BOT counts in a single query.
+
+        The first matching order per table is picked with a grouped subquery and
+        KOT/BOT counts are aggregated only for those orders, so neither the
+        number of round trips nor the rows read grow with ticket history.
+        """
+        active_orders = db.query(
+            Order.table_id.label("table_id"),
+            func.min(Order.id).label("order_id")
+        ).filter(
+            Order.table_id.isnot(None),
+            Order.status.in_(statuses)
+        ).group_by(Order.table_id).subquery()
+
+        kot_counts = db.query(
+            KOT.order_id.label("order_id"),
+            func.sum(case((KOT.kot_type == "KOT", 1), else_=0)).label("kot_count"),
+            func.sum(case((KOT.kot_type == "KOT", 0), else_=1)).label("bot_count")
+        ).join(
+            active_orders, active_orders.c.order_id == KOT.order_id
+        ).group_by(KOT.order_id).subquery()
+
+        query = db.query(
+            Table,
+            Order.id,
+            Order.net_amount,
+            Order.created_at,
+            kot_counts.c.kot_count,
+            kot_counts.c.bot_count
+        ).outerjoin(
+            active_orders, active_orders.c.table_id == Table.id
+        ).outerjoin(
+            Order, Order.id == active_orders.c.order_id
+        ).outerjoin(
+            kot_counts, kot_counts.c.order_id == Order.id
+        )
+
+        if not include_inactive:
+            query = query.filter(Table.is_active == True)
+
+        if floor_id:
+            query = query.filter(Table.floor_id == floor_id)
+        elif floor:
+            query = query.filter(Table.floor == floor)
+
+        rows = query.order_by(Table.display_order).all()
+
+        result = []
+        for table, order_id, net_amount, order_created_at, kot_count, bot_count in rows:
+            table_dict = {
+                "id": table.id,
+                "table_id": table.table_id,
+                "floor": table.floor,
+                "floor_id": table.floor_id,
+                "table_type": table.table_type,
+                "capacity": table.capacity,
+                "status": table.status,
+                "is_active": table.is_active,
+                "display_order": table.display_order,
+                "is_hold_table": table.is_hold_table,
+                "hold_table_name": table.hold_table_name,
+                "kot_count": 0,
+                "bot_count": 0,
+                "active_order_id": None,
+                "total_amount": 0
+            }
+
+            if order_id is not None:
+                table_dict["active_order_id"] = order_id
+                table_dict["total_amount"] = net_amount
+                table_dict["order_start_time"] = order_created_at
+                table_dict["kot_count"] = int(kot_count or 0)
+                table_dict["bot_count"] = int(bot_count or 0)
+
+            result.append(table_dict)
+
+        return result
+
+    @staticmethod
+    @cached("floors", shared=True)
+    def get_active_floors(db: Session) -> List[dict]:
+        """Get active floors ordered by display_order (cached; floors are shared by all branches)"""
+        floors = db.query(Floor).filter(Floor.is_active == True).order_by(Floor.display_order).all()
+        return [
+            {
+                "id": floor.id,
+                "name": floor.name,
+                "display_order": floor.display_order,
+                "is_active": floor.is_active,
+                "created_at": floor.created_at
+            }
+            for floor in floors
+        ]
+
+    @staticmethod
+    def get_floor_plan_by_floor(db: Session) -> List[dict]:
+        """Get active tables with order statistics grouped by active floor"""
+        floors = TableService.get_active_floors(db)
+        tables = TableService.get_floor_plan(db, statuses=BILLABLE_ORDER_STATUSES)
+
+        tables_by_floor = {}
+        for table in tables:
+            tables_by_floor.setdefault(table["floor_id"], []).append({
+                "id": table["id"],
+                "table_id": table["table_id"],
+                "table_type": table["table_type"],
+                "status": table["status"],
+                "capacity": table["capacity"],
+                "kot_count": table["kot_count"],
+                "bot_count": table["bot_count"],
+                "total_amount": table["total_amount"],
+                "active_order_id": table["active_order_id"]
+            })
+
+        return [
+            {
+                "floor_id": floor["id"],
+                "floor_name": floor["name"],
+                "tables": tables_by_floor.get(floor["id"], [])
+            }
+            for floor in floors
+        ]
@@ -0,0 +1,265 @@
+"""
+Shared cache for read-mostly lookups
+
+`cache` stores JSON-compatible values in the backend chosen by
+CACHE_BACKEND: an in-process LRU ("memory", the default) or a
+Redis-protocol server ("redis") shared by all workers. With the memory
+backend, writes made through another worker show up once entries expire.
+
+Keys are `<prefix>:<namespace>:<scope>:<key>`, where scope is the tenant
+scope of the request (see app.utils.tenant_scope) so branches never see
+each other's entries, or "shared" for data that is the same everywhere.
+Invalidating a namespace drops it for every scope.
+
+Service functions use the decorators:
+
+    @cached("roles", shared=True)
+    def get_roles(db, skip=0, limit=100) -> List[dict]: ...
+
+    @invalidates("roles")
+    def update_role(db, role_id, data): ...
+
+Cached functions must return plain data (dicts, lists, numbers, strings);
+values come back as they would from JSON, e.g. datetimes as ISO strings.
+
+Concurrent misses on one key run the loader once: other threads wait for
+it, and with the redis backend other workers do too (up to
+CACHE_LOCK_TIMEOUT_SECONDS). Code running on the event loop thread (async
+routes and `run_sync`) never waits, since the loader may be suspended on
+the same thread; it loads the value itself instead.
+"""
+import functools
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.utils.cache_backends import MISSING, CacheBackend, CacheBackendError, build_backend, on_event_loop
+from app.utils.tenant_scope import tenant_cache_key
+
+SHARED_SCOPE = "shared"
+
+# How often a worker checks whether another worker finished loading a key
+LOCK_POLL_SECONDS = 0.02
+
+
+class _KeyLocks:
+    """One lock per key while it's in use, so unrelated loads don't wait on each other"""
+
+    def __init__(self):
+        self._locks: Dict[str, list] = {}  # key -> [lock, users]
+        self._guard = threading.Lock()
+
+    def acquire(self, key: str, blocking: bool) -> bool:
+        with self._guard:
+            entry = self._locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        if entry[0].acquire(blocking):
+            return True
+        self._forget(key, entry)
+        return False
+
+    def release(self, key: str):
+        with self._guard:
+            entry = self._locks[key]
+        entry[0].release()
+        self._forget(key, entry)
+
+    def _forget(self, key: str, entry: list):
+        with self._guard:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._locks[key]
+
+
+class Cache:
+    """Namespaced, tenant-aware cache with stampede protection and hit/miss counters"""
+
+    def __init__(self, backend: CacheBackend, prefix: str, default_ttl: float, lock_timeout: float):
+        self.backend = backend
+        self.prefix = prefix
+        self.default_ttl = default_ttl
+        self.lock_timeout = lock_timeout
+        self._key_locks = _KeyLocks()
+        self._counters: Counter = Counter()
+        self._generations: Counter = Counter()
+        self._counters_lock = threading.Lock()
+
+    def _key(self, namespace: str, key: str, shared: bool) -> str:
+        scope = SHARED_SCOPE if shared else tenant_cache_key()
+        return f"{self.prefix}:{namespace}:{scope}:{key}"
+
+    def _count(self, namespace: str, name: str):
+        with self._counters_lock:
+            self._counters[(namespace, name)] += 1
+
+    def _get(self, namespace: str, full_key: str) -> Any:
+        try:
+            return self.backend.get(full_key)
+        except CacheBackendError:
+            self._count(namespace, "errors")
+            return MISSING
+
+    def _set(self, namespace: str, full_key: str, value: Any, ttl: float):
+        try:
+            self.backend.set(full_key, value, ttl)
+        except CacheBackendError:
+            self._count(namespace, "errors")
+
+    def get(self, namespace: str, key: str, default: Any = None, shared: bool = False) -> Any:
+        """Cached value, or `default` on a miss"""
+        value = self._get(namespace, self._key(namespace, key, shared))
+        self._count(namespace, "misses" if value is MISSING else "hits")
+        return default if value is MISSING else value
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None, shared: bool = False):
+        self._set(namespace, self._key(namespace, key, shared), jsonable_encoder(value),
+                  self.default_ttl if ttl is None else ttl)
+
+    def get_or_set(
+        self,
+        namespace: str,
+        key: str,
+        load: Callable[[], Any],
+        ttl: Optional[float] = None,
+        shared: bool = False
+    ) -> Any:
+        """Cached value, calling `load` (once across concurrent callers) on a miss"""
+        full_key = self._key(namespace, key, shared)
+        value = self._get(namespace, full_key)
+        if value is not MISSING:
+            self._count(namespace, "hits")
+            return value
+        self._count(namespace, "misses")
+        ttl = self.default_ttl if ttl is None else ttl
+
+        can_wait = not on_event_loop()
+        if not self._key_locks.acquire(full_key, blocking=can_wait):
+            return self._load(namespace, full_key, load, ttl)
+        try:
+            # Filled by whoever held the lock before us
+            value = self._get(namespace, full_key)
+            if value is not MISSING:
+                self._count(namespace, "coalesced")
+                return value
+            lock_key = None
+            if can_wait and self.backend.shared:
+                lock_key, value = self._wait_for_other_worker(namespace, full_key)
+                if value is not MISSING:
+                    return value
+            try:
+                return self._load(namespace, full_key, load, ttl)
+            finally:
+                if lock_key:
+                    self._delete(namespace, lock_key)
+        finally:
+            self._key_locks.release(full_key)
+
+    def _wait_for_other_worker(self, namespace: str, full_key: str) -> Tuple[Optional[str], Any]:
+        """
+        Take the cross-worker load lock for a key, or wait for the worker
+        holding it. Returns (lock key if taken, value loaded by the other worker or MISSING).
+        """
+        lock_key = f"{full_key}:lock"
+        try:
+            if self.backend.add(lock_key, 1, self.lock_timeout):
+                return lock_key, MISSING
+        except CacheBackendError:
+            self._count(namespace, "errors")
+            return None, MISSING
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            time.sleep(LOCK_POLL_SECONDS)
+            value = self._get(namespace, full_key)
+            if value is not MISSING:
+                self._count(namespace, "coalesced")
+                return None, value
+        return None, MISSING
+
+    def _load(self, namespace: str, full_key: str, load: Callable[[], Any], ttl: float) -> Any:
+        self._count(namespace, "loads")
+        generation = self._generations[namespace]
+        value = jsonable_encoder(load())
+        # Don't keep a value that an invalidation raced with
+        if generation == self._generations[namespace]:
+            self._set(namespace, full_key, value, ttl)
+        return value
+
+    def _delete(self, namespace: str, full_key: str):
+        try:
+            self.backend.delete(full_key)
+        except CacheBackendError:
+            self._count(namespace, "errors")
+
+    def invalidate(self, namespace: str):
+        """Drop a namespace for every scope (call after the write is committed)"""
+        self._count(namespace, "invalidations")
+        with self._counters_lock:
+            self._generations[namespace] += 1
+        try:
+            self.backend.delete_prefix(f"{self.prefix}:{namespace}:")
+        except CacheBackendError:
+            self._count(namespace, "errors")
+
+    def metrics(self) -> Dict:
+        """Backend stats and per-namespace counters (hits, misses, loads, ...)"""
+        with self._counters_lock:
+            counters = dict(self._counters)
+        namespaces: Dict[str, Dict[str, int]] = {}
+        for (namespace, name), count in sorted(counters.items()):
+            namespaces.setdefault(namespace, {})[name] = count
+        for values in namespaces.values():
+            lookups = values.get("hits", 0) + values.get("misses", 0)
+            values["hit_ratio"] = round(values.get("hits", 0) / lookups, 4) if lookups else None
+        return {"backend": self.backend.stats(), "namespaces": namespaces}
+
+
+def _call_key(fn: Callable, args: tuple, kwargs: dict) -> str:
+    # The session is how a function reads, not what it reads
+    parts = [repr(arg) for arg in args if not isinstance(arg, Session)]
+    parts += [f"{name}={value!r}" for name, value in sorted(kwargs.items()) if not isinstance(value, Session)]
+    return f"{fn.__module__}.{fn.__qualname__}({','.join(parts)})"
+
+
+def cached(namespace: str, ttl: Optional[float] = None, shared: bool = False,
+           key: Optional[Callable[..., str]] = None):
+    """
+    Cache a function's result in `namespace`, keyed by its arguments
+    (sessions excluded) or by `key(*args, **kwargs)`. Use shared=True only
+    for data that doesn't depend on the branch. The undecorated function
+    is available as `.uncached`.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            cache_key = key(*args, **kwargs) if key else _call_key(fn, args, kwargs)
+            return cache.get_or_set(namespace, cache_key, lambda: fn(*args, **kwargs), ttl, shared)
+        wrapper.uncached = fn
+        return wrapper
+    return decorator
+
+
+def invalidates(*namespaces: str):
+    """Invalidate namespaces after the function returns (it must commit its write)"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            result = fn(*args, **kwargs)
+            for namespace in namespaces:
+                cache.invalidate(namespace)
+            return result
+        return wrapper
+    return decorator
+
+
+cache = Cache(
+    build_backend(settings.CACHE_BACKEND, settings.CACHE_URL, settings.CACHE_MAX_SIZE,
+                  timeout=settings.CACHE_TIMEOUT_SECONDS, loop_wait=settings.CACHE_LOOP_WAIT_SECONDS),
+    prefix=settings.CACHE_KEY_PREFIX,
+    default_ttl=settings.CACHE_DEFAULT_TTL_SECONDS,
+    lock_timeout=settings.CACHE_LOCK_TIMEOUT_SECONDS
+)
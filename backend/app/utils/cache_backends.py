@@ -0,0 +1,400 @@
+"""
+Storage backends for the shared cache (see app.utils.cache)
+
+Both backends store JSON-compatible values under string keys with a TTL:
+
+- MemoryCacheBackend: in-process LRU, one per worker
+- RedisCacheBackend: any server speaking the Redis protocol (Redis, Valkey,
+  KeyDB, ...), shared by all workers. It talks RESP over a small pool of
+  sockets, so no client library is needed. Commands issued on the event loop
+  thread run on a small thread pool and are waited for only briefly; when the
+  server is slow or down, a per-worker MemoryCacheBackend is used instead.
+"""
+import asyncio
+import json
+import socket
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from queue import Empty, Full, LifoQueue
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+# Returned by get() on a miss, since None is a cacheable value
+MISSING = object()
+
+
+class CacheBackendError(Exception):
+    """The cache server returned an error or could not be reached"""
+
+
+def on_event_loop() -> bool:
+    """Whether the calling thread is running an asyncio event loop"""
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+
+class CacheBackend:
+    """Interface shared by the cache backends"""
+
+    # Whether other workers see the same entries
+    shared = False
+
+    def get(self, key: str) -> Any:
+        """Value stored under `key`, or MISSING"""
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl_seconds: float):
+        raise NotImplementedError
+
+    def add(self, key: str, value: Any, ttl_seconds: float) -> bool:
+        """Set `key` only if it doesn't exist; True if it was set"""
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def delete_prefix(self, prefix: str) -> int:
+        """Delete every key starting with `prefix`; returns how many were deleted"""
+        raise NotImplementedError
+
+    def stats(self) -> Dict:
+        return {}
+
+    def close(self):
+        """Release connections and threads held by the backend"""
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    Thread-safe LRU with per-entry expiry. Values are returned as stored,
+    so callers must treat them as read-only.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: Any, ttl_seconds: float):
+        if self.max_size <= 0 or ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def add(self, key: str, value: Any, ttl_seconds: float) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return False
+            self._entries[key] = (time.monotonic() + ttl_seconds, value)
+            return True
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def delete_prefix(self, prefix: str) -> int:
+        with self._lock:
+            keys = [key for key in self._entries if key.startswith(prefix)]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"backend": "memory", "size": len(self._entries), "max_size": self.max_size,
+                    "evictions": self._evictions}
+
+
+class _RespConnection:
+    """One socket to a Redis-protocol server"""
+
+    def __init__(self, host: str, port: int, timeout: float):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.reader = self.sock.makefile("rb")
+
+    def command(self, *args) -> Any:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        self.sock.sendall(b"".join(parts))
+        return self._read_reply()
+
+    def _read_reply(self) -> Any:
+        line = self.reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("Connection to the cache server was closed")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body.decode()
+        if kind == b"-":
+            raise CacheBackendError(body.decode())
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            length = int(body)
+            if length < 0:
+                return None
+            data = self.reader.read(length + 2)
+            if len(data) != length + 2:
+                raise ConnectionError("Connection to the cache server was closed")
+            return data[:-2]
+        if kind == b"*":
+            length = int(body)
+            return None if length < 0 else [self._read_reply() for _ in range(length)]
+        raise CacheBackendError(f"Unexpected reply from the cache server: {line!r}")
+
+    def close(self):
+        try:
+            self.reader.close()
+            self.sock.close()
+        except OSError:
+            pass
+
+
+def _escape_glob(text: str) -> str:
+    return "".join("\\" + char if char in "*?[]\\" else char for char in text)
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Cache stored on a Redis-protocol server, e.g. redis://:password@localhost:6379/0
+
+    Socket I/O never runs on the event loop thread: commands issued there
+    (async routes and `run_sync`) are handed to a thread pool and waited for
+    at most `loop_wait` seconds. Commands from other threads run directly
+    with the `timeout` socket timeout.
+
+    When a command fails or times out, the operation is served by `fallback`,
+    an in-process LRU, so callers never see the outage; the server is then
+    skipped for RETRY_AFTER_SECONDS. Deletes always apply to the fallback as
+    well, and deletes the server missed are replayed once it is reachable
+    again, so entries invalidated during an outage aren't served afterwards.
+    """
+
+    shared = True
+
+    # After a connection failure, commands fail fast for this long instead
+    # of every request waiting on the server again
+    RETRY_AFTER_SECONDS = 5.0
+
+    # Deletes kept for replay while the server is unreachable; older ones
+    # are dropped and those entries expire by their TTL instead
+    MAX_PENDING_DELETES = 1000
+
+    def __init__(self, url: str, pool_size: int = 10, timeout: float = 0.5, loop_wait: float = 0.05,
+                 fallback: Optional[CacheBackend] = None):
+        parsed = urlparse(url)
+        if parsed.scheme != "redis":
+            raise ValueError(f"Unsupported cache URL: {url}")
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.username = unquote(parsed.username) if parsed.username else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self.loop_wait = loop_wait
+        self.fallback = fallback or MemoryCacheBackend(10000)
+        self._idle: "LifoQueue[_RespConnection]" = LifoQueue(maxsize=pool_size)
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="cache-io")
+        self._down_until = 0.0
+        self._pending: "OrderedDict[Tuple[str, str], None]" = OrderedDict()  # (DEL or prefix, key)
+        self._pending_lock = threading.Lock()
+        self._fallbacks = 0
+
+    def _connect(self) -> _RespConnection:
+        connection = _RespConnection(self.host, self.port, self.timeout)
+        try:
+            if self.password:
+                auth = (self.username, self.password) if self.username else (self.password,)
+                connection.command("AUTH", *auth)
+            if self.db:
+                connection.command("SELECT", self.db)
+        except Exception:
+            connection.close()
+            raise
+        return connection
+
+    def _mark_down(self, error: Exception) -> CacheBackendError:
+        self._down_until = time.monotonic() + self.RETRY_AFTER_SECONDS
+        return CacheBackendError(f"Cache server unavailable: {error}")
+
+    def _execute(self, *args) -> Any:
+        try:
+            connection = self._idle.get_nowait()
+        except Empty:
+            if self._down_until > time.monotonic():
+                raise CacheBackendError("Cache server unavailable")
+            try:
+                connection = self._connect()
+            except OSError as e:
+                raise self._mark_down(e) from e
+        try:
+            reply = connection.command(*args)
+        except CacheBackendError:
+            # An error reply leaves the connection usable
+            self._release(connection)
+            raise
+        except (OSError, ValueError) as e:
+            # Includes read timeouts; the reply may still arrive, so the socket can't be reused
+            connection.close()
+            raise self._mark_down(e) from e
+        self._release(connection)
+        return reply
+
+    def _run(self, operation: Callable, *args) -> Any:
+        """Run `operation` off the event loop thread, waiting at most loop_wait when called on it"""
+        if self._down_until > time.monotonic():
+            raise CacheBackendError("Cache server unavailable")
+        if not on_event_loop():
+            return operation(*args)
+        future = self._executor.submit(operation, *args)
+        try:
+            return future.result(timeout=self.loop_wait)
+        except FutureTimeout:
+            raise CacheBackendError("Cache server timed out")
+
+    def execute(self, *args) -> Any:
+        """Run one command on a pooled connection"""
+        return self._run(self._execute, *args)
+
+    def _release(self, connection: _RespConnection):
+        try:
+            self._idle.put_nowait(connection)
+        except Full:
+            connection.close()
+
+    def _replay_pending(self):
+        with self._pending_lock:
+            pending = list(self._pending)
+        for kind, key in pending:
+            if kind == "prefix":
+                self._delete_prefix(key)
+            else:
+                self._execute("DEL", key)
+            with self._pending_lock:
+                self._pending.pop((kind, key), None)
+
+    def _call(self, operation: Callable, *args) -> Any:
+        # Deletes the server missed go first, so it never serves what they removed
+        if self._pending:
+            def operation_after_replay(*args, operation=operation):
+                self._replay_pending()
+                return operation(*args)
+            return self._run(operation_after_replay, *args)
+        return self._run(operation, *args)
+
+    def _fell_back(self):
+        self._fallbacks += 1
+
+    def _remember_delete(self, kind: str, key: str):
+        with self._pending_lock:
+            self._pending[(kind, key)] = None
+            self._pending.move_to_end((kind, key))
+            while len(self._pending) > self.MAX_PENDING_DELETES:
+                self._pending.popitem(last=False)
+
+    def get(self, key: str) -> Any:
+        try:
+            data = self._call(self._execute, "GET", key)
+        except CacheBackendError:
+            self._fell_back()
+            return self.fallback.get(key)
+        return MISSING if data is None else json.loads(data)
+
+    def set(self, key: str, value: Any, ttl_seconds: float):
+        if ttl_seconds <= 0:
+            return
+        data = json.dumps(value, separators=(",", ":"))
+        try:
+            self._call(self._execute, "SET", key, data, "PX", int(ttl_seconds * 1000))
+        except CacheBackendError:
+            self._fell_back()
+            self.fallback.set(key, value, ttl_seconds)
+
+    def add(self, key: str, value: Any, ttl_seconds: float) -> bool:
+        data = json.dumps(value)
+        try:
+            reply = self._call(self._execute, "SET", key, data, "NX", "PX", max(int(ttl_seconds * 1000), 1))
+        except CacheBackendError:
+            self._fell_back()
+            return self.fallback.add(key, value, ttl_seconds)
+        return reply == "OK"
+
+    def delete(self, key: str):
+        self.fallback.delete(key)
+        try:
+            self._call(self._execute, "DEL", key)
+        except CacheBackendError:
+            self._fell_back()
+            self._remember_delete("DEL", key)
+
+    def _delete_prefix(self, prefix: str) -> int:
+        deleted, cursor = 0, b"0"
+        pattern = _escape_glob(prefix) + "*"
+        while True:
+            cursor, keys = self._execute("SCAN", cursor, "MATCH", pattern, "COUNT", 500)
+            if keys:
+                deleted += self._execute("DEL", *keys)
+            if cursor in (b"0", "0"):
+                return deleted
+
+    def delete_prefix(self, prefix: str) -> int:
+        deleted = self.fallback.delete_prefix(prefix)
+        try:
+            return self._call(self._delete_prefix, prefix)
+        except CacheBackendError:
+            self._fell_back()
+            self._remember_delete("prefix", prefix)
+            return deleted
+
+    def stats(self) -> Dict:
+        return {"backend": "redis", "host": self.host, "port": self.port, "db": self.db,
+                "idle_connections": self._idle.qsize(),
+                "available": self._down_until <= time.monotonic(),
+                "fallbacks": self._fallbacks, "pending_deletes": len(self._pending),
+                "fallback": self.fallback.stats()}
+
+    def close(self):
+        """Stop the I/O threads and close the pooled connections"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except Empty:
+                return
+
+
+def build_backend(backend: str, url: str, max_size: int, timeout: float = 0.5,
+                  loop_wait: float = 0.05) -> CacheBackend:
+    """Backend for the CACHE_BACKEND setting ("memory" or "redis")"""
+    if backend == "memory":
+        return MemoryCacheBackend(max_size)
+    if backend == "redis":
+        return RedisCacheBackend(url, timeout=timeout, loop_wait=loop_wait,
+                                 fallback=MemoryCacheBackend(max_size))
+    raise ValueError(f"Unknown cache backend: {backend}")
@@ -0,0 +1,59 @@
+"""
+In-process cache of the serialized menu catalog
+
+GET /menu/catalog returns categories, groups and items as one JSON document.
+The document is built once per catalog version (see MenuService) and kept
+here already serialized, so terminals loading the menu at shift start cost
+one version lookup each instead of three full table scans. Branches see
+different menus, so there is one snapshot per tenant scope.
+"""
+import json
+import threading
+from typing import Callable, Dict
+
+from fastapi.encoders import jsonable_encoder
+
+
+def catalog_etag(version: int, scope_key: str) -> str:
+    """ETag for a catalog version as seen by one tenant scope"""
+    return f'"menu-{scope_key}-{version}"'
+
+
+class CatalogSnapshot:
+    """Serialized catalog for one version"""
+
+    def __init__(self, version: int, scope_key: str, body: bytes):
+        self.version = version
+        self.body = body
+        self.etag = catalog_etag(version, scope_key)
+
+
+class CatalogCache:
+    """Holds the latest catalog snapshot per scope; concurrent misses build it only once"""
+
+    def __init__(self):
+        self._snapshots: Dict[str, CatalogSnapshot] = {}
+        self._lock = threading.Lock()
+
+    def get(self, scope_key: str, version: int, build: Callable[[], dict]) -> CatalogSnapshot:
+        """Return the snapshot for `version` (or newer), calling `build` on a miss"""
+        snapshot = self._snapshots.get(scope_key)
+        if snapshot is not None and snapshot.version >= version:
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshots.get(scope_key)
+            if snapshot is not None and snapshot.version >= version:
+                return snapshot
+            body = json.dumps(jsonable_encoder(build()), separators=(",", ":")).encode()
+            snapshot = CatalogSnapshot(version, scope_key, body)
+            self._snapshots[scope_key] = snapshot
+            return snapshot
+
+    def clear(self):
+        """Drop all snapshots"""
+        with self._lock:
+            self._snapshots.clear()
+
+
+catalog_cache = CatalogCache()
@@ -2,12 +2,15 @@
 PDF generation utilities
 """
 from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter, A4
+from reportlab.lib.pagesizes import A4, landscape
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
 from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.lib.units import inch
 from io import BytesIO
 from datetime import datetime
+from app.utils.receipt_renderer import ReceiptTemplate
+
+_default_receipt_template = ReceiptTemplate({})
 
 
 def generate_pdf_report(data, title="Report", columns=None):
@@ -65,63 +68,72 @@ def generate_pdf_report(data, title="Report", columns=None):
 
 
 def generate_invoice_pdf(order_data):
-    """Generate an invoice PDF for an order"""
+    """Generate an invoice PDF for an order (without company details; see receipt_renderer)"""
+    items = order_data.get('items', [])
+    total = sum(item.get('subtotal', 0) for item in items)
+    return _default_receipt_template.render_pdf({
+        "order_number": order_data.get('order_number', 'N/A'),
+        "date": datetime.now().strftime('%Y-%m-%d'),
+        "customer": (order_data.get('customer') or {}).get('name'),
+        "table": (order_data.get('table') or {}).get('table_id'),
+        "items": [
+            {
+                "name": item.get('name', 'N/A'),
+                "quantity": item.get('quantity', 0),
+                "price": item.get('price', 0),
+                "subtotal": item.get('subtotal', 0)
+            }
+            for item in items
+        ],
+        "gross_amount": total,
+        "net_amount": total
+    })
+
+
+def generate_sessions_pdf(sessions):
+    """Generate the POS session report PDF from session rows"""
     buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    doc = SimpleDocTemplate(buffer, pagesize=landscape(A4))
     elements = []
     styles = getSampleStyleSheet()
     
-    # Invoice Header
-    title = Paragraph("INVOICE", styles['Title'])
+    # Title
+    title = Paragraph("<b>Session Report</b>", styles['Title'])
     elements.append(title)
-    elements.append(Spacer(1, 0.3*inch))
+    elements.append(Spacer(1, 0.3 * inch))
     
-    # Invoice Details
-    invoice_data = [
-        ['Invoice Number:', order_data.get('order_number', 'N/A')],
-        ['Date:', datetime.now().strftime('%Y-%m-%d')],
-        ['Customer:', order_data.get('customer', {}).get('name', 'N/A')],
-        ['Table:', order_data.get('table', {}).get('table_id', 'N/A')],
-    ]
+    # Prepare table data
+    table_data = [['Session ID', 'Staff', 'Start Time', 'End Time', 'Status', 'Opening', 'Closing', 'Sales', 'Orders']]
     
-    invoice_table = Table(invoice_data, colWidths=[2*inch, 4*inch])
-    invoice_table.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-    ]))
-    elements.append(invoice_table)
-    elements.append(Spacer(1, 0.3*inch))
-    
-    # Items Table
-    items_data = [['Item', 'Quantity', 'Price', 'Total']]
-    total = 0
-    for item in order_data.get('items', []):
-        items_data.append([
-            item.get('name', 'N/A'),
-            str(item.get('quantity', 0)),
-            f"रू {item.get('price', 0)}",
-            f"रू {item.get('subtotal', 0)}"
+    for session in sessions:
+        table_data.append([
+            f"#{session['id']}",
+            session['user_name'] or 'Unknown',
+            session['start_time'].strftime('%Y-%m-%d %H:%M') if session['start_time'] else '-',
+            session['end_time'].strftime('%Y-%m-%d %H:%M') if session['end_time'] else '-',
+            session['status'],
+            f"Rs. {session['opening_balance'] or 0:,.0f}",
+            f"Rs. {session['closing_balance']:,.0f}" if session['closing_balance'] else '-',
+            f"Rs. {session['actual_sales'] or 0:,.0f}",
+            str(session['actual_orders'] or 0)
         ])
-        total += item.get('subtotal', 0)
     
-    items_data.append(['', '', 'Total:', f"रू {total}"])
-    
-    items_table = Table(items_data, colWidths=[3*inch, 1*inch, 1*inch, 1*inch])
-    items_table.setStyle(TableStyle([
+    # Create table
+    table = Table(table_data)
+    table.setStyle(TableStyle([
         ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
         ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
         ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
         ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-        ('BACKGROUND', (0, 1), (-1, -2), colors.beige),
-        ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ('FONTSIZE', (0, 0), (-1, 0), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('FONTSIZE', (0, 1), (-1, -1), 8),
     ]))
-    elements.append(items_table)
     
+    elements.append(table)
     doc.build(elements)
+    
     buffer.seek(0)
     return buffer
@@ -0,0 +1,112 @@
+"""
+Connection pool instrumentation
+
+The metered pool classes time every connection checkout (including time
+spent queued behind other requests for a free connection), count checkout
+timeouts and track how many connections are in use, so pool starvation can
+be told apart from a slow database.
+"""
+import threading
+import time
+from typing import Dict
+
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool, NullPool
+
+
+class PoolMetrics:
+    """Counters for one connection pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.in_use = 0
+        self.in_use_peak = 0
+
+    def record_checkout(self, wait: float):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+            self.in_use += 1
+            self.in_use_peak = max(self.in_use_peak, self.in_use)
+
+    def record_timeout(self, wait: float):
+        with self._lock:
+            self.timeouts += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+
+    def record_checkin(self):
+        with self._lock:
+            self.in_use = max(self.in_use - 1, 0)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.timeouts,
+                "checkout_wait_avg_ms": round(self.wait_total / attempts * 1000, 3) if attempts else 0.0,
+                "checkout_wait_max_ms": round(self.wait_max * 1000, 3),
+                "in_use": self.in_use,
+                "in_use_peak": self.in_use_peak
+            }
+
+
+class MeteredPoolMixin:
+    """Records checkout wait, timeouts and usage for a SQLAlchemy pool"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def recreate(self):
+        # Keep the counters when the engine is disposed
+        new_pool = super().recreate()
+        new_pool.metrics = self.metrics
+        return new_pool
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_timeout(time.perf_counter() - started)
+            raise
+        self.metrics.record_checkout(time.perf_counter() - started)
+        return connection
+
+    def _do_return_conn(self, record):
+        self.metrics.record_checkin()
+        super()._do_return_conn(record)
+
+    def get_metrics(self) -> Dict:
+        """Current pool state plus the accumulated checkout counters"""
+        result = {"pool": type(self).__name__}
+        if isinstance(self, QueuePool):
+            result.update({
+                "size": self.size(),
+                "checked_in": self.checkedin(),
+                "checked_out": self.checkedout(),
+                "overflow": max(self.overflow(), 0),
+                "max_overflow": self._max_overflow,
+                "timeout_seconds": self.timeout()
+            })
+        result.update(self.metrics.snapshot())
+        return result
+
+
+class MeteredQueuePool(MeteredPoolMixin, QueuePool):
+    pass
+
+
+class MeteredAsyncAdaptedQueuePool(MeteredPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+class MeteredNullPool(MeteredPoolMixin, NullPool):
+    pass
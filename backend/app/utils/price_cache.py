@@ -0,0 +1,100 @@
+"""
+In-process cache of menu prices and active discount rules
+
+The order pricing engine reads item prices and discount rules from here
+instead of querying them for every order. The whole snapshot is loaded
+lazily in two queries and kept for the menu and settings cache versions it
+was loaded at (see MenuService.bump_catalog_version and
+app.utils.settings_cache): each lookup reads those two version numbers, so
+a menu item or discount rule written by any worker is seen by the next
+order. Writes in this worker also drop the snapshot explicitly, and the TTL
+bounds how long changes that bypass the versions can go unseen.
+"""
+import threading
+import time
+from typing import Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import MenuItem, DiscountRule, CacheVersion
+from app.services.menu_service import CATALOG_VERSION_NAME
+from app.utils.settings_cache import settings_cache, SETTINGS_VERSION_NAME
+from app.utils.tenant_scope import ALL_BRANCHES
+
+
+class PriceSnapshot:
+    """Menu item prices and active discount rules loaded at one pair of cache versions"""
+
+    def __init__(self, version: tuple, prices: Dict[int, tuple], discount_rules: Dict[int, Dict]):
+        self.version = version  # (menu version, settings version)
+        self.prices = prices  # menu item id -> (price, is_active, branch_id)
+        self.discount_rules = discount_rules  # rule id -> column values
+
+
+class PriceCache:
+    """Thread-safe, lazily loaded price snapshot keyed by cache version, with a TTL"""
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._snapshot: Optional[PriceSnapshot] = None
+        self._expires_at = 0.0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, db: Session) -> PriceSnapshot:
+        """Return the current snapshot, loading it with `db` when missing, outdated or expired"""
+        version = self._version(db)
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot.version == version and self._expires_at > time.time():
+                return snapshot
+            generation = self._generation
+
+        snapshot = self._load(db, version)
+        with self._lock:
+            # Don't keep a snapshot that an invalidation raced with
+            if generation == self._generation and self.ttl_seconds > 0:
+                self._snapshot = snapshot
+                self._expires_at = time.time() + self.ttl_seconds
+        return snapshot
+
+    def invalidate(self):
+        """Drop the snapshot (call after a menu item or discount rule change is committed)"""
+        with self._lock:
+            self._generation += 1
+            self._snapshot = None
+
+    @staticmethod
+    def _version(db: Session) -> tuple:
+        versions = dict(db.query(CacheVersion.name, CacheVersion.version).filter(
+            CacheVersion.name.in_([CATALOG_VERSION_NAME, SETTINGS_VERSION_NAME])
+        ).all())
+        return versions.get(CATALOG_VERSION_NAME, 0), versions.get(SETTINGS_VERSION_NAME, 0)
+
+    @staticmethod
+    def _load(db: Session, version: tuple) -> PriceSnapshot:
+        # One snapshot serves every branch, so load all of them
+        prices = {
+            item_id: (price or 0.0, bool(is_active), branch_id)
+            for item_id, price, is_active, branch_id in db.query(
+                MenuItem.id, MenuItem.price, MenuItem.is_active, MenuItem.branch_id
+            ).execution_options(**ALL_BRANCHES)
+        }
+        rules = {
+            rule.id: {
+                "id": rule.id,
+                "name": rule.name,
+                "discount_type": rule.discount_type,
+                "discount_value": rule.discount_value or 0.0,
+                "min_order_amount": rule.min_order_amount or 0.0,
+                "max_discount_amount": rule.max_discount_amount,
+                "applicable_on": rule.applicable_on or "All"
+            }
+            for rule in db.query(DiscountRule).filter(DiscountRule.is_active == True)
+        }
+        return PriceSnapshot(version, prices, rules)
+
+
+price_cache = PriceCache(ttl_seconds=settings.PRICE_CACHE_TTL_SECONDS)
+settings_cache.on_change(price_cache.invalidate)
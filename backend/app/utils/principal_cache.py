@@ -0,0 +1,93 @@
+"""
+In-process cache of authenticated users keyed by JWT ID (jti)
+
+get_current_user stores the user's column values here after the first lookup
+for a token, so later requests with the same token skip the users query.
+Entries expire after a short TTL (never later than the token itself) and are
+dropped explicitly whenever a user is updated, disabled or deleted.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.config import settings
+from app.models import User
+
+
+class PrincipalCache:
+    """Thread-safe LRU cache with per-entry expiry"""
+
+    def __init__(self, max_size: int, ttl_seconds: int):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, int, Dict]]" = OrderedDict()
+        self._jtis_by_user: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, jti: str, db: Session) -> Optional[User]:
+        """Return the cached user attached to `db`, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(jti)
+            if entry is None:
+                return None
+            expires_at, user_id, values = entry
+            if expires_at <= time.time():
+                self._remove(jti)
+                return None
+            self._entries.move_to_end(jti)
+
+        # Rebuild a persistent instance without querying the database
+        user = User(**values)
+        make_transient_to_detached(user)
+        return db.merge(user, load=False)
+
+    def put(self, jti: str, user: User, token_expires_at: Optional[float] = None):
+        """Cache a user's column values for a token"""
+        if self.max_size <= 0 or self.ttl_seconds <= 0:
+            return
+
+        values = {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+        expires_at = time.time() + self.ttl_seconds
+        if token_expires_at is not None:
+            expires_at = min(expires_at, token_expires_at)
+
+        with self._lock:
+            self._remove(jti)
+            self._entries[jti] = (expires_at, user.id, values)
+            self._jtis_by_user.setdefault(user.id, set()).add(jti)
+            while len(self._entries) > self.max_size:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+    def invalidate_user(self, user_id: int):
+        """Drop every cached token for a user (call after the change is committed)"""
+        with self._lock:
+            for jti in list(self._jtis_by_user.get(user_id, ())):
+                self._remove(jti)
+
+    def clear(self):
+        """Drop all entries"""
+        with self._lock:
+            self._entries.clear()
+            self._jtis_by_user.clear()
+
+    def _remove(self, jti: str):
+        """Remove a single entry; caller must hold the lock"""
+        entry = self._entries.pop(jti, None)
+        if entry is None:
+            return
+        user_jtis = self._jtis_by_user.get(entry[1])
+        if user_jtis is not None:
+            user_jtis.discard(jti)
+            if not user_jtis:
+                del self._jtis_by_user[entry[1]]
+
+
+principal_cache = PrincipalCache(
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS
+)
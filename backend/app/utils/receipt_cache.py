@@ -0,0 +1,77 @@
+"""
+In-process cache of prepared receipt templates per branch
+
+Templates are built from the company settings and the branch's details on
+first use and dropped when either is updated. Settings changes reach every
+worker through the settings snapshot (app.utils.settings_cache); branch
+changes made through another worker are picked up after a TTL.
+"""
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import Branch
+from app.utils.receipt_renderer import ReceiptTemplate
+from app.utils.settings_cache import settings_cache
+
+
+class ReceiptTemplateCache:
+    """Thread-safe cache of ReceiptTemplate objects keyed by branch id"""
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._templates: Dict[int, Tuple[float, ReceiptTemplate]] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, branch_id: Optional[int]) -> ReceiptTemplate:
+        """Return the template for a branch (0/None = company only), building it on a miss"""
+        key = branch_id or 0
+        with self._lock:
+            entry = self._templates.get(key)
+            if entry is not None and entry[0] > time.time():
+                return entry[1]
+            generation = self._generation
+
+        template = ReceiptTemplate(self._load_header(db, key))
+        with self._lock:
+            # Don't keep a template that an invalidation raced with
+            if generation == self._generation and self.ttl_seconds > 0:
+                self._templates[key] = (time.time() + self.ttl_seconds, template)
+        return template
+
+    def invalidate(self):
+        """Drop all templates (call after company settings or a branch change is committed)"""
+        with self._lock:
+            self._generation += 1
+            self._templates.clear()
+
+    @staticmethod
+    def _load_header(db: Session, branch_id: int) -> Dict:
+        company = settings_cache.get(db).company
+        branch = db.get(Branch, branch_id) if branch_id else None
+        header = {}
+        if company is not None:
+            header.update(
+                company_name=company["company_name"],
+                address=company["address"],
+                phone=company["phone"],
+                vat_pan_no=company["vat_pan_no"],
+                show_vat=company["show_vat_on_invoice"],
+                invoice_prefix=company["invoice_prefix"],
+                footer_text=company["invoice_footer_text"],
+                currency=company["currency"]
+            )
+        if branch is not None:
+            # Branch contact details take precedence on the receipt
+            header["branch_name"] = branch.name
+            header["address"] = branch.address or branch.location or header.get("address")
+            header["phone"] = branch.phone or header.get("phone")
+        return header
+
+
+receipt_templates = ReceiptTemplateCache(ttl_seconds=settings.RECEIPT_TEMPLATE_TTL_SECONDS)
+settings_cache.on_change(receipt_templates.invalidate)
@@ -0,0 +1,207 @@
+"""
+Invoice and receipt rendering
+
+A ReceiptTemplate is built once per branch from the company settings and
+branch details: the header and footer lines, column layout and reportlab
+styles are all prepared up front, so rendering an order only formats its own
+lines. Three outputs share one layout:
+
+- plain text for thermal printers or previews,
+- ESC/POS bytes ready to send to a receipt printer, and
+- a PDF invoice.
+"""
+from io import BytesIO
+from typing import Dict, List
+from xml.sax.saxutils import escape
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+
+# Characters per line: 48 for 80mm paper with font A, 32 for 58mm paper
+DEFAULT_RECEIPT_WIDTH = 48
+
+# ESC/POS control sequences
+ESC_INIT = b"\x1b@"
+ESC_ALIGN_LEFT = b"\x1ba\x00"
+ESC_ALIGN_CENTER = b"\x1ba\x01"
+ESC_BOLD_ON = b"\x1bE\x01"
+ESC_BOLD_OFF = b"\x1bE\x00"
+ESC_DOUBLE_SIZE = b"\x1d!\x11"
+ESC_NORMAL_SIZE = b"\x1d!\x00"
+ESC_FEED_AND_CUT = b"\x1bd\x04\x1dV\x00"
+
+
+def _money(value) -> str:
+    return f"{value or 0:,.2f}"
+
+
+class ReceiptTemplate:
+    """Prepared receipt layout for one branch"""
+
+    def __init__(self, header: Dict):
+        self.company_name = header.get("company_name") or ""
+        self.currency = header.get("currency") or "NPR"
+        self.invoice_prefix = header.get("invoice_prefix") or "INV"
+        self.header_lines = [
+            line for line in (
+                header.get("branch_name"),
+                header.get("address"),
+                f"Phone: {header['phone']}" if header.get("phone") else None,
+                f"VAT/PAN: {header['vat_pan_no']}" if header.get("vat_pan_no") and header.get("show_vat", True) else None,
+            ) if line
+        ]
+        self.footer_lines = (header.get("footer_text") or "Thank you for your visit!").splitlines()
+        self._text_headers: Dict[int, List[str]] = {}
+
+        # PDF styles are built once and shared by every invoice of the branch
+        styles = getSampleStyleSheet()
+        self.title_style = ParagraphStyle("ReceiptTitle", parent=styles["Title"], spaceAfter=4)
+        self.center_style = ParagraphStyle("ReceiptCenter", parent=styles["Normal"], alignment=1)
+        # Paragraph text is markup, so escape names like "Momo & Co"
+        self.pdf_header = [escape(line) for line in [self.company_name or "INVOICE"] + self.header_lines]
+        self.pdf_footer = [escape(line) for line in self.footer_lines]
+        self.details_style = TableStyle([
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 11),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+        ])
+        self.item_col_widths = [3 * inch, 1 * inch, 1.2 * inch, 1.2 * inch]
+        self.item_style_commands = [
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 11),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+        ]
+
+    # Plain text / ESC/POS
+    def _text_header(self, width: int) -> List[str]:
+        lines = self._text_headers.get(width)
+        if lines is None:
+            lines = [line[:width].center(width).rstrip() for line in self.header_lines]
+            self._text_headers[width] = lines
+        return lines
+
+    @staticmethod
+    def _row(left: str, right: str, width: int) -> str:
+        left = left[:max(width - len(right) - 1, 0)]
+        return f"{left}{' ' * (width - len(left) - len(right))}{right}"
+
+    def _body_lines(self, data: Dict, width: int) -> List[str]:
+        rule = "-" * width
+        lines = [
+            rule,
+            f"Bill No: {self.invoice_prefix}-{data['order_number']}",
+            f"Date: {data['date']}",
+        ]
+        if data.get("table"):
+            lines.append(f"Table: {data['table']}")
+        lines.append(f"Type: {data.get('order_type') or '-'}")
+        if data.get("customer"):
+            lines.append(f"Customer: {data['customer']}")
+        lines.append(rule)
+
+        qty_width, amount_width = 5, 12
+        name_width = width - qty_width - amount_width
+        lines.append(f"{'Item':<{name_width}}{'Qty':>{qty_width}}{'Amount':>{amount_width}}")
+        for item in data["items"]:
+            lines.append(
+                f"{item['name'][:name_width - 1]:<{name_width}}"
+                f"{item['quantity']:>{qty_width}}"
+                f"{_money(item['subtotal']):>{amount_width}}"
+            )
+            if item.get("notes"):
+                lines.append(f"  {item['notes']}"[:width])
+        lines.append(rule)
+
+        lines.append(self._row("Subtotal", _money(data['gross_amount']), width))
+        if data.get("discount"):
+            lines.append(self._row("Discount", f"-{_money(data['discount'])}", width))
+        if data.get("service_charge"):
+            lines.append(self._row("Service Charge", _money(data['service_charge']), width))
+        lines.append(self._row(f"TOTAL ({self.currency})", _money(data['net_amount']), width))
+        if data.get("paid_amount"):
+            paid_label = f"Paid ({data['payment_type']})" if data.get("payment_type") else "Paid"
+            lines.append(self._row(paid_label, _money(data['paid_amount']), width))
+        if data.get("credit_amount"):
+            lines.append(self._row("Credit", _money(data['credit_amount']), width))
+        lines.append(rule)
+        return lines
+
+    def render_text(self, data: Dict, width: int = DEFAULT_RECEIPT_WIDTH) -> str:
+        """Render a receipt as plain text lines of `width` characters"""
+        lines = [self.company_name[:width].center(width).rstrip()]
+        lines += self._text_header(width)
+        lines += self._body_lines(data, width)
+        lines += [line[:width].center(width).rstrip() for line in self.footer_lines]
+        return "\n".join(lines) + "\n"
+
+    def render_escpos(self, data: Dict, width: int = DEFAULT_RECEIPT_WIDTH, encoding: str = "cp437") -> bytes:
+        """Render a receipt as ESC/POS commands for a thermal printer"""
+        def encode(lines: List[str]) -> bytes:
+            return ("\n".join(lines) + "\n").encode(encoding, errors="replace")
+
+        return b"".join([
+            ESC_INIT,
+            ESC_ALIGN_CENTER, ESC_BOLD_ON, ESC_DOUBLE_SIZE,
+            encode([self.company_name[:width // 2]]),
+            ESC_NORMAL_SIZE, ESC_BOLD_OFF,
+            encode(self._text_header(width)),
+            ESC_ALIGN_LEFT,
+            encode(self._body_lines(data, width)),
+            ESC_ALIGN_CENTER,
+            encode(self.footer_lines),
+            ESC_FEED_AND_CUT,
+        ])
+
+    # PDF
+    def render_pdf(self, data: Dict) -> BytesIO:
+        """Render a PDF invoice"""
+        buffer = BytesIO()
+        doc = SimpleDocTemplate(buffer, pagesize=letter)
+        elements = [Paragraph(self.pdf_header[0], self.title_style)]
+        elements += [Paragraph(line, self.center_style) for line in self.pdf_header[1:]]
+        elements.append(Spacer(1, 0.3 * inch))
+
+        details = [
+            ['Invoice Number:', f"{self.invoice_prefix}-{data['order_number']}"],
+            ['Date:', data['date']],
+            ['Customer:', data.get('customer') or 'N/A'],
+            ['Table:', data.get('table') or 'N/A'],
+        ]
+        elements.append(Table(details, colWidths=[2 * inch, 4 * inch], style=self.details_style))
+        elements.append(Spacer(1, 0.3 * inch))
+
+        rows = [['Item', 'Quantity', 'Price', 'Total']]
+        for item in data["items"]:
+            rows.append([item['name'], str(item['quantity']), _money(item['price']), _money(item['subtotal'])])
+        totals = [('Subtotal:', data['gross_amount'])]
+        if data.get("discount"):
+            totals.append(('Discount:', -data['discount']))
+        if data.get("service_charge"):
+            totals.append(('Service Charge:', data['service_charge']))
+        totals.append((f"Total ({self.currency}):", data['net_amount']))
+        for label, value in totals:
+            rows.append(['', '', label, _money(value)])
+
+        # Only the grid around the item lines depends on the order
+        last_item_row = len(rows) - 1 - len(totals)
+        items_table = Table(rows, colWidths=self.item_col_widths)
+        items_table.setStyle(TableStyle(self.item_style_commands + [
+            ('BACKGROUND', (0, 1), (-1, last_item_row), colors.beige),
+            ('GRID', (0, 0), (-1, last_item_row), 1, colors.black),
+        ]))
+        elements.append(items_table)
+
+        elements.append(Spacer(1, 0.3 * inch))
+        elements += [Paragraph(line, self.center_style) for line in self.pdf_footer]
+
+        doc.build(elements)
+        buffer.seek(0)
+        return buffer
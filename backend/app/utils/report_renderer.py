@@ -0,0 +1,27 @@
+"""
+Report file rendering for the report job worker processes
+
+Only imports the PDF and Excel generators, so spawned workers start quickly
+and never touch the database; the rows to render are passed in.
+"""
+import os
+
+from app.utils.pdf_generator import generate_pdf_report, generate_sessions_pdf
+from app.utils.excel_generator import generate_excel_report
+
+
+def render_report(report_type: str, file_format: str, title: str, rows: list, path: str) -> str:
+    """Render rows to a PDF or XLSX file at `path` and return the path"""
+    if file_format == "pdf" and report_type == "sessions":
+        buffer = generate_sessions_pdf(rows)
+    elif file_format == "pdf":
+        buffer = generate_pdf_report(rows, title)
+    else:
+        buffer = generate_excel_report(rows, title)
+
+    # Write under a temporary name so readers never see a partial file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(buffer.getvalue())
+    os.replace(tmp_path, path)
+    return path
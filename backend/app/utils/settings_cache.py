@@ -0,0 +1,180 @@
+"""
+In-process snapshot of company settings, payment modes, storage areas and
+discount rules
+
+These change a few times a year but are read by every checkout and invoice,
+so each worker keeps one versioned snapshot, loaded on first use. Writes in
+the settings API bump the "settings" cache version and send a NOTIFY on
+SETTINGS_CHANNEL in the same transaction. Every worker runs a LISTEN thread
+that drops its snapshot, and anything derived from it (receipt templates,
+discount rules in the price cache), when the write commits.
+
+Without a listener (DB_TRANSACTION_POOLING, since pgbouncer can't hold a
+LISTEN, or while it reconnects) the snapshot expires after
+SETTINGS_CACHE_TTL_SECONDS instead.
+"""
+import logging
+import select
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import func, inspect, select as sql_select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import get_engine
+from app.models import CompanySettings, PaymentMode, StorageArea, DiscountRule, CacheVersion
+
+logger = logging.getLogger(__name__)
+
+# CacheVersion row and NOTIFY channel for settings changes
+SETTINGS_VERSION_NAME = "settings"
+SETTINGS_CHANNEL = "settings_changed"
+
+# Seconds between listener reconnect attempts
+LISTENER_RETRY_SECONDS = 5
+
+
+def _rows(db: Session, model, *order_by) -> List[Dict]:
+    columns = [attr.key for attr in inspect(model).column_attrs]
+    return [
+        {column: getattr(row, column) for column in columns}
+        for row in db.query(model).order_by(*order_by)
+    ]
+
+
+def bump_settings_version(db: Session) -> int:
+    """Mark settings as changed and notify the other workers; call in the same transaction as the write"""
+    stmt = pg_insert(CacheVersion).values(name=SETTINGS_VERSION_NAME, version=1, updated_at=datetime.now())
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[CacheVersion.name],
+        set_={"version": CacheVersion.version + 1, "updated_at": stmt.excluded.updated_at}
+    ).returning(CacheVersion.version)
+    version = db.execute(stmt).scalar_one()
+    # Delivered to listeners when the transaction commits, dropped on rollback
+    db.execute(sql_select(func.pg_notify(SETTINGS_CHANNEL, str(version))))
+    return version
+
+
+class SettingsSnapshot:
+    """Settings rows (as column values) loaded at one settings version"""
+
+    def __init__(self, version: int, company: Optional[Dict], payment_modes: List[Dict],
+                 storage_areas: List[Dict], discount_rules: List[Dict]):
+        self.version = version
+        self.company = company
+        self.payment_modes = payment_modes  # ordered by display_order
+        self.storage_areas = storage_areas
+        self.discount_rules = discount_rules
+        self.payment_modes_by_name = {mode["name"]: mode for mode in payment_modes}
+        self.discount_rules_by_id = {rule["id"]: rule for rule in discount_rules}
+
+
+class SettingsCache:
+    """Thread-safe, lazily loaded settings snapshot invalidated by NOTIFY"""
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._snapshot: Optional[SettingsSnapshot] = None
+        self._expires_at = 0.0
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+        self._listening = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def get(self, db: Session) -> SettingsSnapshot:
+        """Return the current snapshot, loading it with `db` when missing or expired"""
+        with self._lock:
+            if self._snapshot is not None and (self._listening or self._expires_at > time.time()):
+                return self._snapshot
+            generation = self._generation
+
+        snapshot = self._load(db)
+        with self._lock:
+            # Don't keep a snapshot that a change notification raced with
+            if generation == self._generation:
+                self._snapshot = snapshot
+                self._expires_at = time.time() + self.ttl_seconds
+        return snapshot
+
+    def on_change(self, callback: Callable[[], None]):
+        """Call `callback` whenever settings change (in this or another worker)"""
+        self._callbacks.append(callback)
+
+    def invalidate(self):
+        """Drop the snapshot and everything derived from it (call after a settings write is committed)"""
+        with self._lock:
+            self._generation += 1
+            self._snapshot = None
+        for callback in self._callbacks:
+            callback()
+
+    @staticmethod
+    def _load(db: Session) -> SettingsSnapshot:
+        version = db.query(CacheVersion.version).filter(CacheVersion.name == SETTINGS_VERSION_NAME).scalar()
+        companies = _rows(db, CompanySettings, CompanySettings.id)
+        return SettingsSnapshot(
+            version=version or 0,
+            company=companies[0] if companies else None,
+            payment_modes=_rows(db, PaymentMode, PaymentMode.display_order, PaymentMode.id),
+            storage_areas=_rows(db, StorageArea, StorageArea.id),
+            discount_rules=_rows(db, DiscountRule, DiscountRule.id)
+        )
+
+    # Change notifications
+    def start_listener(self):
+        """Start the LISTEN thread (once per worker)"""
+        if self._thread is not None or settings.DB_TRANSACTION_POOLING:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._listen_forever, name="settings-listener", daemon=True)
+        self._thread.start()
+
+    def stop_listener(self):
+        """Stop the LISTEN thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=LISTENER_RETRY_SECONDS)
+            self._thread = None
+
+    def _listen_forever(self):
+        while not self._stop.is_set():
+            try:
+                self._listen()
+            except Exception as e:
+                logger.warning("Settings change listener disconnected, retrying in %ss: %s",
+                               LISTENER_RETRY_SECONDS, e, exc_info=e)
+            finally:
+                self._listening = False
+            self._stop.wait(LISTENER_RETRY_SECONDS)
+
+    def _listen(self):
+        # A dedicated connection, detached so it doesn't hold a pool slot
+        connection = get_engine().raw_connection()
+        connection.detach()
+        raw = connection.dbapi_connection
+        try:
+            raw.autocommit = True
+            with raw.cursor() as cursor:
+                cursor.execute(f"LISTEN {SETTINGS_CHANNEL}")
+            # Changes made while we weren't listening
+            self.invalidate()
+            self._listening = True
+            while not self._stop.is_set():
+                if select.select([raw], [], [], LISTENER_RETRY_SECONDS) == ([], [], []):
+                    continue
+                raw.poll()
+                if raw.notifies:
+                    raw.notifies.clear()
+                    self.invalidate()
+        finally:
+            # Close the driver connection itself; the pool would try to roll back a dead one
+            raw.close()
+
+
+settings_cache = SettingsCache(ttl_seconds=settings.SETTINGS_CACHE_TTL_SECONDS)
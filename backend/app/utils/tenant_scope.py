@@ -0,0 +1,61 @@
+"""
+Per-request tenant scope
+
+get_current_user records the organization and branch from the JWT claims
+here. Queries on branch-scoped models (see app.models.tenancy) are then
+filtered to that branch automatically, and new rows are stamped with it.
+Requests without a scope (no claims, startup and maintenance jobs) see all
+branches.
+"""
+from contextvars import ContextVar, Token
+from typing import Optional
+
+# Execution option that disables the branch filter for one statement,
+# e.g. `select(MenuItem).execution_options(**ALL_BRANCHES)`
+ALL_BRANCHES = {"all_branches": True}
+
+
+class TenantScope:
+    """Organization and branch a request is limited to"""
+
+    def __init__(self, organization_id: Optional[int] = None, branch_id: Optional[int] = None):
+        self.organization_id = organization_id
+        self.branch_id = branch_id
+
+    @property
+    def key(self) -> str:
+        """Stable identifier for keying per-tenant caches"""
+        if self.branch_id:
+            return f"b{self.branch_id}"
+        return f"o{self.organization_id}"
+
+
+_current_scope: ContextVar[Optional[TenantScope]] = ContextVar("tenant_scope", default=None)
+
+
+def set_tenant_scope(organization_id: Optional[int], branch_id: Optional[int]) -> Token:
+    """Limit the current request to a branch (or a whole organization when branch_id is None)"""
+    scope = TenantScope(organization_id, branch_id) if organization_id or branch_id else None
+    return _current_scope.set(scope)
+
+
+def reset_tenant_scope(token: Token):
+    """Restore the scope that was active before set_tenant_scope"""
+    _current_scope.reset(token)
+
+
+def get_tenant_scope() -> Optional[TenantScope]:
+    """Scope of the current request, or None when unscoped"""
+    return _current_scope.get()
+
+
+def tenant_cache_key() -> str:
+    """Cache key part for data that differs per tenant ("all" when unscoped)"""
+    scope = _current_scope.get()
+    return scope.key if scope is not None else "all"
+
+
+def current_branch_id() -> Optional[int]:
+    """Branch of the current request; the default for branch_id on new rows"""
+    scope = _current_scope.get()
+    return scope.branch_id if scope is not None else None
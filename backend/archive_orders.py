@@ -0,0 +1,36 @@
+"""
+Move closed orders to cold storage (archived_orders)
+
+Usage (from the backend directory, e.g. nightly from cron):
+    python archive_orders.py [--older-than-months N] [--batch-size N]
+
+Paid, completed and cancelled orders without outstanding credit are moved
+with their items and KOTs; see app/services/order_archive_service.py.
+"""
+import argparse
+import sys
+
+from sqlalchemy.orm import Session
+
+from app.database import get_engine
+from app.services.order_archive_service import OrderArchiveService
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--older-than-months", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    with Session(get_engine()) as db:
+        try:
+            archived = OrderArchiveService.archive_closed_orders(db, args.older_than_months, args.batch_size)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return 1
+    print(f"✅ Archived {archived} orders")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""
+Monthly partition maintenance for orders, order_items, kots and kot_items
+
+Usage (from the backend directory):
+    python manage_partitions.py convert            # one-off, takes the tables offline while it runs
+    python manage_partitions.py ensure             # create upcoming months (run daily from cron)
+    python manage_partitions.py archive --older-than-months 24 [--archive-dir DIR]
+    python manage_partitions.py list
+
+See app/services/partition_service.py for what converting changes.
+"""
+import argparse
+import sys
+
+from sqlalchemy.orm import Session
+
+from app.database import get_engine
+from app.services.partition_service import PartitionService, PARTITIONED_TABLES
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+    convert = commands.add_parser("convert", help="partition the order tables by created_at month")
+    convert.add_argument("--months-ahead", type=int, default=None)
+    ensure = commands.add_parser("ensure", help="create partitions for the coming months")
+    ensure.add_argument("--months-ahead", type=int, default=None)
+    archive = commands.add_parser("archive", help="detach, archive and drop old months")
+    archive.add_argument("--older-than-months", type=int, required=True)
+    archive.add_argument("--archive-dir", default=None)
+    commands.add_parser("list", help="show the partitions of each table")
+    args = parser.parse_args(argv)
+
+    with Session(get_engine()) as db:
+        if args.command == "convert":
+            for result in PartitionService.convert_all(db, args.months_ahead):
+                print(f"✅ {result['table']}: {result['rows']} rows in {result['partitions']} monthly partitions")
+                for reference in result["dropped_references"]:
+                    print(f"   dropped foreign key {reference}")
+        elif args.command == "ensure":
+            created = PartitionService.ensure_partitions(db, args.months_ahead)
+            print(f"✅ Created {len(created)} partitions" + (f": {', '.join(created)}" if created else ""))
+        elif args.command == "archive":
+            try:
+                paths = PartitionService.archive_partitions(db, args.older_than_months, args.archive_dir)
+            except ValueError as e:
+                print(f"❌ {e}")
+                return 1
+            for path in paths:
+                print(f"📦 {path}")
+            print(f"✅ Archived {len(paths)} partitions")
+        else:
+            for table in PARTITIONED_TABLES:
+                if not PartitionService.is_partitioned(db, table):
+                    print(f"{table}: not partitioned")
+                    continue
+                print(f"{table}:")
+                for name, bound in PartitionService.list_partitions(db, table):
+                    print(f"   {name}  {bound}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
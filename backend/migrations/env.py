@@ -0,0 +1,62 @@
+"""
+Alembic environment
+
+Runs against the connection handed over by app.database.run_migrations when
+called from init_db, or against the configured DATABASE_URL when invoked
+from the command line (`alembic upgrade head` in the backend directory).
+"""
+import re
+from logging.config import fileConfig
+
+from alembic import context
+
+from app.database import Base, get_engine
+import app.models  # noqa: F401 - registers all models on Base.metadata
+
+config = context.config
+
+if config.config_file_name is not None and config.attributes.get("connection") is None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+# Monthly partitions created by manage_partitions.py aren't in the models
+PARTITION_NAME = re.compile(r"_(p\d{6}|default)$")
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    return not (type_ == "table" and reflected and compare_to is None and PARTITION_NAME.search(name))
+
+
+def run_migrations_offline():
+    """Emit the migration SQL without connecting to the database"""
+    from app.config import settings
+    context.configure(
+        url=settings.DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"}
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    """Run migrations on a live connection"""
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        context.configure(connection=connection, target_metadata=target_metadata, include_object=include_object)
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
+    with get_engine().connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata, include_object=include_object)
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,542 @@
+"""baseline schema
+
+Schema as created by Base.metadata.create_all before any of the tables and
+indexes added by later revisions. Databases created that way are stamped at
+this revision by run_migrations instead of running it, so everything newer
+has to live in a later revision (which must tolerate objects that a newer
+create_all already made).
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 23:04:36.445548
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('branches',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('organization_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('code', sa.String(), nullable=False),
+    sa.Column('location', sa.String(), nullable=True),
+    sa.Column('address', sa.String(), nullable=True),
+    sa.Column('phone', sa.String(), nullable=True),
+    sa.Column('email', sa.String(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_branches_code'), 'branches', ['code'], unique=True)
+    op.create_index(op.f('ix_branches_id'), 'branches', ['id'], unique=False)
+    op.create_index(op.f('ix_branches_organization_id'), 'branches', ['organization_id'], unique=False)
+    op.create_table('categories',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('type', sa.String(), nullable=False),
+    sa.Column('image', sa.String(), nullable=True),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_categories_id'), 'categories', ['id'], unique=False)
+    op.create_table('company_settings',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('company_name', sa.String(), nullable=False),
+    sa.Column('email', sa.String(), nullable=True),
+    sa.Column('phone', sa.String(), nullable=True),
+    sa.Column('address', sa.String(), nullable=True),
+    sa.Column('vat_pan_no', sa.String(), nullable=True),
+    sa.Column('registration_no', sa.String(), nullable=True),
+    sa.Column('start_date', sa.String(), nullable=True),
+    sa.Column('logo_url', sa.String(), nullable=True),
+    sa.Column('invoice_prefix', sa.String(), nullable=True),
+    sa.Column('invoice_footer_text', sa.Text(), nullable=True),
+    sa.Column('show_vat_on_invoice', sa.Boolean(), nullable=True),
+    sa.Column('currency', sa.String(), nullable=True),
+    sa.Column('timezone', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_company_settings_id'), 'company_settings', ['id'], unique=False)
+    op.create_table('customers',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('phone', sa.String(), nullable=True),
+    sa.Column('email', sa.String(), nullable=True),
+    sa.Column('address', sa.String(), nullable=True),
+    sa.Column('customer_type', sa.String(), nullable=True),
+    sa.Column('total_spent', sa.Float(), nullable=True),
+    sa.Column('total_visits', sa.Integer(), nullable=True),
+    sa.Column('due_amount', sa.Float(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_customers_id'), 'customers', ['id'], unique=False)
+    op.create_table('delivery_partners',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('phone', sa.String(), nullable=True),
+    sa.Column('vehicle_number', sa.String(), nullable=True),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_delivery_partners_id'), 'delivery_partners', ['id'], unique=False)
+    op.create_table('discount_rules',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('discount_type', sa.String(), nullable=False),
+    sa.Column('discount_value', sa.Float(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('min_order_amount', sa.Float(), nullable=True),
+    sa.Column('max_discount_amount', sa.Float(), nullable=True),
+    sa.Column('applicable_on', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_discount_rules_id'), 'discount_rules', ['id'], unique=False)
+    op.create_table('floors',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('display_order', sa.Integer(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    op.create_index(op.f('ix_floors_id'), 'floors', ['id'], unique=False)
+    op.create_table('organizations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('slug', sa.String(), nullable=False),
+    sa.Column('subscription_plan', sa.Enum('FREE', 'BASIC', 'PREMIUM', 'ENTERPRISE', 'LEGACY', name='subscriptionplan'), nullable=False),
+    sa.Column('subscription_status', sa.Enum('ACTIVE', 'INACTIVE', 'TRIAL', 'EXPIRED', 'SUSPENDED', name='subscriptionstatus'), nullable=False),
+    sa.Column('subscription_start_date', sa.DateTime(), nullable=True),
+    sa.Column('subscription_end_date', sa.DateTime(), nullable=True),
+    sa.Column('max_branches', sa.Integer(), nullable=True),
+    sa.Column('max_users', sa.Integer(), nullable=True),
+    sa.Column('company_address', sa.String(), nullable=True),
+    sa.Column('company_phone', sa.String(), nullable=True),
+    sa.Column('company_email', sa.String(), nullable=True),
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_organizations_id'), 'organizations', ['id'], unique=False)
+    op.create_index(op.f('ix_organizations_name'), 'organizations', ['name'], unique=False)
+    op.create_index(op.f('ix_organizations_slug'), 'organizations', ['slug'], unique=True)
+    op.create_table('payment_modes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('display_order', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    op.create_index(op.f('ix_payment_modes_id'), 'payment_modes', ['id'], unique=False)
+    op.create_table('roles',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('permissions', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_roles_id'), 'roles', ['id'], unique=False)
+    op.create_index(op.f('ix_roles_name'), 'roles', ['name'], unique=True)
+    op.create_table('sessions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('start_time', sa.String(), nullable=False),
+    sa.Column('end_time', sa.String(), nullable=False),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_sessions_id'), 'sessions', ['id'], unique=False)
+    op.create_table('storage_areas',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    op.create_index(op.f('ix_storage_areas_id'), 'storage_areas', ['id'], unique=False)
+    op.create_table('suppliers',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('contact_person', sa.String(), nullable=True),
+    sa.Column('phone', sa.String(), nullable=True),
+    sa.Column('email', sa.String(), nullable=True),
+    sa.Column('address', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_suppliers_id'), 'suppliers', ['id'], unique=False)
+    op.create_table('units_of_measurement',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('abbreviation', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    op.create_index(op.f('ix_units_of_measurement_id'), 'units_of_measurement', ['id'], unique=False)
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('username', sa.String(), nullable=False),
+    sa.Column('email', sa.String(), nullable=False),
+    sa.Column('full_name', sa.String(), nullable=False),
+    sa.Column('company_name', sa.String(), nullable=True),
+    sa.Column('company_location', sa.String(), nullable=True),
+    sa.Column('hashed_password', sa.String(), nullable=False),
+    sa.Column('role', sa.String(), nullable=False),
+    sa.Column('disabled', sa.Boolean(), nullable=True),
+    sa.Column('organization_id', sa.Integer(), nullable=True),
+    sa.Column('current_branch_id', sa.Integer(), nullable=True),
+    sa.Column('is_organization_owner', sa.Boolean(), nullable=False),
+    sa.ForeignKeyConstraint(['current_branch_id'], ['branches.id'], ),
+    sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+    op.create_index(op.f('ix_users_organization_id'), 'users', ['organization_id'], unique=False)
+    op.create_index(op.f('ix_users_username'), 'users', ['username'], unique=True)
+    # organizations, branches and users reference each other
+    op.create_foreign_key('branches_organization_id_fkey', 'branches', 'organizations', ['organization_id'], ['id'])
+    op.create_foreign_key('organizations_owner_id_fkey', 'organizations', 'users', ['owner_id'], ['id'])
+    op.create_table('menu_groups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=True),
+    sa.Column('image', sa.String(), nullable=True),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_menu_groups_id'), 'menu_groups', ['id'], unique=False)
+    op.create_table('pos_sessions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('start_time', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('end_time', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('opening_balance', sa.Float(), nullable=True),
+    sa.Column('closing_balance', sa.Float(), nullable=True),
+    sa.Column('total_sales', sa.Float(), nullable=True),
+    sa.Column('total_orders', sa.Integer(), nullable=True),
+    sa.Column('notes', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_pos_sessions_id'), 'pos_sessions', ['id'], unique=False)
+    op.create_table('products',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('category', sa.String(), nullable=True),
+    sa.Column('unit_id', sa.Integer(), nullable=True),
+    sa.Column('current_stock', sa.Float(), nullable=True),
+    sa.Column('min_stock', sa.Float(), nullable=True),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['unit_id'], ['units_of_measurement.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_products_id'), 'products', ['id'], unique=False)
+    op.create_table('purchase_bills',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('bill_number', sa.String(), nullable=False),
+    sa.Column('supplier_id', sa.Integer(), nullable=True),
+    sa.Column('total_amount', sa.Float(), nullable=False),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('order_date', sa.DateTime(), nullable=True),
+    sa.Column('received_date', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['supplier_id'], ['suppliers.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('bill_number')
+    )
+    op.create_index(op.f('ix_purchase_bills_id'), 'purchase_bills', ['id'], unique=False)
+    op.create_table('tables',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('table_id', sa.String(), nullable=False),
+    sa.Column('floor_id', sa.Integer(), nullable=True),
+    sa.Column('floor', sa.String(), nullable=False),
+    sa.Column('table_type', sa.String(), nullable=True),
+    sa.Column('capacity', sa.Integer(), nullable=True),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('display_order', sa.Integer(), nullable=True),
+    sa.Column('is_hold_table', sa.String(), nullable=True),
+    sa.Column('hold_table_name', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['floor_id'], ['floors.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('table_id')
+    )
+    op.create_index(op.f('ix_tables_id'), 'tables', ['id'], unique=False)
+    op.create_table('user_branch_assignments',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('branch_id', sa.Integer(), nullable=False),
+    sa.Column('organization_id', sa.Integer(), nullable=False),
+    sa.Column('is_primary', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['branch_id'], ['branches.id'], ),
+    sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'branch_id', name='unique_user_branch')
+    )
+    op.create_index(op.f('ix_user_branch_assignments_branch_id'), 'user_branch_assignments', ['branch_id'], unique=False)
+    op.create_index(op.f('ix_user_branch_assignments_id'), 'user_branch_assignments', ['id'], unique=False)
+    op.create_index(op.f('ix_user_branch_assignments_organization_id'), 'user_branch_assignments', ['organization_id'], unique=False)
+    op.create_index(op.f('ix_user_branch_assignments_user_id'), 'user_branch_assignments', ['user_id'], unique=False)
+    op.create_table('inventory_transactions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=True),
+    sa.Column('transaction_type', sa.String(), nullable=False),
+    sa.Column('quantity', sa.Float(), nullable=False),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('created_by', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_inventory_transactions_id'), 'inventory_transactions', ['id'], unique=False)
+    op.create_table('menu_items',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=True),
+    sa.Column('group_id', sa.Integer(), nullable=True),
+    sa.Column('price', sa.Float(), nullable=False),
+    sa.Column('image', sa.String(), nullable=True),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.Column('inventory_tracking', sa.Boolean(), nullable=True),
+    sa.Column('kot_bot', sa.String(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ),
+    sa.ForeignKeyConstraint(['group_id'], ['menu_groups.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_menu_items_id'), 'menu_items', ['id'], unique=False)
+    op.create_table('orders',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('order_number', sa.String(), nullable=False),
+    sa.Column('table_id', sa.Integer(), nullable=True),
+    sa.Column('customer_id', sa.Integer(), nullable=True),
+    sa.Column('order_type', sa.String(), nullable=False),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('total_amount', sa.Float(), nullable=True),
+    sa.Column('gross_amount', sa.Float(), nullable=True),
+    sa.Column('discount', sa.Float(), nullable=True),
+    sa.Column('net_amount', sa.Float(), nullable=True),
+    sa.Column('paid_amount', sa.Float(), nullable=True),
+    sa.Column('credit_amount', sa.Float(), nullable=True),
+    sa.Column('payment_type', sa.String(), nullable=True),
+    sa.Column('session_id', sa.Integer(), nullable=True),
+    sa.Column('created_by', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['customer_id'], ['customers.id'], ),
+    sa.ForeignKeyConstraint(['session_id'], ['sessions.id'], ),
+    sa.ForeignKeyConstraint(['table_id'], ['tables.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('order_number')
+    )
+    op.create_index(op.f('ix_orders_id'), 'orders', ['id'], unique=False)
+    op.create_table('purchase_returns',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('return_number', sa.String(), nullable=False),
+    sa.Column('purchase_bill_id', sa.Integer(), nullable=True),
+    sa.Column('total_amount', sa.Float(), nullable=False),
+    sa.Column('reason', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['purchase_bill_id'], ['purchase_bills.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('return_number')
+    )
+    op.create_index(op.f('ix_purchase_returns_id'), 'purchase_returns', ['id'], unique=False)
+    op.create_table('bills_of_materials',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('menu_item_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['menu_item_id'], ['menu_items.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_bills_of_materials_id'), 'bills_of_materials', ['id'], unique=False)
+    op.create_table('kots',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('kot_number', sa.String(), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=True),
+    sa.Column('kot_type', sa.String(), nullable=True),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('created_by', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('kot_number')
+    )
+    op.create_index(op.f('ix_kots_id'), 'kots', ['id'], unique=False)
+    op.create_table('order_items',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=True),
+    sa.Column('menu_item_id', sa.Integer(), nullable=True),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('price', sa.Float(), nullable=False),
+    sa.Column('subtotal', sa.Float(), nullable=False),
+    sa.Column('notes', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['menu_item_id'], ['menu_items.id'], ),
+    sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_order_items_id'), 'order_items', ['id'], unique=False)
+    op.create_table('batch_productions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('production_number', sa.String(), nullable=False),
+    sa.Column('bom_id', sa.Integer(), nullable=True),
+    sa.Column('quantity', sa.Float(), nullable=False),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['bom_id'], ['bills_of_materials.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('production_number')
+    )
+    op.create_index(op.f('ix_batch_productions_id'), 'batch_productions', ['id'], unique=False)
+    op.create_table('bom_items',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('bom_id', sa.Integer(), nullable=True),
+    sa.Column('product_id', sa.Integer(), nullable=True),
+    sa.Column('quantity', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['bom_id'], ['bills_of_materials.id'], ),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_bom_items_id'), 'bom_items', ['id'], unique=False)
+    op.create_table('kot_items',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('kot_id', sa.Integer(), nullable=True),
+    sa.Column('menu_item_id', sa.Integer(), nullable=True),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('notes', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['kot_id'], ['kots.id'], ),
+    sa.ForeignKeyConstraint(['menu_item_id'], ['menu_items.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_kot_items_id'), 'kot_items', ['id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_kot_items_id'), table_name='kot_items')
+    op.drop_table('kot_items')
+    op.drop_index(op.f('ix_bom_items_id'), table_name='bom_items')
+    op.drop_table('bom_items')
+    op.drop_index(op.f('ix_batch_productions_id'), table_name='batch_productions')
+    op.drop_table('batch_productions')
+    op.drop_index(op.f('ix_order_items_id'), table_name='order_items')
+    op.drop_table('order_items')
+    op.drop_index(op.f('ix_kots_id'), table_name='kots')
+    op.drop_table('kots')
+    op.drop_index(op.f('ix_bills_of_materials_id'), table_name='bills_of_materials')
+    op.drop_table('bills_of_materials')
+    op.drop_index(op.f('ix_purchase_returns_id'), table_name='purchase_returns')
+    op.drop_table('purchase_returns')
+    op.drop_index(op.f('ix_orders_id'), table_name='orders')
+    op.drop_table('orders')
+    op.drop_index(op.f('ix_menu_items_id'), table_name='menu_items')
+    op.drop_table('menu_items')
+    op.drop_index(op.f('ix_inventory_transactions_id'), table_name='inventory_transactions')
+    op.drop_table('inventory_transactions')
+    op.drop_index(op.f('ix_user_branch_assignments_user_id'), table_name='user_branch_assignments')
+    op.drop_index(op.f('ix_user_branch_assignments_organization_id'), table_name='user_branch_assignments')
+    op.drop_index(op.f('ix_user_branch_assignments_id'), table_name='user_branch_assignments')
+    op.drop_index(op.f('ix_user_branch_assignments_branch_id'), table_name='user_branch_assignments')
+    op.drop_table('user_branch_assignments')
+    op.drop_index(op.f('ix_tables_id'), table_name='tables')
+    op.drop_table('tables')
+    op.drop_index(op.f('ix_purchase_bills_id'), table_name='purchase_bills')
+    op.drop_table('purchase_bills')
+    op.drop_index(op.f('ix_products_id'), table_name='products')
+    op.drop_table('products')
+    op.drop_index(op.f('ix_pos_sessions_id'), table_name='pos_sessions')
+    op.drop_table('pos_sessions')
+    op.drop_index(op.f('ix_menu_groups_id'), table_name='menu_groups')
+    op.drop_table('menu_groups')
+    op.drop_constraint('organizations_owner_id_fkey', 'organizations', type_='foreignkey')
+    op.drop_constraint('branches_organization_id_fkey', 'branches', type_='foreignkey')
+    op.drop_index(op.f('ix_users_username'), table_name='users')
+    op.drop_index(op.f('ix_users_organization_id'), table_name='users')
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+    op.drop_table('users')
+    op.drop_index(op.f('ix_units_of_measurement_id'), table_name='units_of_measurement')
+    op.drop_table('units_of_measurement')
+    op.drop_index(op.f('ix_suppliers_id'), table_name='suppliers')
+    op.drop_table('suppliers')
+    op.drop_index(op.f('ix_storage_areas_id'), table_name='storage_areas')
+    op.drop_table('storage_areas')
+    op.drop_index(op.f('ix_sessions_id'), table_name='sessions')
+    op.drop_table('sessions')
+    op.drop_index(op.f('ix_roles_name'), table_name='roles')
+    op.drop_index(op.f('ix_roles_id'), table_name='roles')
+    op.drop_table('roles')
+    op.drop_index(op.f('ix_payment_modes_id'), table_name='payment_modes')
+    op.drop_table('payment_modes')
+    op.drop_index(op.f('ix_organizations_slug'), table_name='organizations')
+    op.drop_index(op.f('ix_organizations_name'), table_name='organizations')
+    op.drop_index(op.f('ix_organizations_id'), table_name='organizations')
+    op.drop_table('organizations')
+    op.drop_index(op.f('ix_floors_id'), table_name='floors')
+    op.drop_table('floors')
+    op.drop_index(op.f('ix_discount_rules_id'), table_name='discount_rules')
+    op.drop_table('discount_rules')
+    op.drop_index(op.f('ix_delivery_partners_id'), table_name='delivery_partners')
+    op.drop_table('delivery_partners')
+    op.drop_index(op.f('ix_customers_id'), table_name='customers')
+    op.drop_table('customers')
+    op.drop_index(op.f('ix_company_settings_id'), table_name='company_settings')
+    op.drop_table('company_settings')
+    op.drop_index(op.f('ix_categories_id'), table_name='categories')
+    op.drop_table('categories')
+    op.drop_index(op.f('ix_branches_organization_id'), table_name='branches')
+    op.drop_index(op.f('ix_branches_id'), table_name='branches')
+    op.drop_index(op.f('ix_branches_code'), table_name='branches')
+    op.drop_table('branches')
+    sa.Enum(name='subscriptionstatus').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='subscriptionplan').drop(op.get_bind(), checkfirst=True)
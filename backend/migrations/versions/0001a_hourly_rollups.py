@@ -0,0 +1,93 @@
+"""hourly rollups
+
+Sales and menu-item hourly rollup tables. Databases created by create_all
+after the rollups were introduced already have them and are stamped at 0001
+like older ones, so existing tables are left as they are. Newly created
+tables are filled from the closed orders already in the database.
+
+Revision ID: 0001a
+Revises: 0001
+Create Date: 2026-10-18 10:12:41.208315
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0001a'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'sales_hourly_rollups' not in existing:
+        op.create_table('sales_hourly_rollups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('branch_id', sa.Integer(), nullable=False),
+        sa.Column('hour', sa.DateTime(), nullable=False),
+        sa.Column('order_type', sa.String(), nullable=False),
+        sa.Column('payment_type', sa.String(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('order_count', sa.Integer(), nullable=False),
+        sa.Column('gross_amount', sa.Float(), nullable=False),
+        sa.Column('net_amount', sa.Float(), nullable=False),
+        sa.Column('discount', sa.Float(), nullable=False),
+        sa.Column('paid_amount', sa.Float(), nullable=False),
+        sa.Column('credit_amount', sa.Float(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('branch_id', 'hour', 'order_type', 'payment_type', 'status', name='uq_sales_hourly_rollup_key')
+        )
+        op.create_index(op.f('ix_sales_hourly_rollups_hour'), 'sales_hourly_rollups', ['hour'], unique=False)
+        op.create_index(op.f('ix_sales_hourly_rollups_id'), 'sales_hourly_rollups', ['id'], unique=False)
+        # Orders have no branch yet at this revision (0 = no branch)
+        op.execute("""
+            INSERT INTO sales_hourly_rollups (
+                branch_id, hour, order_type, payment_type, status, order_count,
+                gross_amount, net_amount, discount, paid_amount, credit_amount, updated_at
+            )
+            SELECT 0, date_trunc('hour', created_at), order_type, coalesce(payment_type, ''), status, count(id),
+                   coalesce(sum(gross_amount), 0), coalesce(sum(net_amount), 0), coalesce(sum(discount), 0),
+                   coalesce(sum(paid_amount), 0), coalesce(sum(credit_amount), 0), now()
+            FROM orders
+            WHERE status IN ('Paid', 'Completed', 'Cancelled')
+            GROUP BY date_trunc('hour', created_at), order_type, coalesce(payment_type, ''), status
+        """)
+
+    if 'menu_item_hourly_rollups' not in existing:
+        op.create_table('menu_item_hourly_rollups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('branch_id', sa.Integer(), nullable=False),
+        sa.Column('hour', sa.DateTime(), nullable=False),
+        sa.Column('menu_item_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('gross_amount', sa.Float(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('branch_id', 'hour', 'menu_item_id', 'status', name='uq_menu_item_hourly_rollup_key')
+        )
+        op.create_index(op.f('ix_menu_item_hourly_rollups_hour'), 'menu_item_hourly_rollups', ['hour'], unique=False)
+        op.create_index(op.f('ix_menu_item_hourly_rollups_id'), 'menu_item_hourly_rollups', ['id'], unique=False)
+        op.execute("""
+            INSERT INTO menu_item_hourly_rollups (
+                branch_id, hour, menu_item_id, status, quantity, gross_amount, updated_at
+            )
+            SELECT 0, date_trunc('hour', o.created_at), i.menu_item_id, o.status,
+                   coalesce(sum(i.quantity), 0), coalesce(sum(i.subtotal), 0), now()
+            FROM order_items i
+            JOIN orders o ON o.id = i.order_id
+            WHERE o.status IN ('Paid', 'Completed', 'Cancelled') AND i.menu_item_id IS NOT NULL
+            GROUP BY date_trunc('hour', o.created_at), i.menu_item_id, o.status
+        """)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_menu_item_hourly_rollups_id'), table_name='menu_item_hourly_rollups')
+    op.drop_index(op.f('ix_menu_item_hourly_rollups_hour'), table_name='menu_item_hourly_rollups')
+    op.drop_table('menu_item_hourly_rollups')
+    op.drop_index(op.f('ix_sales_hourly_rollups_id'), table_name='sales_hourly_rollups')
+    op.drop_index(op.f('ix_sales_hourly_rollups_hour'), table_name='sales_hourly_rollups')
+    op.drop_table('sales_hourly_rollups')
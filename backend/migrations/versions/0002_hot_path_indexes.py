@@ -0,0 +1,43 @@
+"""hot path indexes
+
+Composite and partial indexes for the order, KOT, inventory and POS session
+filters used by the floor plan, listings and reports.
+
+Revision ID: 0002
+Revises: 0001a
+Create Date: 2026-10-17 23:05:33.739972
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0002'
+down_revision = '0001a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(op.f('ix_inventory_transactions_transaction_type'), 'inventory_transactions', ['transaction_type'], unique=False)
+    op.create_index(op.f('ix_kot_items_kot_id'), 'kot_items', ['kot_id'], unique=False)
+    op.create_index('ix_kots_kot_type_status_created_at', 'kots', ['kot_type', 'status', 'created_at'], unique=False)
+    op.create_index(op.f('ix_kots_order_id'), 'kots', ['order_id'], unique=False)
+    op.create_index(op.f('ix_order_items_order_id'), 'order_items', ['order_id'], unique=False)
+    op.create_index('ix_orders_created_at_id', 'orders', ['created_at', 'id'], unique=False)
+    op.create_index('ix_orders_open_by_table', 'orders', ['table_id', 'id'], unique=False, postgresql_where=sa.text("status IN ('Pending', 'In Progress', 'BillRequested')"))
+    op.create_index('ix_orders_outstanding_credit', 'orders', ['customer_id'], unique=False, postgresql_where=sa.text('credit_amount > 0'))
+    op.create_index('ix_orders_table_id_status', 'orders', ['table_id', 'status'], unique=False)
+    op.create_index('ix_pos_sessions_user_id_status', 'pos_sessions', ['user_id', 'status'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_pos_sessions_user_id_status', table_name='pos_sessions')
+    op.drop_index('ix_orders_table_id_status', table_name='orders')
+    op.drop_index('ix_orders_outstanding_credit', table_name='orders', postgresql_where=sa.text('credit_amount > 0'))
+    op.drop_index('ix_orders_open_by_table', table_name='orders', postgresql_where=sa.text("status IN ('Pending', 'In Progress', 'BillRequested')"))
+    op.drop_index('ix_orders_created_at_id', table_name='orders')
+    op.drop_index(op.f('ix_order_items_order_id'), table_name='order_items')
+    op.drop_index(op.f('ix_kots_order_id'), table_name='kots')
+    op.drop_index('ix_kots_kot_type_status_created_at', table_name='kots')
+    op.drop_index(op.f('ix_kot_items_kot_id'), table_name='kot_items')
+    op.drop_index(op.f('ix_inventory_transactions_transaction_type'), table_name='inventory_transactions')
@@ -0,0 +1,33 @@
+"""document counters
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 23:06:52.314991
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('document_counters',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('branch_id', sa.Integer(), nullable=False),
+    sa.Column('doc_type', sa.String(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('last_value', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('branch_id', 'doc_type', 'day', name='uq_document_counter_key')
+    )
+    op.create_index(op.f('ix_document_counters_id'), 'document_counters', ['id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_document_counters_id'), table_name='document_counters')
+    op.drop_table('document_counters')
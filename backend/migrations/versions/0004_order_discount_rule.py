@@ -0,0 +1,27 @@
+"""order discount rule
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 23:13:57.011110
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('orders', sa.Column('discount_rule_id', sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        'orders_discount_rule_id_fkey', 'orders', 'discount_rules',
+        ['discount_rule_id'], ['id'], ondelete='SET NULL'
+    )
+
+
+def downgrade():
+    op.drop_constraint('orders_discount_rule_id_fkey', 'orders', type_='foreignkey')
+    op.drop_column('orders', 'discount_rule_id')
@@ -0,0 +1,41 @@
+"""order pos session
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 23:26:33.048888
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('orders', sa.Column('pos_session_id', sa.Integer(), nullable=True))
+    op.create_index(op.f('ix_orders_pos_session_id'), 'orders', ['pos_session_id'], unique=False)
+    op.create_foreign_key(
+        'orders_pos_session_id_fkey', 'orders', 'pos_sessions',
+        ['pos_session_id'], ['id'], ondelete='SET NULL'
+    )
+    # Best-effort attribution of existing settled orders: the creator's
+    # session that was open when the order was last updated
+    op.execute(sa.text("""
+        UPDATE orders o
+        SET pos_session_id = s.id
+        FROM pos_sessions s
+        WHERE o.pos_session_id IS NULL
+          AND o.status IN ('Paid', 'Completed')
+          AND s.user_id = o.created_by
+          AND o.updated_at >= s.start_time
+          AND o.updated_at < COALESCE(s.end_time, now())
+    """))
+
+
+def downgrade():
+    op.drop_constraint('orders_pos_session_id_fkey', 'orders', type_='foreignkey')
+    op.drop_index(op.f('ix_orders_pos_session_id'), table_name='orders')
+    op.drop_column('orders', 'pos_session_id')
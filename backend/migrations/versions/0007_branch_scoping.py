@@ -0,0 +1,73 @@
+"""branch scoping
+
+Adds branch_id to the operational tables. Orders and tickets are assigned
+the branch of their creator; tables and products only when there is a single
+branch, and otherwise stay shared by every branch.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 23:31:06.045882
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+SCOPED_TABLES = ['orders', 'kots', 'tables', 'menu_items', 'products']
+
+
+def upgrade():
+    for table in SCOPED_TABLES:
+        op.add_column(table, sa.Column('branch_id', sa.Integer(), nullable=True))
+        op.create_foreign_key(f'{table}_branch_id_fkey', table, 'branches', ['branch_id'], ['id'])
+
+    op.create_index('ix_orders_branch_id_created_at_id', 'orders', ['branch_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_orders_branch_id_status', 'orders', ['branch_id', 'status'], unique=False)
+    op.create_index('ix_kots_branch_id_kot_type_status_created_at', 'kots', ['branch_id', 'kot_type', 'status', 'created_at'], unique=False)
+    op.create_index('ix_menu_items_branch_id_category_id', 'menu_items', ['branch_id', 'category_id'], unique=False)
+    op.create_index('ix_products_branch_id_name', 'products', ['branch_id', 'name'], unique=False)
+    op.drop_constraint('tables_table_id_key', 'tables', type_='unique')
+    op.create_index('uq_tables_branch_id_table_id', 'tables', [sa.literal_column('coalesce(branch_id, 0)'), 'table_id'], unique=True)
+
+    # Orders (and their tickets) belong to the branch their creator was
+    # working in, the same attribution the sales rollups used so far
+    op.execute(sa.text("""
+        UPDATE orders o
+        SET branch_id = u.current_branch_id
+        FROM users u
+        WHERE u.id = o.created_by AND u.current_branch_id IS NOT NULL
+    """))
+    op.execute(sa.text("""
+        UPDATE kots k
+        SET branch_id = o.branch_id
+        FROM orders o
+        WHERE o.id = k.order_id AND o.branch_id IS NOT NULL
+    """))
+    # Tables, products and menu items have nothing that ties them to a
+    # branch, or even an organization, so they can't be attributed when there
+    # are several branches. Their models are shared instead: rows left NULL
+    # stay visible to every branch (assign a branch_id to give a branch its
+    # own). With a single branch they are assigned to it.
+    for table in ('tables', 'products'):
+        op.execute(sa.text(f"""
+            UPDATE {table}
+            SET branch_id = (SELECT min(id) FROM branches)
+            WHERE (SELECT count(*) FROM branches) = 1
+        """))
+
+
+def downgrade():
+    op.drop_index('uq_tables_branch_id_table_id', table_name='tables')
+    op.create_unique_constraint('tables_table_id_key', 'tables', ['table_id'])
+    op.drop_index('ix_products_branch_id_name', table_name='products')
+    op.drop_index('ix_menu_items_branch_id_category_id', table_name='menu_items')
+    op.drop_index('ix_kots_branch_id_kot_type_status_created_at', table_name='kots')
+    op.drop_index('ix_orders_branch_id_status', table_name='orders')
+    op.drop_index('ix_orders_branch_id_created_at_id', table_name='orders')
+    for table in reversed(SCOPED_TABLES):
+        op.drop_constraint(f'{table}_branch_id_fkey', table, type_='foreignkey')
+        op.drop_column(table, 'branch_id')
@@ -0,0 +1,40 @@
+"""archived orders
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 23:45:02.826501
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('archived_orders',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('order_number', sa.String(), nullable=False),
+    sa.Column('customer_id', sa.Integer(), nullable=True),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('net_amount', sa.Float(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=True),
+    sa.Column('payload', sa.LargeBinary(), nullable=False),
+    sa.Column('branch_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['branch_id'], ['branches.id'], name='archived_orders_branch_id_fkey'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_archived_orders_branch_id_created_at', 'archived_orders', ['branch_id', 'created_at'], unique=False)
+    op.create_index(op.f('ix_archived_orders_customer_id'), 'archived_orders', ['customer_id'], unique=False)
+    op.create_index(op.f('ix_archived_orders_order_number'), 'archived_orders', ['order_number'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_archived_orders_order_number'), table_name='archived_orders')
+    op.drop_index(op.f('ix_archived_orders_customer_id'), table_name='archived_orders')
+    op.drop_index('ix_archived_orders_branch_id_created_at', table_name='archived_orders')
+    op.drop_table('archived_orders')
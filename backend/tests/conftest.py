@@ -0,0 +1,106 @@
+"""
+Shared test fixtures
+
+Database tests run against the PostgreSQL database in TEST_DATABASE_URL,
+whose public schema is dropped and recreated, and are skipped when it
+isn't set:
+
+    TEST_DATABASE_URL=postgresql+psycopg2://postgres@localhost/digibi_test pytest
+"""
+import os
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+if TEST_DATABASE_URL:
+    # Read by app.config on import
+    os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  (registers every table on Base)
+from app import database
+from app.database import Base
+from app.utils.cache import cache
+from app.utils.catalog_cache import catalog_cache
+from app.utils.pool_metrics import MeteredNullPool
+from app.utils.principal_cache import principal_cache
+from app.utils.settings_cache import settings_cache
+from tests.factories import make_branch, make_user
+
+
+def _reset_schema(engine):
+    with engine.begin() as connection:
+        connection.execute(text("DROP SCHEMA public CASCADE"))
+        connection.execute(text("CREATE SCHEMA public"))
+
+
+@pytest.fixture(scope="session")
+def engine():
+    """Sync engine on a freshly created schema, installed as the app's engine"""
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    new_engine = database.build_engine(TEST_DATABASE_URL)
+    _reset_schema(new_engine)
+    Base.metadata.create_all(new_engine)
+
+    database.engine = new_engine
+    database.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=new_engine)
+    # TestClient runs each request on its own event loop, so asyncpg
+    # connections can't be pooled across requests
+    database.async_engine = create_async_engine(
+        database.get_async_database_url(TEST_DATABASE_URL), poolclass=MeteredNullPool
+    )
+    database.AsyncSessionLocal = None
+    yield new_engine
+    new_engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    """Session on the test database; every table is emptied afterwards"""
+    session = database.SessionLocal()
+    yield session
+    session.close()
+    tables = ", ".join(Base.metadata.tables)
+    with engine.begin() as connection:
+        connection.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
+    cache.backend.delete_prefix(f"{cache.prefix}:")
+    catalog_cache.clear()
+    principal_cache.clear()
+    settings_cache.invalidate()
+
+
+@pytest.fixture
+def statements(engine):
+    """SQL statements run by the sync and async engines during the test"""
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    engines = [engine, database.async_engine.sync_engine]
+    for target in engines:
+        event.listen(target, "before_cursor_execute", record)
+    yield executed
+    for target in engines:
+        event.remove(target, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def client(engine):
+    from app.main import app
+    return TestClient(app)
+
+
+@pytest.fixture
+def branch(db):
+    """An organization with one branch; returns the branch"""
+    return make_branch(db, "Main", "B001")
+
+
+@pytest.fixture
+def admin(db, branch):
+    return make_user(db, "admin", organization_id=branch.organization_id, branch_id=branch.id)
@@ -0,0 +1,41 @@
+"""
+Helpers for creating test data and tokens
+"""
+from app.dependencies import create_access_token
+from app.models import User, Organization, Branch
+
+
+def make_branch(db, name, code, organization_id=None):
+    """A branch in `organization_id`, or in a new organization with its own owner"""
+    if organization_id is None:
+        owner = User(username=f"owner-{code}", email=f"owner-{code}@example.com", full_name="Owner",
+                     hashed_password="x", role="admin", is_organization_owner=True)
+        db.add(owner)
+        db.flush()
+        organization = Organization(name=f"Org {code}", slug=f"org-{code.lower()}", owner_id=owner.id)
+        db.add(organization)
+        db.flush()
+        owner.organization_id = organization_id = organization.id
+    branch = Branch(organization_id=organization_id, name=name, code=code)
+    db.add(branch)
+    db.commit()
+    return branch
+
+
+def make_user(db, username, role="admin", organization_id=None, branch_id=None):
+    user = User(username=username, email=f"{username}@example.com", full_name=username.title(),
+                hashed_password="x", role=role, organization_id=organization_id,
+                current_branch_id=branch_id)
+    db.add(user)
+    db.commit()
+    return user
+
+
+def auth_headers(user, organization_id=None, branch_id=None):
+    """Bearer header for `user`, scoped like a token issued for that organization/branch"""
+    claims = {"sub": user.username, "role": user.role}
+    if organization_id is not None:
+        claims["organization_id"] = organization_id
+    if branch_id is not None:
+        claims["branch_id"] = branch_id
+    return {"Authorization": f"Bearer {create_access_token(claims)}"}
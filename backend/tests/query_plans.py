@@ -0,0 +1,47 @@
+"""
+Helpers for asserting on PostgreSQL query plans
+"""
+from sqlalchemy import event
+
+
+def explain_last_query(db, fn, *args, **kwargs):
+    """
+    Call fn(db, *args, **kwargs), then run EXPLAIN (ANALYZE, FORMAT JSON) on
+    the last statement it executed. Returns (fn's result, root plan node).
+    """
+    engine = db.get_bind()
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        result = fn(db, *args, **kwargs)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    statement, parameters = captured[-1]
+    cursor = db.connection().connection.cursor()
+    cursor.execute("EXPLAIN (ANALYZE, FORMAT JSON) " + statement, parameters)
+    return result, cursor.fetchone()[0][0]["Plan"]
+
+
+def plan_nodes(plan):
+    """Every node of a plan, depth first"""
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def rows_read(plan, relation):
+    """Rows read from `relation` across the plan, including rows discarded by filters"""
+    return sum(
+        (node["Actual Rows"] + node.get("Rows Removed by Filter", 0)) * node["Actual Loops"]
+        for node in plan_nodes(plan)
+        if node.get("Relation Name") == relation
+    )
+
+
+def indexes_used(plan):
+    return {node["Index Name"] for node in plan_nodes(plan) if "Index Name" in node}
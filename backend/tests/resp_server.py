@@ -0,0 +1,111 @@
+"""
+A small Redis-protocol server for testing RedisCacheBackend
+
+Supports the commands the backend uses (AUTH, SELECT, GET, SET with PX/NX,
+DEL, SCAN). It can be stopped and restarted on the same port, and `hang`
+makes it accept commands without ever replying.
+"""
+import fnmatch
+import socket
+import socketserver
+import threading
+import time
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        server = self.server.owner
+        server.connections.append(self.connection)
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            args = []
+            for _ in range(int(line[1:])):
+                length = int(self.rfile.readline()[1:])
+                args.append(self.rfile.read(length + 2)[:-2])
+            server.commands.append(args[0].upper().decode())
+            if server.hang.is_set():
+                server.released.wait()
+                return
+            with server.lock:
+                reply = server.run(args[0].upper().decode(), args[1:])
+            self.wfile.write(reply)
+
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+def _bulk(value):
+    return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+class FakeRespServer:
+    def __init__(self):
+        self.data = {}  # key -> (value, expires at or None)
+        self.commands = []
+        self.connections = []
+        self.lock = threading.Lock()
+        self.hang = threading.Event()
+        self.released = threading.Event()
+        self.port = 0
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        return f"redis://127.0.0.1:{self.port}/0"
+
+    def start(self):
+        self._server = _TCPServer(("127.0.0.1", self.port), _Handler)
+        self._server.owner = self
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is None:
+            return
+        self.released.set()
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        # Drop clients too, as a restarting server would
+        for connection in self.connections:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self.connections.clear()
+        self.released.clear()
+
+    def _alive(self, key):
+        entry = self.data.get(key)
+        if entry and entry[1] is not None and entry[1] < time.monotonic():
+            del self.data[key]
+            return None
+        return entry
+
+    def run(self, command, args):
+        if command in ("AUTH", "SELECT"):
+            return b"+OK\r\n"
+        if command == "GET":
+            entry = self._alive(args[0])
+            return _bulk(entry[0] if entry else None)
+        if command == "SET":
+            options = [arg.upper() for arg in args[2:]]
+            expires = None
+            if b"PX" in options:
+                expires = time.monotonic() + int(args[2 + options.index(b"PX") + 1]) / 1000
+            if b"NX" in options and self._alive(args[0]):
+                return b"$-1\r\n"
+            self.data[args[0]] = (args[1], expires)
+            return b"+OK\r\n"
+        if command == "DEL":
+            return b":%d\r\n" % sum(1 for key in args if self.data.pop(key, None) is not None)
+        if command == "SCAN":
+            pattern = args[args.index(b"MATCH") + 1].decode().replace("\\", "")
+            keys = [key for key in list(self.data) if self._alive(key) and fnmatch.fnmatchcase(key.decode(), pattern)]
+            return b"*2\r\n" + _bulk(b"0") + b"*%d\r\n" % len(keys) + b"".join(_bulk(key) for key in keys)
+        return b"-ERR unknown command\r\n"
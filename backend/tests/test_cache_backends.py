@@ -0,0 +1,100 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.utils.cache_backends import MISSING, RedisCacheBackend
+from tests.resp_server import FakeRespServer
+
+
+@pytest.fixture
+def server():
+    server = FakeRespServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def backend(server):
+    backend = RedisCacheBackend(server.url, timeout=0.3, loop_wait=0.1)
+    backend.RETRY_AFTER_SECONDS = 0.2
+    yield backend
+    backend.close()
+
+
+def test_round_trip(backend, server):
+    backend.set("app:roles:b1:all", [{"id": 1}], 60)
+    backend.set("app:roles:b2:all", [], 60)
+    backend.set("app:menu:b1:all", {"items": 3}, 60)
+
+    assert backend.get("app:roles:b1:all") == [{"id": 1}]
+    assert backend.get("app:missing") is MISSING
+    assert backend.add("app:lock", 1, 5) is True
+    assert backend.add("app:lock", 1, 5) is False
+    assert backend.delete_prefix("app:roles:") == 2
+    backend.delete("app:menu:b1:all")
+    assert set(server.data) == {b"app:lock"}
+    assert backend.stats()["fallbacks"] == 0
+
+
+def test_event_loop_never_does_socket_io(backend, server, monkeypatch):
+    io_threads = []
+    execute = RedisCacheBackend._execute
+
+    def record(self, *args):
+        io_threads.append(threading.current_thread().name)
+        return execute(self, *args)
+
+    monkeypatch.setattr(RedisCacheBackend, "_execute", record)
+
+    async def on_loop():
+        backend.set("key", "value", 60)
+        return backend.get("key")
+
+    assert asyncio.run(on_loop()) == "value"
+    assert io_threads and all(name.startswith("cache-io") for name in io_threads)
+
+
+def test_server_that_stops_replying_times_out_to_the_fallback(backend, server):
+    backend.set("key", "stored", 60)
+    server.hang.set()
+
+    async def on_loop():
+        started = time.monotonic()
+        value = backend.get("key")
+        return value, time.monotonic() - started
+
+    value, waited = asyncio.run(on_loop())
+
+    assert value is MISSING
+    assert waited < 0.25
+    assert backend.stats()["fallbacks"] == 1
+    # Off the loop the socket timeout applies; the server is then skipped
+    backend.set("other", 1, 60)
+    assert backend.get("other") == 1
+    assert not backend.stats()["available"]
+
+
+def test_reconnects_and_replays_missed_deletes(backend, server):
+    backend.set("app:roles:b1:all", "stale", 60)
+    backend.set("app:menu:b1:all", "stale", 60)
+    server.stop()
+
+    # Down: served from the fallback, deletes are remembered
+    backend.set("app:roles:b1:all", "fresh", 60)
+    assert backend.get("app:roles:b1:all") == "fresh"
+    backend.delete_prefix("app:roles:")
+    backend.delete("app:menu:b1:all")
+    assert backend.get("app:roles:b1:all") is MISSING
+    assert backend.stats()["pending_deletes"] == 2
+
+    server.start()
+    time.sleep(backend.RETRY_AFTER_SECONDS)
+
+    assert backend.get("app:roles:b1:all") is MISSING
+    assert backend.get("app:menu:b1:all") is MISSING
+    assert server.data == {}
+    assert backend.stats()["pending_deletes"] == 0
+    backend.set("app:roles:b1:all", "new", 60)
+    assert server.data[b"app:roles:b1:all"][0] == b'"new"'
@@ -0,0 +1,20 @@
+from sqlalchemy import insert, text
+
+from app.models import Order
+from app.services.dashboard_service import DashboardService
+from tests.query_plans import explain_last_query, indexes_used
+
+
+def test_outstanding_revenue_uses_partial_index(db):
+    db.execute(insert(Order), [
+        {"order_number": f"ORD-{n}", "order_type": "Takeaway", "status": "Paid",
+         "credit_amount": 25 if n % 500 == 0 else 0}
+        for n in range(5000)
+    ])
+    db.commit()
+    db.execute(text("ANALYZE orders"))
+
+    total, plan = explain_last_query(db, DashboardService.get_outstanding_revenue)
+
+    assert total == 250
+    assert "ix_orders_outstanding_credit" in indexes_used(plan)
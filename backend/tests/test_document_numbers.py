@@ -0,0 +1,79 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import event
+
+from app import database
+from app.services.document_number_service import DocumentNumberService
+from app.utils.tenant_scope import reset_tenant_scope, set_tenant_scope
+from tests.factories import auth_headers
+
+
+def _issue(scope, count):
+    session = database.SessionLocal()
+    token = set_tenant_scope(*scope)
+    try:
+        numbers = [DocumentNumberService.next_number(session, "order") for _ in range(count)]
+        session.commit()
+        return numbers
+    finally:
+        reset_tenant_scope(token)
+        session.close()
+
+
+def test_concurrent_numbers_are_unique_and_consecutive(db, branch):
+    scope = (branch.organization_id, branch.id)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        batches = list(pool.map(lambda _: _issue(scope, 25), range(8)))
+
+    numbers = [number for batch in batches for number in batch]
+    assert len(set(numbers)) == 200
+    assert sorted(int(number.rsplit("-", 1)[1]) for number in numbers) == list(range(1, 201))
+    # Taken from the request's tenant scope
+    assert all(number.split("-")[2] == str(branch.id) for number in numbers)
+
+
+def test_open_transaction_does_not_block_other_numbers(db, branch):
+    scope = (branch.organization_id, branch.id)
+    token = set_tenant_scope(*scope)
+    try:
+        first = DocumentNumberService.next_number(db, "order")
+    finally:
+        reset_tenant_scope(token)
+    # db's transaction is still open, e.g. while the rest of its order is written
+    issued = []
+    other = threading.Thread(target=lambda: issued.extend(_issue(scope, 1)))
+    other.start()
+    other.join(timeout=5)
+    blocked = other.is_alive()
+    db.rollback()
+    other.join()
+
+    assert not blocked
+    assert int(issued[0].rsplit("-", 1)[1]) == int(first.rsplit("-", 1)[1]) + 1
+
+
+def test_kot_route_numbers_from_token_branch(db, client, admin, branch):
+    response = client.post(
+        "/api/v1/kots", headers=auth_headers(admin, branch.organization_id, branch.id), json={"kot_type": "BOT"}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["kot_number"].split("-")[0] == "BOT"
+    assert response.json()["kot_number"].split("-")[2] == str(branch.id)
+
+
+def test_numbers_do_not_use_the_request_pool(db, branch):
+    pool = database.engine.pool
+    db.connection()  # the request's own connection
+    checked_out = pool.checkedout()
+    checkouts = []
+    listener = lambda *args: checkouts.append(args)
+    event.listen(pool, "checkout", listener)
+    try:
+        DocumentNumberService.next_numbers(db, "order", 3, branch_id=branch.id)
+    finally:
+        event.remove(pool, "checkout", listener)
+
+    assert checkouts == []
+    assert pool.checkedout() == checked_out
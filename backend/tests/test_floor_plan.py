@@ -0,0 +1,71 @@
+from sqlalchemy import text
+
+from app.models import Floor, Table, Order, KOT
+from app.services.table_service import TableService
+from tests.factories import auth_headers
+from tests.query_plans import explain_last_query, rows_read
+
+
+def _order(db, number, table, status):
+    order = Order(order_number=number, table_id=table.id, order_type="Table", status=status, net_amount=100)
+    db.add(order)
+    db.flush()
+    return order
+
+
+def _tickets(db, order, kots, bots):
+    for n in range(kots + bots):
+        db.add(KOT(kot_number=f"{order.order_number}-{n}", order_id=order.id, kot_type="KOT" if n < kots else "BOT"))
+
+
+def test_floor_plan_counts_tickets_of_active_orders_only(db):
+    floor = Floor(name="Ground", display_order=1)
+    db.add(floor)
+    db.flush()
+    t1 = Table(table_id="T1", floor="Ground", floor_id=floor.id, display_order=1)
+    t2 = Table(table_id="T2", floor="Ground", floor_id=floor.id, display_order=2)
+    db.add_all([t1, t2])
+    db.flush()
+    # Closed history on T1 must not leak into its counts
+    _tickets(db, _order(db, "ORD-1", t1, "Paid"), kots=5, bots=5)
+    active = _order(db, "ORD-2", t1, "Pending")
+    _tickets(db, active, kots=2, bots=1)
+    db.commit()
+
+    plan = {table["table_id"]: table for table in TableService.get_floor_plan(db)}
+
+    assert plan["T1"]["active_order_id"] == active.id
+    assert (plan["T1"]["kot_count"], plan["T1"]["bot_count"]) == (2, 1)
+    assert plan["T2"]["active_order_id"] is None
+    assert (plan["T2"]["kot_count"], plan["T2"]["bot_count"]) == (0, 0)
+
+
+def test_floor_plan_is_one_query(db, client, admin, statements):
+    db.add_all([Table(table_id=f"T{n}", floor="Ground", display_order=n) for n in range(20)])
+    db.commit()
+    headers = auth_headers(admin)
+    client.get("/api/v1/tables", headers=headers)  # warm the principal cache
+    statements.clear()
+
+    response = client.get("/api/v1/tables", headers=headers)
+
+    assert response.status_code == 200
+    assert len(response.json()) == 20
+    assert len([s for s in statements if s.lstrip().upper().startswith("SELECT")]) == 1
+
+
+def test_floor_plan_does_not_read_ticket_history(db):
+    table = Table(table_id="T1", floor="Ground")
+    db.add(table)
+    db.flush()
+    for n in range(50):
+        _tickets(db, _order(db, f"OLD-{n}", table, "Paid"), kots=20, bots=20)
+    _tickets(db, _order(db, "ORD-NEW", table, "Pending"), kots=1, bots=1)
+    db.commit()
+    db.execute(text("ANALYZE"))
+
+    plan, explained = explain_last_query(db, TableService.get_floor_plan)
+
+    assert plan[0]["kot_count"] == 1
+    # 2,002 tickets exist, only the open order's two should be read
+    assert rows_read(explained, "kots") < 100
@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert, select, text, tuple_
+
+from app.models import Table, Order, OrderItem, KOT
+from app.services.table_service import TableService
+from tests.query_plans import explain_last_query, indexes_used
+
+ORDERS = 5000
+
+
+@pytest.fixture
+def history(db):
+    """A few tables with a long closed order history, plus one open order each"""
+    tables = [Table(table_id=f"T{n}", floor="Ground") for n in range(10)]
+    db.add_all(tables)
+    db.flush()
+    start = datetime(2026, 1, 1)
+    order_ids = db.scalars(insert(Order).returning(Order.id), [
+        {"order_number": f"ORD-{n}", "order_type": "Table", "table_id": tables[n % 10].id,
+         "status": "Paid", "created_at": start + timedelta(minutes=n)}
+        for n in range(ORDERS)
+    ] + [
+        {"order_number": f"OPEN-{n}", "order_type": "Table", "table_id": table.id,
+         "status": "Pending", "created_at": start + timedelta(minutes=ORDERS + n)}
+        for n, table in enumerate(tables)
+    ]).all()
+    db.execute(insert(OrderItem), [
+        {"order_id": order_id, "quantity": 1, "price": 100, "subtotal": 100} for order_id in order_ids
+    ])
+    db.execute(insert(KOT), [
+        {"kot_number": f"KOT-{order_id}", "order_id": order_id, "kot_type": "KOT" if order_id % 4 else "BOT",
+         "status": "Served" if order_id <= ORDERS else "Pending", "created_at": start + timedelta(minutes=order_id)}
+        for order_id in order_ids
+    ])
+    db.commit()
+    db.execute(text("ANALYZE"))
+    return order_ids
+
+
+def test_floor_plan_finds_open_orders_by_index(db, history):
+    plan, explained = explain_last_query(db, TableService.get_floor_plan)
+
+    assert all(table["active_order_id"] for table in plan)
+    assert "ix_orders_open_by_table" in indexes_used(explained)
+
+
+def test_order_listing_page_uses_keyset_index(db, history):
+    cursor = (datetime(2026, 1, 2), ORDERS)
+
+    def page(db):
+        return db.scalars(
+            select(Order).where(tuple_(Order.created_at, Order.id) < cursor)
+            .order_by(Order.created_at.desc(), Order.id.desc()).limit(50)
+        ).all()
+
+    orders, explained = explain_last_query(db, page)
+
+    assert len(orders) == 50
+    assert "ix_orders_created_at_id" in indexes_used(explained)
+
+
+def test_kot_board_filter_uses_composite_index(db, history):
+    def board(db):
+        return db.scalars(
+            select(KOT).where(KOT.kot_type == "KOT", KOT.status == "Pending").order_by(KOT.created_at.desc())
+        ).all()
+
+    kots, explained = explain_last_query(db, board)
+
+    assert kots and all(kot.status == "Pending" for kot in kots)
+    assert "ix_kots_kot_type_status_created_at" in indexes_used(explained)
+
+
+def test_order_items_are_loaded_by_index(db, history):
+    def items(db):
+        return db.scalars(select(OrderItem).where(OrderItem.order_id.in_(history[:20]))).all()
+
+    rows, explained = explain_last_query(db, items)
+
+    assert len(rows) == 20
+    assert "ix_order_items_order_id" in indexes_used(explained)
@@ -0,0 +1,74 @@
+import asyncio
+
+from app import database
+from app.database import get_db, get_async_db
+from app.dependencies import create_access_token, get_current_user_detached
+from app.api.v1.kots import router as kots_router
+from app.services.kot_event_service import KOTEventBroker
+
+
+def _ticket(kot_id=1):
+    return {"id": kot_id, "branch_id": None, "kot_type": "KOT", "status": "Pending"}
+
+
+def test_event_ids_carry_the_broker_epoch():
+    broker = KOTEventBroker()
+    event = broker.publish("created", _ticket())
+
+    assert event["id"] == f"{broker.epoch}-1"
+    assert broker.parse_event_id(event["id"]) == 1
+
+
+def test_replay_returns_missed_events():
+    broker = KOTEventBroker()
+    first, second, third = (broker.publish("created", _ticket(n)) for n in range(3))
+
+    assert [event["id"] for event in broker.replay(first["id"])] == [second["id"], third["id"]]
+    assert broker.replay(third["id"]) == []
+
+
+def test_cursor_from_another_process_forces_resync():
+    before_restart = KOTEventBroker()
+    for n in range(60):
+        before_restart.publish("created", _ticket(n))
+    after_restart = KOTEventBroker()
+    for n in range(80):
+        after_restart.publish("created", _ticket(n))
+
+    assert after_restart.replay(before_restart.event_id(57)) is None
+    # Bare sequence numbers (ids issued before epochs were added) resync too
+    assert after_restart.replay("57") is None
+    assert after_restart.replay(after_restart.event_id(200)) is None
+
+
+def test_replay_of_evicted_cursor_forces_resync():
+    broker = KOTEventBroker(history_size=10)
+    for n in range(30):
+        broker.publish("created", _ticket(n))
+
+    assert broker.replay(broker.event_id(5)) is None
+    assert len(broker.replay(broker.event_id(25))) == 5
+
+
+def _dependencies(dependant):
+    for dependency in dependant.dependencies:
+        yield dependency.call
+        yield from _dependencies(dependency)
+
+
+def test_stream_route_holds_no_database_session():
+    route = next(route for route in kots_router.routes if route.path == "/stream")
+
+    calls = set(_dependencies(route.dependant))
+    assert get_current_user_detached in calls
+    assert get_db not in calls and get_async_db not in calls
+
+
+def test_detached_authentication_returns_the_connection(db, admin):
+    token = create_access_token({"sub": admin.username, "role": admin.role})
+    db.close()
+
+    user = asyncio.run(get_current_user_detached(token))
+
+    assert user.username == "admin"
+    assert database.engine.pool.checkedout() == 0
@@ -0,0 +1,103 @@
+import pytest
+from sqlalchemy import event, insert, select
+from sqlalchemy.exc import InvalidRequestError
+
+from app import database
+from app.models import Category, MenuItem, Table, Order, OrderItem, KOT, KOTItem
+from app.services.loader_profiles import loader_options
+from tests.factories import auth_headers
+
+ORDERS, ITEMS, KOTS, KOT_ITEMS = 5, 20, 5, 4
+
+
+@pytest.fixture
+def orders(db):
+    """5 orders x 20 items, each with 5 KOTs x 4 items"""
+    category = Category(name="Food", type="KOT")
+    db.add(category)
+    db.flush()
+    menu_item = MenuItem(name="Momo", price=150, category_id=category.id, kot_bot="KOT")
+    table = Table(table_id="T1", floor="Ground")
+    db.add_all([menu_item, table])
+    db.flush()
+    order_ids = db.scalars(insert(Order).returning(Order.id), [
+        {"order_number": f"ORD-{n}", "order_type": "Table", "table_id": table.id} for n in range(ORDERS)
+    ]).all()
+    db.execute(insert(OrderItem), [
+        {"order_id": order_id, "menu_item_id": menu_item.id, "quantity": 1, "price": 150, "subtotal": 150}
+        for order_id in order_ids for _ in range(ITEMS)
+    ])
+    kot_ids = db.scalars(insert(KOT).returning(KOT.id), [
+        {"order_id": order_id, "kot_number": f"KOT-{order_id}-{n}"} for order_id in order_ids for n in range(KOTS)
+    ]).all()
+    db.execute(insert(KOTItem), [
+        {"kot_id": kot_id, "menu_item_id": menu_item.id, "quantity": 1} for kot_id in kot_ids for _ in range(KOT_ITEMS)
+    ])
+    db.commit()
+    return order_ids
+
+
+@pytest.fixture
+def rows_fetched(engine):
+    """(statements, rows) returned by SELECTs on both engines during the test"""
+    counts = {"statements": 0, "rows": 0}
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            counts["statements"] += 1
+            counts["rows"] += max(cursor.rowcount, 0)
+
+    engines = [engine, database.async_engine.sync_engine]
+    for target in engines:
+        event.listen(target, "after_cursor_execute", count)
+    yield counts
+    for target in engines:
+        event.remove(target, "after_cursor_execute", count)
+
+
+def _get(client, admin, rows_fetched, path, **params):
+    headers = auth_headers(admin)
+    client.get(path, headers=headers, params=params)  # warm the principal cache
+    rows_fetched.update(statements=0, rows=0)
+    response = client.get(path, headers=headers, params=params)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_order_full_profile(db, client, admin, orders, rows_fetched):
+    body = _get(client, admin, rows_fetched, "/api/v1/orders")
+
+    assert len(body) == ORDERS
+    assert all(len(order["items"]) == ITEMS and len(order["kots"]) == KOTS for order in body)
+    assert all(len(kot["items"]) == KOT_ITEMS for order in body for kot in order["kots"])
+    # orders (+table, customer), items (+menu item), KOTs, KOT items (+menu item)
+    assert rows_fetched["statements"] == 4
+    assert rows_fetched["rows"] == ORDERS + ORDERS * ITEMS + ORDERS * KOTS + ORDERS * KOTS * KOT_ITEMS
+
+
+def test_order_summary_profile(db, client, admin, orders, rows_fetched):
+    body = _get(client, admin, rows_fetched, "/api/v1/orders", include_kots=False)
+
+    assert all(order["kots"] == [] for order in body)
+    assert rows_fetched["statements"] == 2
+    assert rows_fetched["rows"] == ORDERS + ORDERS * ITEMS
+
+
+def test_kot_board_profile(db, client, admin, orders, rows_fetched):
+    body = _get(client, admin, rows_fetched, "/api/v1/kots")
+
+    assert len(body) == ORDERS * KOTS
+    assert rows_fetched["statements"] == 2
+    assert rows_fetched["rows"] == ORDERS * KOTS + ORDERS * KOTS * KOT_ITEMS
+
+
+def test_unlisted_relationships_raise(db, orders):
+    order = db.scalars(select(Order).options(*loader_options("order_summary"))).first()
+
+    with pytest.raises(InvalidRequestError):
+        order.user
+
+
+def test_unknown_profile():
+    with pytest.raises(ValueError):
+        loader_options("order_everything")
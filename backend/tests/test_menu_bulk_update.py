@@ -0,0 +1,74 @@
+import pytest
+
+from app.api.v1.menu import router as menu_router
+from app.models import Category, MenuItem
+from tests.factories import auth_headers, make_branch
+
+URL = "/api/v1/menu/items/bulk-update"
+
+
+@pytest.fixture
+def items(db, branch):
+    """Ids of a shared item, an item of the main branch and one of another branch"""
+    other = make_branch(db, "Second", "B002", organization_id=branch.organization_id)
+    category = Category(name="Food", type="KOT")
+    db.add(category)
+    db.flush()
+    rows = [
+        MenuItem(name="Momo", price=150, category_id=category.id, kot_bot="KOT"),
+        MenuItem(name="Tea", price=40, category_id=category.id, kot_bot="BOT", branch_id=branch.id),
+        MenuItem(name="Coffee", price=90, category_id=category.id, kot_bot="BOT", branch_id=other.id),
+    ]
+    db.add_all(rows)
+    db.commit()
+    return [row.id for row in rows]
+
+
+def test_bulk_update_route_is_matched_before_item_id():
+    paths = [(route.path, sorted(route.methods)) for route in menu_router.routes]
+
+    assert paths.index(("/items/bulk-update", ["PUT"])) < paths.index(("/items/{item_id}", ["PUT"]))
+
+
+def test_counts_changed_unchanged_and_missing_rows(db, client, admin, items):
+    momo, tea, _ = items
+
+    response = client.put(URL, headers=auth_headers(admin), json=[
+        {"id": momo, "price": 160},
+        {"id": tea, "price": 40},  # already current
+        {"id": tea, "is_active": False},
+        {"id": 999999, "price": 1},
+    ])
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "requested_count": 3, "updated_count": 2, "unchanged_count": 0,
+        "updated_ids": sorted([momo, tea]), "not_found_ids": [999999]
+    }
+    db.expire_all()
+    assert (db.get(MenuItem, momo).price, db.get(MenuItem, tea).is_active) == (160, False)
+
+    again = client.put(URL, headers=auth_headers(admin), json=[{"id": momo, "price": 160}])
+    assert again.json()["updated_count"] == 0 and again.json()["unchanged_count"] == 1
+
+
+def test_updates_are_limited_to_the_token_branch(db, client, admin, branch, items):
+    momo, tea, coffee = items
+
+    response = client.put(URL, headers=auth_headers(admin, branch.organization_id, branch.id),
+                          json=[{"id": item_id, "price": 10} for item_id in items])
+
+    assert response.json()["updated_ids"] == sorted([momo, tea])
+    assert response.json()["not_found_ids"] == [coffee]
+    db.expire_all()
+    assert [db.get(MenuItem, item_id).price for item_id in items] == [10, 10, 90]
+
+
+def test_invalid_updates_change_nothing(db, client, admin, items):
+    response = client.put(URL, headers=auth_headers(admin), json=[
+        {"id": items[0], "price": 10}, {"id": items[1], "branch_id": 5}
+    ])
+
+    assert response.status_code == 400
+    db.expire_all()
+    assert db.get(MenuItem, items[0]).price == 150
@@ -0,0 +1,82 @@
+import pytest
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.engine import make_url
+
+from app import database
+from tests.conftest import TEST_DATABASE_URL
+
+ROLLUP_TABLES = {"sales_hourly_rollups", "menu_item_hourly_rollups"}
+
+
+@pytest.fixture
+def scratch_engine(monkeypatch):
+    """Engine on an empty database next to the test database, installed as the app's engine"""
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    url = make_url(TEST_DATABASE_URL)
+    name = f"{url.database}_migrations"
+    admin = create_engine(url, isolation_level="AUTOCOMMIT")
+    with admin.connect() as connection:
+        connection.execute(text(f"DROP DATABASE IF EXISTS {name}"))
+        connection.execute(text(f"CREATE DATABASE {name}"))
+    scratch = create_engine(url.set(database=name))
+    monkeypatch.setattr(database, "engine", scratch)
+    yield scratch
+    scratch.dispose()
+    with admin.connect() as connection:
+        connection.execute(text(f"DROP DATABASE {name}"))
+    admin.dispose()
+
+
+def _create_all_database(engine, revision):
+    """Simulate a database made by create_all: the schema of `revision` without alembic_version"""
+    config = Config(str(database.ALEMBIC_INI))
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        command.upgrade(config, revision)
+        connection.execute(text("DROP TABLE alembic_version"))
+
+
+def _version(engine):
+    with engine.connect() as connection:
+        return connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+
+
+def test_baseline_database_gets_rollup_tables(scratch_engine):
+    _create_all_database(scratch_engine, "0001")
+    assert not ROLLUP_TABLES & set(inspect(scratch_engine).get_table_names())
+    with scratch_engine.begin() as connection:
+        connection.execute(text(
+            "INSERT INTO orders (order_number, order_type, status, net_amount, created_at) VALUES "
+            "('ORD-1', 'Takeaway', 'Paid', 100, '2026-10-01 12:15'), "
+            "('ORD-2', 'Takeaway', 'Paid', 50, '2026-10-01 12:45'), "
+            "('ORD-3', 'Takeaway', 'Pending', 70, '2026-10-01 12:50')"
+        ))
+
+    database.run_migrations()
+
+    assert ROLLUP_TABLES <= set(inspect(scratch_engine).get_table_names())
+    with scratch_engine.connect() as connection:
+        rows = connection.execute(text("SELECT status, order_count, net_amount FROM sales_hourly_rollups")).all()
+    assert [tuple(row) for row in rows] == [("Paid", 2, 150)]
+    head = ScriptDirectory.from_config(Config(str(database.ALEMBIC_INI))).get_current_head()
+    assert _version(scratch_engine) == head
+
+
+def test_database_with_rollup_tables_keeps_them(scratch_engine):
+    # create_all from a build that already had the rollup models
+    _create_all_database(scratch_engine, "0001a")
+    with scratch_engine.begin() as connection:
+        connection.execute(text(
+            "INSERT INTO sales_hourly_rollups (branch_id, hour, order_type, payment_type, status, order_count, "
+            "gross_amount, net_amount, discount, paid_amount, credit_amount) "
+            "VALUES (0, '2026-10-01 12:00', 'Takeaway', '', 'Paid', 3, 0, 300, 0, 0, 0)"
+        ))
+
+    database.run_migrations()
+
+    with scratch_engine.connect() as connection:
+        assert connection.execute(text("SELECT sum(order_count) FROM sales_hourly_rollups")).scalar() == 3
@@ -0,0 +1,101 @@
+from datetime import date, datetime
+
+import pytest
+
+from app.models import ArchivedOrder, Category, MenuItem, Order
+from app.services.order_archive_service import OrderArchiveService
+from tests.factories import auth_headers, make_branch, make_user
+
+TODAY = date(2026, 10, 18)
+OLD = datetime(2026, 6, 1, 12)
+
+
+@pytest.fixture
+def momo(db):
+    category = Category(name="Food", type="KOT")
+    db.add(category)
+    db.flush()
+    item = MenuItem(name="Momo", price=150, category_id=category.id, kot_bot="KOT")
+    db.add(item)
+    db.commit()
+    return item.id
+
+
+@pytest.fixture
+def headers(admin, branch):
+    return auth_headers(admin, branch.organization_id, branch.id)
+
+
+def _old_order(db, client, headers, momo, **update):
+    order = client.post("/api/v1/orders", headers=headers, json={
+        "order_type": "Takeaway", "items": [{"menu_item_id": momo, "quantity": 2, "notes": "spicy"}]
+    }).json()
+    kot = client.post("/api/v1/kots", headers=headers, json={
+        "kot_type": "KOT", "order_id": order["id"], "items": [{"menu_item_id": momo, "quantity": 2}]
+    })
+    assert kot.status_code == 200
+    if update:
+        assert client.put(f"/api/v1/orders/{order['id']}", headers=headers, json=update).status_code == 200
+    db.query(Order).filter(Order.id == order["id"]).update({"created_at": OLD}, synchronize_session=False)
+    db.commit()
+    return order["id"]
+
+
+def _archive(db):
+    return OrderArchiveService.archive_closed_orders(db, older_than_months=1, today=TODAY)
+
+
+def test_archived_order_reads_back_as_before(db, client, headers, momo):
+    order_id = _old_order(db, client, headers, momo, status="Paid", payment_type="Cash", paid_amount=315)
+    before = client.get(f"/api/v1/orders/{order_id}", headers=headers).json()
+
+    assert _archive(db) == 1
+    after = client.get(f"/api/v1/orders/{order_id}", headers=headers)
+
+    assert db.query(Order).count() == 0
+    assert db.query(ArchivedOrder).count() == 1
+    assert after.status_code == 200
+    assert after.json() == before
+    assert [kot["items"][0]["quantity"] for kot in after.json()["kots"]] == [2]
+
+
+def test_archived_orders_stay_in_their_tenant(db, client, headers, momo):
+    order_id = _old_order(db, client, headers, momo, status="Paid", payment_type="Cash", paid_amount=315)
+    _archive(db)
+    foreign = make_branch(db, "Foreign", "X001")
+    outsider = make_user(db, "outsider", organization_id=foreign.organization_id, branch_id=foreign.id)
+
+    response = client.get(f"/api/v1/orders/{order_id}",
+                          headers=auth_headers(outsider, foreign.organization_id, foreign.id))
+
+    assert response.status_code == 404
+
+
+def test_open_and_credit_orders_stay_in_place(db, client, headers, momo):
+    open_id = _old_order(db, client, headers, momo)
+    credit_id = _old_order(db, client, headers, momo, status="Paid", payment_type="Credit",
+                           paid_amount=215, credit_amount=100)
+    paid_id = _old_order(db, client, headers, momo, status="Completed", payment_type="Cash", paid_amount=315)
+    recent_id = client.post("/api/v1/orders", headers=headers, json={
+        "order_type": "Takeaway", "status": "Paid", "items": [{"menu_item_id": momo, "quantity": 1}]
+    }).json()["id"]
+
+    assert _archive(db) == 1
+    assert sorted(order_id for order_id, in db.query(Order.id)) == sorted([open_id, credit_id, recent_id])
+    assert [order_id for order_id, in db.query(ArchivedOrder.id)] == [paid_id]
+
+
+@pytest.mark.parametrize("today, months, cutoff", [
+    (date(2026, 3, 31), 1, datetime(2026, 2, 28)),
+    (date(2024, 3, 31), 1, datetime(2024, 2, 29)),
+    (date(2026, 5, 31), 1, datetime(2026, 4, 30)),
+    (date(2026, 1, 15), 1, datetime(2025, 12, 15)),
+    (date(2026, 10, 18), 13, datetime(2025, 9, 18)),
+])
+def test_cutoff_clamps_to_shorter_months(today, months, cutoff):
+    assert OrderArchiveService.cutoff(months, today) == cutoff
+
+
+def test_archiving_needs_at_least_a_month(db):
+    with pytest.raises(ValueError):
+        OrderArchiveService.archive_closed_orders(db, older_than_months=0, today=TODAY)
@@ -0,0 +1,88 @@
+import pytest
+
+from app.api.v1.orders import MAX_BATCH_ORDERS
+from app.models import Category, MenuItem, Order
+from app.services.order_service import OrderService
+from app.utils.tenant_scope import reset_tenant_scope, set_tenant_scope
+from tests.factories import auth_headers, make_branch, make_user
+
+
+@pytest.fixture
+def momo(db):
+    category = Category(name="Food", type="KOT")
+    db.add(category)
+    db.flush()
+    item = MenuItem(name="Momo", price=150, category_id=category.id, kot_bot="KOT")
+    db.add(item)
+    db.commit()
+    return item.id
+
+
+@pytest.fixture
+def headers(admin, branch):
+    return auth_headers(admin, branch.organization_id, branch.id)
+
+
+def _order(momo, number=None, **fields):
+    order = {"order_type": "Takeaway", "items": [{"menu_item_id": momo, "quantity": 1}], **fields}
+    if number:
+        order["order_number"] = number
+    return order
+
+
+def test_batch_size_is_limited(db, client, headers, momo):
+    response = client.post("/api/v1/orders/batch", headers=headers,
+                           json=[_order(momo) for _ in range(MAX_BATCH_ORDERS + 1)])
+
+    assert response.status_code == 400
+    assert db.query(Order).count() == 0
+
+
+def test_retried_and_repeated_orders_are_created_once(db, client, headers, momo):
+    batch = [_order(momo, "POS1-1"), _order(momo, "POS1-1"), _order(momo), _order(momo, "POS1-2")]
+
+    first = client.post("/api/v1/orders/batch", headers=headers, json=batch)
+    retry = client.post("/api/v1/orders/batch", headers=headers, json=batch[:2] + batch[3:])
+
+    assert first.status_code == retry.status_code == 200
+    ids = [order["id"] for order in first.json()]
+    assert ids[0] == ids[1] and len(set(ids)) == 3
+    assert [order["id"] for order in retry.json()] == [ids[0], ids[1], ids[3]]
+    assert db.query(Order).count() == 3
+
+
+def test_number_taken_in_another_branch_is_a_conflict(db, client, headers, branch, momo):
+    other = make_branch(db, "Foreign", "X001")
+    outsider = make_user(db, "outsider", organization_id=other.organization_id, branch_id=other.id)
+    client.post("/api/v1/orders", headers=auth_headers(outsider, other.organization_id, other.id),
+                json=_order(momo, "POS1-7"))
+
+    response = client.post("/api/v1/orders/batch", headers=headers,
+                           json=[_order(momo, "POS1-6"), _order(momo, "POS1-7")])
+    single = client.post("/api/v1/orders", headers=headers, json=_order(momo, "POS1-7"))
+
+    assert response.status_code == single.status_code == 409
+    assert "POS1-7" in response.json()["detail"]
+    assert db.query(Order.order_number).all() == [("POS1-7",)]
+
+
+def test_concurrent_insert_of_the_same_number_is_skipped(db, admin, branch, momo):
+    token = set_tenant_scope(branch.organization_id, branch.id)
+    try:
+        created = OrderService.create_orders(db, [_order(momo, "POS1-9")], admin)
+        again = OrderService.create_orders(db, [_order(momo, "POS1-9"), _order(momo, "POS1-10")], admin)
+    finally:
+        reset_tenant_scope(token)
+
+    assert created[0] is not None
+    assert again[0] is None and again[1].order_number == "POS1-10"
+    assert db.query(Order).count() == 2
+
+
+def test_unknown_order_fields_are_rejected(db, client, headers, momo):
+    response = client.post("/api/v1/orders/batch", headers=headers,
+                           json=[_order(momo), _order(momo, notes="window seat", id=5)])
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unknown order fields: id, notes"
+    assert db.query(Order).count() == 0
@@ -0,0 +1,75 @@
+import pytest
+
+from app.models import Category, MenuItem
+from tests.factories import auth_headers
+
+
+@pytest.fixture
+def momo(db):
+    category = Category(name="Food", type="KOT")
+    db.add(category)
+    db.flush()
+    item = MenuItem(name="Momo", price=150, category_id=category.id, kot_bot="KOT")
+    db.add(item)
+    db.commit()
+    return item.id
+
+
+@pytest.fixture
+def order(client, admin, momo):
+    response = client.post("/api/v1/orders", headers=auth_headers(admin), json={
+        "order_type": "Takeaway", "items": [{"menu_item_id": momo, "quantity": 2}]
+    })
+    assert response.status_code == 200
+    return response.json()
+
+
+def _invalid_lines(momo):
+    return [
+        {"quantity": 1},
+        {"menu_item_id": momo},
+        {"menu_item_id": str(momo), "quantity": 1},
+        {"menu_item_id": momo, "quantity": "2"},
+        {"menu_item_id": momo, "quantity": 0},
+        {"menu_item_id": momo, "quantity": -1},
+        {"menu_item_id": momo, "quantity": True},
+        {"menu_item_id": momo, "quantity": 1, "id": "x"},
+        {"menu_item_id": 999999, "quantity": 1},
+        "momo",
+    ]
+
+
+def test_create_rejects_invalid_lines(client, admin, momo):
+    for line in _invalid_lines(momo):
+        response = client.post("/api/v1/orders", headers=auth_headers(admin), json={
+            "order_type": "Takeaway", "items": [line]
+        })
+        assert response.status_code == 400, line
+
+
+def test_update_rejects_invalid_lines_and_keeps_items(client, admin, momo, order):
+    headers = auth_headers(admin)
+    for line in _invalid_lines(momo):
+        response = client.put(f"/api/v1/orders/{order['id']}", headers=headers, json={"items": [line]})
+        assert response.status_code == 400, line
+    response = client.put(f"/api/v1/orders/{order['id']}", headers=headers, json={"items": {"menu_item_id": momo}})
+    assert response.status_code == 400
+
+    items = client.get(f"/api/v1/orders/{order['id']}", headers=headers).json()["items"]
+    assert [(item["menu_item_id"], item["quantity"]) for item in items] == [(momo, 2)]
+
+
+def test_single_line_endpoints_reject_invalid_lines(client, admin, momo, order):
+    headers = auth_headers(admin)
+    for line in _invalid_lines(momo)[:-1]:
+        response = client.post(f"/api/v1/orders/{order['id']}/items", headers=headers, json=line)
+        assert response.status_code == 400, line
+
+    item_id = order["items"][0]["id"]
+    for change in [{"quantity": 0}, {"quantity": "3"}, {"quantity": None}, {"notes": 5}]:
+        response = client.patch(f"/api/v1/orders/{order['id']}/items/{item_id}", headers=headers, json=change)
+        assert response.status_code == 400, change
+
+    response = client.patch(f"/api/v1/orders/{order['id']}/items/{item_id}", headers=headers, json={"quantity": 3})
+    assert response.status_code == 200
+    assert response.json()["items"][0]["quantity"] == 3
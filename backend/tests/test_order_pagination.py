@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from app.models import Order
+from tests.factories import auth_headers
+
+START = datetime(2026, 1, 1, 12, 0)
+
+
+def _seed(db, count):
+    # Pairs of orders share a timestamp so pages must break ties on id
+    db.execute(insert(Order), [
+        {"order_number": f"ORD-{n}", "order_type": "Takeaway" if n % 3 else "Table",
+         "status": "Paid", "created_at": START + timedelta(minutes=n // 2)}
+        for n in range(count)
+    ])
+    db.commit()
+
+
+def _walk(client, headers, **params):
+    pages, cursor = [], None
+    while True:
+        query = dict(params, **({"cursor": cursor} if cursor else {}))
+        response = client.get("/api/v1/orders", headers=headers, params=query)
+        assert response.status_code == 200
+        pages.append([order["id"] for order in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return pages
+
+
+def test_pages_cover_every_order_once_newest_first(db, client, admin):
+    _seed(db, 25)
+    headers = auth_headers(admin)
+
+    pages = _walk(client, headers, limit=10, include_kots=False)
+
+    assert [len(page) for page in pages] == [10, 10, 5]
+    ids = [order_id for page in pages for order_id in page]
+    everything = [order["id"] for order in client.get("/api/v1/orders", headers=headers).json()]
+    assert ids == everything
+    assert len(set(ids)) == 25
+
+
+def test_filters_apply_before_paging(db, client, admin):
+    _seed(db, 30)
+    headers = auth_headers(admin)
+
+    pages = _walk(client, headers, limit=4, order_type="Table",
+                  start_date=(START + timedelta(minutes=3)).isoformat())
+
+    ids = [order_id for page in pages for order_id in page]
+    expected = [n + 1 for n in range(30) if n % 3 == 0 and n // 2 >= 3]
+    assert sorted(ids) == expected
+
+
+def test_exact_page_has_no_next_cursor(db, client, admin):
+    _seed(db, 10)
+
+    response = client.get("/api/v1/orders", headers=auth_headers(admin), params={"limit": 10})
+
+    assert len(response.json()) == 10
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_invalid_cursor_is_rejected(db, client, admin):
+    response = client.get("/api/v1/orders", headers=auth_headers(admin), params={"limit": 5, "cursor": "nope"})
+
+    assert response.status_code == 400
@@ -0,0 +1,46 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+from app.services.partition_service import PartitionService
+
+CREATED_AT = datetime(2026, 10, 1, 12)
+
+
+def _insert_order(db, number, created_at=CREATED_AT):
+    db.execute(text(
+        "INSERT INTO orders (order_number, order_type, created_at) VALUES (:number, 'Takeaway', :created_at)"
+    ), {"number": number, "created_at": created_at})
+
+
+@pytest.fixture
+def partitioned_orders(db):
+    """orders converted in the test's transaction, rolled back afterwards"""
+    _insert_order(db, "ORD-1")
+    PartitionService.convert_table(db, "orders", months_ahead=0)
+    yield
+    db.rollback()
+
+
+def test_order_numbers_stay_unique_with_their_created_at(db, partitioned_orders):
+    definition = db.execute(text(
+        "SELECT indexdef FROM pg_indexes WHERE tablename = 'orders' AND indexname = 'orders_order_number_key'"
+    )).scalar()
+    assert definition.startswith("CREATE UNIQUE INDEX")
+    assert definition.endswith("(order_number, created_at)")
+
+    # A retried batch order carries its original created_at
+    with pytest.raises(IntegrityError), db.begin_nested():
+        _insert_order(db, "ORD-1")
+    _insert_order(db, "ORD-2")
+
+
+def test_partition_key_is_appended_once():
+    assert PartitionService._with_partition_key(
+        "CREATE UNIQUE INDEX k ON public.kots USING btree (kot_number)"
+    ) == "CREATE UNIQUE INDEX k ON public.kots USING btree (kot_number, created_at)"
+    assert PartitionService._with_partition_key(
+        "CREATE UNIQUE INDEX k ON public.kots USING btree (kot_number, created_at)"
+    ) == "CREATE UNIQUE INDEX k ON public.kots USING btree (kot_number, created_at)"
@@ -0,0 +1,83 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import exc
+
+from app.utils.pool_metrics import MeteredNullPool, MeteredQueuePool
+from tests.factories import auth_headers, make_user
+
+
+def _connect():
+    return sqlite3.connect(":memory:", check_same_thread=False)
+
+
+def test_checkouts_and_checkins_are_counted():
+    pool = MeteredQueuePool(_connect, pool_size=2, max_overflow=1, timeout=1)
+
+    first, second, third = pool.connect(), pool.connect(), pool.connect()
+    metrics = pool.get_metrics()
+    assert metrics["checkouts"] == 3
+    assert metrics["in_use"] == 3
+    assert metrics["checked_out"] == 3
+    assert metrics["overflow"] == 1
+
+    for connection in (first, second, third):
+        connection.close()
+    pool.connect().close()
+
+    metrics = pool.get_metrics()
+    assert metrics["checkouts"] == 4
+    assert metrics["in_use"] == 0
+    assert metrics["in_use_peak"] == 3
+    assert metrics["checked_in"] == 2
+    assert metrics["checkout_timeouts"] == 0
+    pool.dispose()
+
+
+def test_exhausted_pool_counts_the_timeout_and_wait():
+    pool = MeteredQueuePool(_connect, pool_size=1, max_overflow=0, timeout=0.05)
+    held = pool.connect()
+
+    with pytest.raises(exc.TimeoutError):
+        pool.connect()
+
+    metrics = pool.get_metrics()
+    assert metrics["checkout_timeouts"] == 1
+    assert metrics["checkout_wait_max_ms"] >= 50
+    assert metrics["in_use"] == 1
+    held.close()
+    pool.dispose()
+
+
+def test_recreated_pool_keeps_the_counters():
+    pool = MeteredQueuePool(_connect, pool_size=1, max_overflow=0, timeout=1)
+    pool.connect().close()
+
+    new_pool = pool.recreate()
+    new_pool.connect().close()
+
+    assert new_pool.metrics is pool.metrics
+    assert new_pool.get_metrics()["checkouts"] == 2
+    new_pool.dispose()
+
+
+def test_null_pool_reports_only_the_counters():
+    pool = MeteredNullPool(_connect)
+    pool.connect().close()
+
+    metrics = pool.get_metrics()
+    assert metrics["pool"] == "MeteredNullPool"
+    assert metrics["checkouts"] == 1
+    assert metrics["in_use"] == 0
+    assert "size" not in metrics
+
+
+def test_health_endpoints_require_an_admin(client, branch, admin, db):
+    worker = make_user(db, "cashier", role="worker", organization_id=branch.organization_id, branch_id=branch.id)
+
+    for path in ("/health/db-pool", "/health/cache"):
+        assert client.get(path).status_code == 401
+        assert client.get(path, headers=auth_headers(worker)).status_code == 403
+        assert client.get(path, headers=auth_headers(admin)).status_code == 200
+
+    assert client.get("/health/db-pool", headers=auth_headers(admin)).json()["sync"]["checkouts"] > 0
@@ -0,0 +1,100 @@
+import pytest
+
+from app.config import settings
+from app.models import Category, DiscountRule, MenuItem
+from app.services.menu_service import MenuService
+from app.services.pricing_service import PricingService
+from app.utils.price_cache import price_cache
+from app.utils.settings_cache import bump_settings_version
+from tests.factories import auth_headers
+
+
+@pytest.fixture
+def momo(db):
+    category = Category(name="Food", type="KOT")
+    db.add(category)
+    db.flush()
+    item = MenuItem(name="Momo", price=150, category_id=category.id, kot_bot="KOT")
+    db.add(item)
+    db.commit()
+    return item.id
+
+
+def _rule(db, **columns):
+    rule = DiscountRule(name="Rule", discount_type="Percentage", discount_value=10, **columns)
+    db.add(rule)
+    bump_settings_version(db)
+    db.commit()
+    return rule.id
+
+
+def _with_service_charge(amount):
+    return round(amount * (1 + settings.SERVICE_CHARGE_PERCENT / 100), 2)
+
+
+def test_order_totals_are_computed_on_the_server(db, client, admin, branch, momo):
+    rule_id = _rule(db, applicable_on="Dine-In", max_discount_amount=25)
+
+    response = client.post("/api/v1/orders", headers=auth_headers(admin, branch.organization_id, branch.id), json={
+        "order_type": "Dine-in", "discount_rule_id": rule_id, "gross_amount": 1, "net_amount": 1,
+        "items": [{"menu_item_id": momo, "quantity": 2, "price": 1}]
+    })
+
+    assert response.status_code == 200
+    order = response.json()
+    assert [item["price"] for item in order["items"]] == [150]
+    # 10% of 300 capped at 25
+    assert (order["gross_amount"], order["discount"]) == (300, 25)
+    assert order["net_amount"] == _with_service_charge(275)
+
+
+@pytest.mark.parametrize("applicable_on, order_type, applies", [
+    ("Dine-In", "Table", True),
+    ("Dine-In", "Dine-in", True),
+    ("Dine-In", "Dine-In", True),
+    ("Dine-in", "dine in", True),
+    ("Dine-In", "Takeaway", False),
+    ("Takeaway", "Pay First", True),
+    ("Delivery", "Delivery", True),
+    ("Delivery", "Delivery Partner", True),
+    ("Delivery", "Table", False),
+    ("All", "Anything", True),
+])
+def test_rule_scope_matches_order_type_spellings(applicable_on, order_type, applies):
+    rule = {"applicable_on": applicable_on, "min_order_amount": 0, "discount_type": "Fixed Amount",
+            "discount_value": 20, "max_discount_amount": None}
+
+    assert PricingService.rule_discount(rule, order_type, 100) == (20 if applies else 0)
+
+
+def test_menu_writes_from_another_worker_are_seen(db, momo):
+    assert PricingService.price_lines(db, [{"menu_item_id": momo, "quantity": 1}])[0]["price"] == 150
+    # Another worker changes the price; this worker's snapshot isn't dropped
+    db.get(MenuItem, momo).price = 175
+    MenuService.bump_catalog_version(db)
+    db.commit()
+
+    assert PricingService.price_lines(db, [{"menu_item_id": momo, "quantity": 1}])[0]["price"] == 175
+
+
+def test_discount_rule_writes_from_another_worker_are_seen(db):
+    rule_id = _rule(db, applicable_on="All")
+    assert PricingService.compute_totals(db, "Takeaway", 200, rule_id)["discount"] == 20
+
+    db.get(DiscountRule, rule_id).discount_value = 50
+    bump_settings_version(db)
+    db.commit()
+
+    assert PricingService.compute_totals(db, "Takeaway", 200, rule_id)["discount"] == 100
+
+
+def test_unknown_menu_item_does_not_reload_prices(db, momo, statements):
+    PricingService.price_lines(db, [{"menu_item_id": momo, "quantity": 1}])
+    snapshot = price_cache.get(db)
+    statements.clear()
+
+    with pytest.raises(ValueError, match="not found"):
+        PricingService.price_lines(db, [{"menu_item_id": momo + 1000, "quantity": 1}])
+
+    assert price_cache.get(db) is snapshot
+    assert not [statement for statement in statements if "FROM menu_items" in statement]
@@ -0,0 +1,91 @@
+import time
+
+from app.models import User, UserBranchAssignment
+from app.utils.principal_cache import PrincipalCache
+from tests.factories import auth_headers, make_branch, make_user
+
+
+def _user_queries(statements):
+    return [s for s in statements if "FROM users" in s]
+
+
+def test_cached_token_skips_the_users_query(client, branch, db, statements):
+    headers = auth_headers(make_user(db, "cashier", role="worker", organization_id=branch.organization_id,
+                                     branch_id=branch.id))
+    statements.clear()
+
+    assert client.get("/users/me", headers=headers).status_code == 200
+    assert len(_user_queries(statements)) == 1
+    statements.clear()
+
+    response = client.get("/users/me", headers=headers)
+
+    assert response.json()["username"] == "cashier"
+    assert _user_queries(statements) == []
+
+
+def test_user_update_reaches_existing_tokens(client, branch, admin, db):
+    worker = make_user(db, "cashier", role="worker", organization_id=branch.organization_id, branch_id=branch.id)
+    headers = auth_headers(worker)
+    assert client.get("/users/me", headers=headers).json()["full_name"] == "Cashier"
+
+    response = client.put(f"/api/v1/users/{worker.id}", json={"full_name": "Head Cashier", "disabled": True},
+                          headers=auth_headers(admin))
+    assert response.status_code == 200
+
+    me = client.get("/users/me", headers=headers).json()
+    assert me["full_name"] == "Head Cashier"
+    assert me["disabled"] is True
+
+
+def test_deleted_user_token_is_rejected(client, branch, admin, db):
+    worker = make_user(db, "cashier", role="worker", organization_id=branch.organization_id, branch_id=branch.id)
+    headers = auth_headers(worker)
+    assert client.get("/users/me", headers=headers).status_code == 200
+
+    assert client.delete(f"/api/v1/users/{worker.id}", headers=auth_headers(admin)).status_code == 200
+
+    assert client.get("/users/me", headers=headers).status_code == 401
+
+
+def test_branch_selection_reaches_existing_tokens(client, branch, db):
+    second = make_branch(db, "Annex", "B002", organization_id=branch.organization_id)
+    worker = make_user(db, "cashier", role="worker", organization_id=branch.organization_id, branch_id=branch.id)
+    db.add(UserBranchAssignment(user_id=worker.id, branch_id=second.id, organization_id=branch.organization_id))
+    db.commit()
+    headers = auth_headers(worker)
+    assert client.get("/users/me", headers=headers).json()["current_branch_id"] == branch.id
+
+    response = client.post("/select-branch", json={"branch_id": second.id}, headers=headers)
+    assert response.status_code == 200
+
+    assert client.get("/users/me", headers=headers).json()["current_branch_id"] == second.id
+
+
+def _user(user_id):
+    return User(id=user_id, username=f"user-{user_id}", hashed_password="x", role="worker")
+
+
+def test_least_recently_used_token_is_evicted(db):
+    cache = PrincipalCache(max_size=2, ttl_seconds=60)
+    cache.put("a", _user(1))
+    cache.put("b", _user(2))
+    assert cache.get("a", db).username == "user-1"
+
+    cache.put("c", _user(3))
+
+    assert list(cache._entries) == ["a", "c"]
+    assert 2 not in cache._jtis_by_user
+
+
+def test_entries_never_outlive_the_token(db):
+    cache = PrincipalCache(max_size=10, ttl_seconds=60)
+    cache.put("expiring", _user(1), token_expires_at=time.time() - 1)
+    cache.put("fresh", _user(1), token_expires_at=time.time() + 3600)
+
+    assert cache.get("expiring", db) is None
+    assert cache._entries["fresh"][0] <= time.time() + 60
+    assert cache._jtis_by_user == {1: {"fresh"}}
+
+    cache.invalidate_user(1)
+    assert cache.get("fresh", db) is None
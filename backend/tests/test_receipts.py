@@ -0,0 +1,106 @@
+import pytest
+
+from app.models import Category, MenuItem
+from app.utils.receipt_cache import receipt_templates
+from app.utils.receipt_renderer import ESC_FEED_AND_CUT, ESC_INIT, ReceiptTemplate
+from tests.factories import auth_headers
+
+INVOICE = {
+    "order_number": "ORD-20261018-00001",
+    "date": "2026-10-18 12:30",
+    "order_type": "Table",
+    "table": "T1",
+    "customer": None,
+    "items": [
+        {"name": "Chicken Momo (Steamed, Large Plate)", "quantity": 2, "price": 150, "subtotal": 300,
+         "notes": "extra achar"},
+        {"name": "Masala Tea", "quantity": 1, "price": 40, "subtotal": 40, "notes": ""},
+    ],
+    "gross_amount": 340,
+    "discount": 40,
+    "service_charge": 15,
+    "net_amount": 315,
+    "paid_amount": 315,
+    "credit_amount": 0,
+    "payment_type": "Cash",
+}
+
+HEADER = {
+    "company_name": "Momo House", "branch_name": "Kirtipur", "address": "Naya Bazar", "phone": "01-4330000",
+    "vat_pan_no": "123456789", "show_vat": True, "invoice_prefix": "INV", "footer_text": "Dhanyabad!\nVisit again",
+    "currency": "NPR",
+}
+
+
+@pytest.mark.parametrize("width", [32, 48])
+def test_text_receipt_layout(width):
+    text = ReceiptTemplate(HEADER).render_text(INVOICE, width)
+    lines = text.splitlines()
+
+    assert text.endswith("\n")
+    assert all(len(line) <= width for line in lines)
+    assert lines[0].strip() == "Momo House"
+    assert "VAT/PAN: 123456789" in [line.strip() for line in lines]
+    assert "Bill No: INV-ORD-20261018-00001" in lines
+    assert "  extra achar" in lines
+    assert f"{'Discount':<{width - 6}}-40.00" in lines
+    assert f"{'TOTAL (NPR)':<{width - 6}}315.00" in lines
+    assert [line.strip() for line in lines[-2:]] == ["Dhanyabad!", "Visit again"]
+
+
+def test_vat_line_follows_the_setting():
+    text = ReceiptTemplate({**HEADER, "show_vat": False}).render_text(INVOICE)
+
+    assert "VAT/PAN" not in text
+
+
+def test_escpos_receipt_wraps_the_text_in_printer_commands():
+    template = ReceiptTemplate({**HEADER, "company_name": "Momo Café"})
+    data = template.render_escpos(INVOICE, width=32)
+
+    assert data.startswith(ESC_INIT)
+    assert data.endswith(ESC_FEED_AND_CUT)
+    assert "Momo Café".encode("cp437") in data
+    assert b"Bill No: INV-ORD-20261018-00001\n" in data
+    assert "TOTAL (NPR)".encode() in data
+    # Characters the code page lacks are replaced rather than failing
+    assert b"?" in ReceiptTemplate({**HEADER, "company_name": "मोमो"}).render_escpos(INVOICE)
+
+
+@pytest.fixture
+def order_id(db, client, admin, branch):
+    category = Category(name="Food", type="KOT")
+    db.add(category)
+    db.flush()
+    momo = MenuItem(name="Momo", price=150, category_id=category.id, kot_bot="KOT")
+    db.add(momo)
+    db.commit()
+    response = client.post("/api/v1/orders", headers=auth_headers(admin, branch.organization_id, branch.id), json={
+        "order_type": "Takeaway", "items": [{"menu_item_id": momo.id, "quantity": 2}]
+    })
+    return response.json()["id"]
+
+
+def _receipt(client, headers, order_id, format="text"):
+    response = client.get(f"/api/v1/reports/orders/{order_id}/invoice", headers=headers,
+                          params={"format": format, "width": 32})
+    assert response.status_code == 200
+    return response
+
+
+def test_receipts_follow_settings_and_branch_changes(db, client, admin, branch, order_id):
+    headers = auth_headers(admin, branch.organization_id, branch.id)
+    company = {"company_name": "Momo House", "phone": "01-4330000", "invoice_prefix": "MH"}
+    assert client.put("/api/v1/settings/company", headers=headers, json=company).status_code == 200
+
+    text = _receipt(client, headers, order_id).text
+    assert text.splitlines()[0].strip() == "Momo House"
+    assert "Bill No: MH-" in text
+    assert _receipt(client, headers, order_id, "escpos").content.startswith(ESC_INIT)
+    assert receipt_templates.get(db, branch.id) is receipt_templates.get(db, branch.id)
+
+    client.put("/api/v1/settings/company", headers=headers, json={**company, "company_name": "Momo Palace"})
+    assert _receipt(client, headers, order_id).text.splitlines()[0].strip() == "Momo Palace"
+
+    client.put(f"/api/v1/branches/{branch.id}", headers=headers, json={"phone": "01-5550000"})
+    assert "Phone: 01-5550000" in _receipt(client, headers, order_id).text
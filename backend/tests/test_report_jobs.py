@@ -0,0 +1,73 @@
+import pytest
+
+from app.api.v1 import reports
+from app.services.report_job_service import ReportJobQueue
+from tests.factories import auth_headers, make_branch, make_user
+
+
+@pytest.fixture
+def jobs(tmp_path, monkeypatch):
+    queue = ReportJobQueue(str(tmp_path), ttl_seconds=60, max_workers=1)
+    monkeypatch.setattr(reports, "report_jobs", queue)
+    yield queue
+    queue.shutdown()
+
+
+def _render(client, headers):
+    """Render the sales summary in the request, leaving a finished job behind"""
+    response = client.get("/api/v1/reports/export/pdf/sales-summary", headers=headers)
+    assert response.status_code == 200
+    assert response.content.startswith(b"%PDF")
+    response = client.post("/api/v1/reports/jobs", headers=headers,
+                           json={"report_type": "sales-summary", "format": "pdf"})
+    assert response.status_code == 202
+    return response.json()
+
+
+def test_submit_poll_and_download(db, client, admin, branch, jobs):
+    headers = auth_headers(admin, branch.organization_id, branch.id)
+
+    job = _render(client, headers)
+    polled = client.get(f"/api/v1/reports/jobs/{job['job_id']}", headers=headers).json()
+    download = client.get(polled["download_url"], headers=headers)
+
+    assert job["status"] == polled["status"] == "done"
+    assert download.status_code == 200
+    assert download.headers["content-type"] == "application/pdf"
+    assert download.content.startswith(b"%PDF")
+
+
+def test_unknown_report_is_rejected(client, admin, branch, jobs):
+    response = client.post("/api/v1/reports/jobs", headers=auth_headers(admin, branch.organization_id, branch.id),
+                           json={"report_type": "payroll", "format": "pdf"})
+
+    assert response.status_code == 400
+
+
+def test_jobs_are_private_to_their_user_and_tenant(db, client, admin, branch, jobs):
+    job_id = _render(client, auth_headers(admin, branch.organization_id, branch.id))["job_id"]
+    colleague = make_user(db, "cashier", organization_id=branch.organization_id, branch_id=branch.id)
+    foreign = make_branch(db, "Foreign", "X001")
+    outsider = make_user(db, "outsider", organization_id=foreign.organization_id, branch_id=foreign.id)
+    callers = [
+        auth_headers(colleague, branch.organization_id, branch.id),
+        auth_headers(outsider, foreign.organization_id, foreign.id),
+        # The same user under another tenant scope
+        auth_headers(admin, foreign.organization_id, foreign.id),
+    ]
+
+    for headers in callers:
+        assert client.get(f"/api/v1/reports/jobs/{job_id}", headers=headers).status_code == 404
+        assert client.get(f"/api/v1/reports/jobs/{job_id}/download", headers=headers).status_code == 404
+
+
+def test_files_from_another_worker_keep_their_owner(db, client, admin, branch, jobs, tmp_path, monkeypatch):
+    headers = auth_headers(admin, branch.organization_id, branch.id)
+    job_id = _render(client, headers)["job_id"]
+    other_worker = ReportJobQueue(str(tmp_path), ttl_seconds=60, max_workers=1)
+    monkeypatch.setattr(reports, "report_jobs", other_worker)
+    outsider = make_user(db, "outsider", organization_id=branch.organization_id, branch_id=branch.id)
+
+    assert client.get(f"/api/v1/reports/jobs/{job_id}/download", headers=headers).status_code == 200
+    outsider_headers = auth_headers(outsider, branch.organization_id, branch.id)
+    assert client.get(f"/api/v1/reports/jobs/{job_id}/download", headers=outsider_headers).status_code == 404
@@ -0,0 +1,129 @@
+from datetime import datetime
+
+import pytest
+
+from app.models import Category, MenuItem, SalesHourlyRollup, MenuItemHourlyRollup
+from app.services.rollup_service import SALES_AMOUNT_FIELDS, SalesRollupService
+from tests.factories import auth_headers, make_branch
+
+
+def _rollups(db):
+    """Non-empty rollup rows as comparable tuples"""
+    db.expire_all()
+    sales = {
+        (row.branch_id, row.hour, row.order_type, row.payment_type, row.status):
+            (row.order_count, *(round(getattr(row, field), 2) for field in SALES_AMOUNT_FIELDS))
+        for row in db.query(SalesHourlyRollup)
+        if row.order_count
+    }
+    items = {
+        (row.branch_id, row.hour, row.menu_item_id, row.status): (row.quantity, round(row.gross_amount, 2))
+        for row in db.query(MenuItemHourlyRollup)
+        if row.quantity
+    }
+    db.rollback()
+    return sales, items
+
+
+def assert_rollups_match_orders(db):
+    incremental = _rollups(db)
+    SalesRollupService.rebuild(db)
+    assert incremental == _rollups(db)
+
+
+@pytest.fixture
+def menu(db):
+    category = Category(name="Food", type="KOT")
+    db.add(category)
+    db.flush()
+    items = [MenuItem(name=name, price=price, category_id=category.id, kot_bot="KOT")
+             for name, price in [("Momo", 150), ("Tea", 40)]]
+    db.add_all(items)
+    db.commit()
+    return items
+
+
+@pytest.fixture
+def paid_order(client, admin, menu):
+    headers = auth_headers(admin)
+    momo, tea = menu
+    order = client.post("/api/v1/orders", headers=headers, json={
+        "order_type": "Takeaway",
+        "items": [{"menu_item_id": momo.id, "quantity": 2}, {"menu_item_id": tea.id, "quantity": 1}]
+    }).json()
+    response = client.put(f"/api/v1/orders/{order['id']}", headers=headers, json={
+        "status": "Paid", "payment_type": "Cash", "paid_amount": order["net_amount"]
+    })
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_status_change_is_rolled_up(db, paid_order):
+    sales, items = _rollups(db)
+    assert sum(counts[0] for counts in sales.values()) == 1
+    assert sorted(quantity for quantity, _ in items.values()) == [1, 2]
+    assert_rollups_match_orders(db)
+
+
+def test_editing_amounts_of_paid_order_updates_rollups(db, client, admin, paid_order):
+    headers = auth_headers(admin)
+    response = client.put(f"/api/v1/orders/{paid_order['id']}", headers=headers, json={
+        "paid_amount": 100, "credit_amount": paid_order["net_amount"] - 100, "payment_type": "Fonepay"
+    })
+    assert response.status_code == 200
+
+    assert_rollups_match_orders(db)
+
+
+def test_editing_items_of_paid_order_updates_rollups(db, client, admin, menu, paid_order):
+    headers = auth_headers(admin)
+    momo, tea = menu
+    url = f"/api/v1/orders/{paid_order['id']}"
+    tea_line = next(item for item in paid_order["items"] if item["menu_item_id"] == tea.id)
+
+    assert client.put(url, headers=headers, json={
+        "items": [
+            {"menu_item_id": momo.id, "quantity": 3},
+            {"id": tea_line["id"], "menu_item_id": tea.id, "quantity": 1}
+        ]
+    }).status_code == 200
+    assert_rollups_match_orders(db)
+
+    assert client.post(f"{url}/items", headers=headers,
+                       json={"menu_item_id": tea.id, "quantity": 2}).status_code == 200
+    assert client.patch(f"{url}/items/{tea_line['id']}", headers=headers, json={"quantity": 4}).status_code == 200
+    assert client.delete(f"{url}/items/{tea_line['id']}", headers=headers).status_code == 200
+    assert_rollups_match_orders(db)
+
+
+def test_order_type_change_moves_rollup_key(db, client, admin, paid_order):
+    headers = auth_headers(admin)
+    assert client.put(f"/api/v1/orders/{paid_order['id']}", headers=headers,
+                      json={"order_type": "Pay First"}).status_code == 200
+
+    sales, _ = _rollups(db)
+    assert [key[2] for key in sales] == ["Pay First"]
+    assert_rollups_match_orders(db)
+
+
+def test_rebuild_is_limited_to_the_token_branches(db, client, admin, branch, menu):
+    headers = auth_headers(admin, branch.organization_id, branch.id)
+    order = client.post("/api/v1/orders", headers=headers, json={
+        "order_type": "Takeaway", "items": [{"menu_item_id": menu[0].id, "quantity": 1}]
+    }).json()
+    client.put(f"/api/v1/orders/{order['id']}", headers=headers, json={"status": "Paid", "payment_type": "Cash"})
+    foreign = make_branch(db, "Foreign", "X001")
+    stale = dict(hour=datetime(2026, 1, 1, 9), order_type="Takeaway", payment_type="Cash", status="Paid",
+                 order_count=5, gross_amount=500, net_amount=500, discount=0, paid_amount=500, credit_amount=0)
+    db.add_all([SalesHourlyRollup(branch_id=branch.id, **stale), SalesHourlyRollup(branch_id=foreign.id, **stale)])
+    db.commit()
+
+    assert client.post("/api/v1/reports/rollups/rebuild", headers=auth_headers(admin)).status_code == 403
+    response = client.post("/api/v1/reports/rollups/rebuild", headers=headers)
+
+    assert response.status_code == 200
+    assert response.json()["sales_rows"] == 1
+    sales, _ = _rollups(db)
+    # The main branch is recomputed from its orders; the other tenant's rows are untouched
+    assert [key[0] for key in sales if key[1] == stale["hour"]] == [foreign.id]
+    assert [key[0] for key in sales if key[1] != stale["hour"]] == [branch.id]
@@ -0,0 +1,80 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app.models import Order, POSSession
+from tests.factories import auth_headers, make_user
+
+URL = "/api/v1/reports/sessions"
+
+
+def _day(day):
+    return datetime(2026, 10, day, 9, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def sessions(db, admin, branch):
+    """Three shifts, newest last: admin's with mixed orders, a cashier's, and an empty one"""
+    cashier = make_user(db, "cashier", role="worker", organization_id=branch.organization_id, branch_id=branch.id)
+    shifts = [
+        POSSession(user_id=admin.id, start_time=_day(1), status="Closed", total_sales=150, total_orders=2),
+        POSSession(user_id=cashier.id, start_time=_day(2), status="Closed", total_sales=200, total_orders=1),
+        POSSession(user_id=admin.id, start_time=_day(3), status="Active"),
+    ]
+    db.add_all(shifts)
+    db.flush()
+    orders = [
+        (shifts[0], "Paid", 100, 100, 0),
+        (shifts[0], "Completed", 50, 30, 20),
+        (shifts[0], "Pending", 999, 0, 0),
+        (shifts[0], "Cancelled", 80, 0, 0),
+        (shifts[1], "Paid", 200, 200, 0),
+    ]
+    db.add_all([
+        Order(order_number=f"ORD-{n}", order_type="Takeaway", status=status, net_amount=net, paid_amount=paid,
+              credit_amount=credit, pos_session_id=shift.id, branch_id=branch.id)
+        for n, (shift, status, net, paid, credit) in enumerate(orders)
+    ])
+    db.commit()
+    return [shift.id for shift in shifts], cashier.id
+
+
+def test_totals_come_from_settled_orders(client, admin, branch, sessions):
+    (first, second, third), _ = sessions
+
+    rows = client.get(URL, headers=auth_headers(admin, branch.organization_id, branch.id)).json()
+
+    assert [row["id"] for row in rows] == [third, second, first]
+    totals = {row["id"]: (row["actual_orders"], row["actual_sales"], row["paid_amount"], row["credit_amount"])
+              for row in rows}
+    assert totals == {first: (2, 150, 130, 20), second: (1, 200, 200, 0), third: (0, 0, 0, 0)}
+    assert [row["user_name"] for row in rows] == ["Admin", "Cashier", "Admin"]
+    assert rows[0]["end_time"] is None and rows[0]["start_time"].startswith("2026-10-03")
+
+
+def test_user_and_date_filters(client, admin, branch, sessions):
+    (first, second, third), cashier_id = sessions
+    headers = auth_headers(admin, branch.organization_id, branch.id)
+
+    def ids(**params):
+        return [row["id"] for row in client.get(URL, headers=headers, params=params).json()]
+
+    assert ids(user_id=cashier_id) == [second]
+    assert ids(user_id=admin.id) == [third, first]
+    assert ids(start_date="2026-10-02T00:00:00+00:00") == [third, second]
+    # The end of the range is exclusive
+    assert ids(start_date="2026-10-01T00:00:00+00:00", end_date="2026-10-03T09:00:00+00:00") == [second, first]
+    assert ids(user_id=admin.id, end_date="2026-10-02T00:00:00+00:00") == [first]
+
+
+def test_pages_follow_the_cursor(client, admin, branch, sessions):
+    (first, second, third), _ = sessions
+    headers = auth_headers(admin, branch.organization_id, branch.id)
+
+    page = client.get(URL, headers=headers, params={"limit": 2})
+    rest = client.get(URL, headers=headers, params={"limit": 2, "cursor": page.headers["X-Next-Cursor"]})
+
+    assert [row["id"] for row in page.json()] == [third, second]
+    assert [row["id"] for row in rest.json()] == [first]
+    assert "X-Next-Cursor" not in rest.headers
+    assert client.get(URL, headers=headers, params={"cursor": "garbage"}).status_code == 400
@@ -0,0 +1,105 @@
+import logging
+import time
+
+import pytest
+
+from app import database
+from app.config import settings
+from app.models import CompanySettings
+from app.utils import settings_cache
+from app.utils.settings_cache import SettingsCache, bump_settings_version
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    monkeypatch.setattr(settings_cache, "LISTENER_RETRY_SECONDS", 0.2)
+    cache = SettingsCache(ttl_seconds=60)
+    yield cache
+    cache.stop_listener()
+
+
+def _rename(name):
+    """Change the company name and bump the settings version, as the settings API does"""
+    session = database.SessionLocal()
+    try:
+        company = session.query(CompanySettings).first()
+        if company is None:
+            session.add(CompanySettings(company_name=name))
+        else:
+            company.company_name = name
+        bump_settings_version(session)
+        session.commit()
+    finally:
+        session.close()
+
+
+def _wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.02)
+
+
+def test_notify_from_another_worker_drops_the_snapshot(db, cache):
+    _rename("Momo House")
+    dropped = []
+    cache.on_change(lambda: dropped.append(True))
+    cache.start_listener()
+    _wait_for(lambda: cache._listening)
+    dropped.clear()
+    assert cache.get(db).company["company_name"] == "Momo House"
+    db.rollback()
+
+    _rename("Momo Palace")
+    _wait_for(lambda: dropped)
+
+    assert cache.get(db).company["company_name"] == "Momo Palace"
+
+
+def test_snapshot_loaded_across_a_change_is_not_kept(db, cache, monkeypatch):
+    _rename("Momo House")
+    load = SettingsCache._load
+
+    def load_racing_with_a_change(session):
+        snapshot = load(session)
+        cache.invalidate()  # a notification arrives while the old rows are loaded
+        return snapshot
+
+    monkeypatch.setattr(cache, "_load", load_racing_with_a_change)
+    assert cache.get(db).company["company_name"] == "Momo House"
+    assert cache._snapshot is None
+
+    monkeypatch.setattr(cache, "_load", load)
+    cache.get(db)
+    assert cache._snapshot is not None
+
+
+def test_without_a_listener_the_snapshot_expires(db, monkeypatch):
+    monkeypatch.setattr(settings, "DB_TRANSACTION_POOLING", True)
+    cache = SettingsCache(ttl_seconds=0.3)
+    cache.start_listener()
+    _rename("Momo House")
+
+    assert cache._thread is None
+    assert cache.get(db).company["company_name"] == "Momo House"
+    db.rollback()
+    _rename("Momo Palace")
+    # Not notified: served from the snapshot until it expires
+    assert cache.get(db).company["company_name"] == "Momo House"
+    time.sleep(0.35)
+    assert cache.get(db).company["company_name"] == "Momo Palace"
+
+
+def test_listener_failures_are_logged(cache, monkeypatch, caplog):
+    def fail():
+        cache._stop.set()
+        raise OSError("connection refused")
+
+    monkeypatch.setattr(cache, "_listen", fail)
+    with caplog.at_level(logging.WARNING, logger="app.utils.settings_cache"):
+        cache._listen_forever()
+
+    [record] = caplog.records
+    assert record.levelno == logging.WARNING
+    assert "connection refused" in record.getMessage()
+    assert record.exc_info[1].args == ("connection refused",)
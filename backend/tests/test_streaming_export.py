@@ -0,0 +1,91 @@
+import asyncio
+import csv
+import io
+from datetime import datetime
+
+import openpyxl
+import pytest
+
+from app.api.v1 import reports
+from app.models import Order
+from app.utils import streaming_export
+from app.utils.streaming_export import stream_csv, stream_xlsx
+from tests.factories import auth_headers
+
+HEADER = ["Order Number", "Date", "Net"]
+
+
+async def _batches(rows, size):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def _collect(chunks):
+    async def collect():
+        return [chunk async for chunk in chunks]
+    return asyncio.run(collect())
+
+
+def _rows(count):
+    return [(f"ORD-{n}", datetime(2026, 10, 1, 12, n % 60), n * 1.5) for n in range(count)]
+
+
+def test_csv_is_streamed_in_chunks(monkeypatch):
+    monkeypatch.setattr(streaming_export, "CHUNK_SIZE", 256)
+    rows = _rows(100)
+
+    chunks = _collect(stream_csv(HEADER, _batches(rows, 7)))
+
+    assert len(chunks) > 2
+    body = b"".join(chunks).decode("utf-8")
+    assert body.startswith("\ufeff")
+    parsed = list(csv.reader(io.StringIO(body[1:])))
+    assert parsed[0] == HEADER
+    assert parsed[1:] == [[number, str(date), str(net)] for number, date, net in rows]
+
+
+def test_csv_of_no_rows_is_just_the_header():
+    body = b"".join(_collect(stream_csv(HEADER, _batches([], 10))))
+
+    assert body.decode("utf-8") == "\ufeffOrder Number,Date,Net\r\n"
+
+
+def test_xlsx_holds_every_row(monkeypatch):
+    monkeypatch.setattr(streaming_export, "CHUNK_SIZE", 1024)
+    rows = _rows(500)
+
+    chunks = _collect(stream_xlsx(HEADER, _batches(rows, 64), title="Order History"))
+
+    assert len(chunks) > 1
+    workbook = openpyxl.load_workbook(io.BytesIO(b"".join(chunks)), read_only=True)
+    sheet = workbook["Order History"]
+    values = list(sheet.iter_rows(values_only=True))
+    assert values[0] == tuple(HEADER)
+    assert values[1:] == rows
+
+
+@pytest.fixture
+def orders(db, branch):
+    db.add_all([
+        Order(order_number=f"ORD-{n}", order_type="Takeaway", status="Paid" if n % 2 else "Pending",
+              net_amount=100 + n, branch_id=branch.id, created_at=datetime(2026, 10, 1, 9, n))
+        for n in range(7)
+    ])
+    db.commit()
+
+
+def test_order_history_export_streams_every_matching_row(client, admin, branch, orders, monkeypatch):
+    monkeypatch.setattr(reports, "EXPORT_BATCH_SIZE", 2)
+    headers = auth_headers(admin, branch.organization_id, branch.id)
+
+    response = client.get("/api/v1/reports/export/csv/orders", headers=headers, params={"status": "Paid"})
+
+    assert response.status_code == 200
+    assert response.headers["content-disposition"] == "attachment; filename=orders.csv"
+    parsed = list(csv.reader(io.StringIO(response.content.decode("utf-8-sig"))))
+    assert parsed[0][0] == "Order Number"
+    assert [row[0] for row in parsed[1:]] == ["ORD-1", "ORD-3", "ORD-5"]
+
+    excel = client.get("/api/v1/reports/export/excel/orders", headers=headers)
+    sheet = openpyxl.load_workbook(io.BytesIO(excel.content), read_only=True)["Order History"]
+    assert [row[0] for row in sheet.iter_rows(min_row=2, values_only=True)] == [f"ORD-{n}" for n in range(7)]
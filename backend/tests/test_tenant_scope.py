@@ -0,0 +1,146 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from app.dependencies import get_scope_branch_ids_detached
+from app.models import Category, KOT, MenuItem, Order, Table, SalesHourlyRollup
+from app.models.tenancy import BranchRequiredError
+from app.services.kot_event_service import event_matches
+from app.services.rollup_service import SalesRollupService
+from app.utils.tenant_scope import reset_tenant_scope, set_tenant_scope
+from tests.factories import auth_headers, make_branch
+
+HOUR = datetime(2026, 10, 1, 12)
+
+
+@pytest.fixture
+def branches(db, branch):
+    """Main, a second branch of its organization and a branch of another organization"""
+    second = make_branch(db, "Second", "B002", organization_id=branch.organization_id)
+    foreign = make_branch(db, "Foreign", "X001")
+    return branch.id, second.id, foreign.id
+
+
+@pytest.fixture
+def momo(db):
+    category = Category(name="Food", type="KOT")
+    db.add(category)
+    db.flush()
+    item = MenuItem(name="Momo", price=150, category_id=category.id, kot_bot="KOT")
+    db.add(item)
+    db.commit()
+    return item.id
+
+
+def test_created_order_takes_the_token_branch(db, client, admin, branch, branches, momo):
+    main, _, foreign = branches
+    headers = auth_headers(admin, branch.organization_id, main)
+
+    response = client.post("/api/v1/orders", headers=headers, json={
+        "order_type": "Takeaway", "branch_id": foreign, "items": [{"menu_item_id": momo, "quantity": 1}]
+    })
+
+    assert response.status_code == 200
+    assert db.get(Order, response.json()["id"]).branch_id == main
+
+
+def test_update_ignores_scope_and_key_columns(db, client, admin, branch, branches, momo):
+    main, _, foreign = branches
+    headers = auth_headers(admin, branch.organization_id, main)
+    order = client.post("/api/v1/orders", headers=headers, json={
+        "order_type": "Takeaway", "items": [{"menu_item_id": momo, "quantity": 1}]
+    }).json()
+
+    response = client.put(f"/api/v1/orders/{order['id']}", headers=headers, json={
+        "branch_id": foreign, "organization_id": 999, "order_number": "HIJACK", "created_by": 999,
+        "payment_type": "Cash"
+    })
+
+    assert response.status_code == 200
+    stored = db.get(Order, order["id"])
+    assert (stored.branch_id, stored.order_number, stored.created_by) == (main, order["order_number"], admin.id)
+    assert stored.payment_type == "Cash"
+
+
+def _event(branch_id):
+    return {"kot": {"branch_id": branch_id, "kot_type": "KOT", "status": "Pending"}, "previous_status": None}
+
+
+def test_stream_events_are_limited_to_the_token_branches():
+    assert event_matches(_event(1), None, None, {1, 2})
+    assert not event_matches(_event(3), None, None, {1, 2})
+    assert not event_matches(_event(None), None, None, {1, 2})
+
+
+def test_stream_dependency_resolves_organization_branches(db, admin, branch, branches):
+    main, second, _ = branches
+    token = set_tenant_scope(branch.organization_id, None)
+    try:
+        assert asyncio.run(get_scope_branch_ids_detached(admin)) == {main, second}
+    finally:
+        reset_tenant_scope(token)
+
+
+def test_unscoped_tokens_are_rejected(client, admin):
+    headers = auth_headers(admin)
+
+    assert client.get("/api/v1/kots/stream", headers=headers).status_code == 403
+    assert client.get("/api/v1/reports/sales-summary", headers=headers).status_code == 403
+    assert client.get("/api/v1/reports/item-sales", headers=headers).status_code == 403
+
+
+def test_organization_token_reads_only_its_rollups(db, client, admin, branch, branches):
+    db.add_all([
+        SalesHourlyRollup(branch_id=branch_id, hour=HOUR, order_type="Takeaway", payment_type="", status="Completed",
+                          order_count=1, gross_amount=100, net_amount=100, discount=0, paid_amount=100,
+                          credit_amount=0)
+        for branch_id in branches
+    ])
+    db.commit()
+
+    response = client.get("/api/v1/reports/sales-summary", headers=auth_headers(admin, branch.organization_id))
+
+    assert response.json()["total_orders"] == 2
+    token = set_tenant_scope(branch.organization_id, branches[1])
+    try:
+        assert SalesRollupService.get_sales_totals(db, ["Completed"])["order_count"] == 1
+        assert SalesRollupService.get_sales_totals(db, ["Completed"], branch_id=branches[2])["order_count"] == 0
+    finally:
+        reset_tenant_scope(token)
+
+
+def test_unassigned_tables_are_shared(db, branch, branches):
+    main, second, _ = branches
+    db.add_all([Table(table_id="T1", floor="Ground"), Table(table_id="T2", floor="Ground", branch_id=second)])
+    db.commit()
+
+    token = set_tenant_scope(branch.organization_id, main)
+    try:
+        assert [table.table_id for table in db.query(Table)] == ["T1"]
+    finally:
+        reset_tenant_scope(token)
+
+
+def test_organization_token_cannot_create_branch_rows(db, client, admin, branch, momo):
+    headers = auth_headers(admin, branch.organization_id)
+    order = {"order_type": "Takeaway", "items": [{"menu_item_id": momo, "quantity": 1}]}
+
+    assert client.post("/api/v1/orders", headers=headers, json=order).status_code == 403
+    assert client.post("/api/v1/orders/batch", headers=headers, json=[order]).status_code == 403
+    assert client.post("/api/v1/kots", headers=headers, json={"kot_type": "KOT"}).status_code == 403
+    assert db.query(Order).count() == 0
+
+    token = set_tenant_scope(branch.organization_id, None)
+    try:
+        db.add(KOT(kot_number="KOT-1", kot_type="KOT"))
+        with pytest.raises(BranchRequiredError):
+            db.flush()
+        db.rollback()
+        # Shared models can still be created for the whole organization
+        db.add(Table(table_id="T9", floor="Ground"))
+        db.commit()
+    finally:
+        reset_tenant_scope(token)
+    assert db.query(KOT).count() == 0
+    assert db.query(Table).one().branch_id is None